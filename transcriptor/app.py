@@ -1,28 +1,22 @@
 import streamlit as st
 import os
-import tempfile
 import json
-import time
-from moviepy import VideoFileClip
-import google.generativeai as genai
-from groq import Groq
-from pydub import AudioSegment
-import math
-import nltk
-from nltk.tokenize import sent_tokenize, word_tokenize
-from nltk.corpus import stopwords
-from nltk.probability import FreqDist
-from docx import Document
-from docx.enum.style import WD_STYLE_TYPE
-from docx.shared import Pt
-from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
-import io
-import shutil
 import sys
+from contextlib import contextmanager
 from datetime import datetime
 # Importações para resolver o problema de ScriptRunContext
 from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import logging
+from artifact_store import get_artifact_store, copy_and_hash
+from pipeline import transcribe_video_pipelined
+from job_queue import JobQueue
+from ffmpeg_resolver import cached_ffmpeg_info
+from embedded_ffmpeg import PERFIS_AUDIO, PERFIL_PADRAO, MIME_AUDIO, audio_output_path
+from processing import AudioExtractor, GroqTranscriber, SummaryGenerator, SummaryDocumentBuilder, set_notifier, temp_dir
+from segment_index import SegmentIndex
+from prewarm import start_prewarm, PRONTO, FALHOU
+from workspace import get_workspace_manager, QuotaExceededError, NoSpaceError
+from janitor import start_janitor
 
 # Configurar o logging para suprimir avisos específicos
 logger = logging.getLogger('streamlit')
@@ -31,32 +25,16 @@ logger.setLevel(logging.ERROR)
 # Pegar o contexto atual do Streamlit
 ctx = get_script_run_ctx()
 
-# Verificar se FFmpeg está instalado
+# Verificar se FFmpeg está disponível
 def check_ffmpeg():
-    try:
-        # Verificar se ffmpeg está no PATH
-        ffmpeg_path = shutil.which('ffmpeg')
-        if ffmpeg_path is None:
-            # Verificar em caminhos específicos do Streamlit Cloud
-            additional_paths = [
-                "/usr/bin",
-                "/usr/local/bin",
-                "/app/.apt/usr/bin",  # Caminho específico do Streamlit Cloud
-                "/home/appuser/.apt/usr/bin"  # Outro caminho possível no Streamlit Cloud
-            ]
-            
-            # Verificar cada caminho manualmente
-            for path in additional_paths:
-                potential_path = os.path.join(path, 'ffmpeg')
-                if os.path.exists(potential_path) and os.access(potential_path, os.X_OK):
-                    # Adicionar ao PATH para futuras verificações
-                    os.environ["PATH"] = path + os.pathsep + os.environ["PATH"]
-                    return True
-            return False
-        return True
-    except Exception as e:
-        st.error(f"Erro ao verificar FFmpeg: {str(e)}")
-        return False
+    """
+    Consulta o resultado da busca do FFmpeg, feita uma única vez por processo pelo
+    pré-aquecimento (ffmpeg_resolver), sem repetir a busca a cada execução da página.
+    Enquanto a busca (ou o download) não termina, o FFmpeg é considerado disponível;
+    a extração espera a busca antes de começar.
+    """
+    concluida, info = cached_ffmpeg_info()
+    return info is not None or not concluida
 
 # Verificar se set_page_config já foi chamado
 _page_config_already_set = False
@@ -479,9 +457,17 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Criar diretório temporário para arquivos
-temp_dir = os.path.join(tempfile.gettempdir(), 'streamlit_audio_processor')
-os.makedirs(temp_dir, exist_ok=True)
+# As mensagens das etapas de processamento aparecem no Streamlit
+set_notifier(st)
+
+# Armazenamento de resultados por conteúdo, compartilhado entre sessões e execuções
+artifact_store = get_artifact_store(os.path.join(temp_dir, 'artefatos'))
+
+# Diretórios isolados das sessões, com cotas de espaço por sessão e no total
+workspaces = get_workspace_manager(os.path.join(temp_dir, 'sessoes'))
+
+# Limpeza dos arquivos temporários antigos em segundo plano, uma única vez por processo
+start_janitor(workspaces, temp_dir, keep=('artefatos', 'config.json'))
 
 # Configuração para suprimir avisos de ScriptRunContext
 def configure_script_run_context():
@@ -514,6 +500,8 @@ if 'transcription_path' not in st.session_state:
     st.session_state.transcription_path = None
 if 'transcription_text' not in st.session_state:
     st.session_state.transcription_text = None
+if 'segment_index' not in st.session_state:
+    st.session_state.segment_index = None
 if 'docx_path' not in st.session_state:
     st.session_state.docx_path = None
 if 'docx_bytes' not in st.session_state:
@@ -526,6 +514,23 @@ if 'steps_completed' not in st.session_state:
     st.session_state.steps_completed = []
 if 'processing' not in st.session_state:
     st.session_state.processing = False
+if 'session_dir' not in st.session_state:
+    # Diretório próprio da sessão, para que arquivos com o mesmo nome de usuários diferentes não colidam
+    st.session_state.session_dir = workspaces.workspace().path
+if 'upload' not in st.session_state:
+    st.session_state.upload = None
+if 'job_ids' not in st.session_state:
+    # Recuperar os trabalhos enviados à fila antes de a página ser recarregada
+    job_ids = st.query_params.get("trabalhos")
+    st.session_state.job_ids = job_ids.split(",") if job_ids else []
+if 'jobs_ativos' not in st.session_state:
+    # Os trabalhos recuperados são acompanhados até se saber que terminaram
+    st.session_state.jobs_ativos = True
+if 'resultado_aberto' not in st.session_state:
+    st.session_state.resultado_aberto = None
+
+# Registrar o acesso ao diretório da sessão (recriando-o se foi removido por falta de espaço)
+session_workspace = workspaces.workspace(os.path.basename(st.session_state.session_dir))
 
 # Função para verificar se as configurações estão salvas
 def check_config():
@@ -545,368 +550,65 @@ def load_config():
     with open(config_path, 'r') as f:
         return json.load(f)
 
-# Classe para extração de áudio
-class AudioExtractor:
-    @staticmethod
-    def extract_audio(video_path, output_path):
-        try:
-            # Primeiro tenta usar o FFmpeg embutido
-            try:
-                from embedded_ffmpeg import EmbeddedFFmpeg
-                result = EmbeddedFFmpeg.extract_audio(video_path, output_path)
-                if result:
-                    return result
-                # Se falhar, continua com o método padrão
-            except ImportError:
-                st.warning("FFmpeg embutido não encontrado. Tentando método alternativo...")
-            
-            # Método original com MoviePy como fallback
-            video = VideoFileClip(video_path)
-            audio = video.audio
-            audio.write_audiofile(output_path)
-            return output_path
-        except Exception as e:
-            st.error(f"Erro ao extrair áudio: {str(e)}")
-            if "ffmpeg" in str(e).lower():
-                st.error("Certifique-se de que o FFmpeg está instalado corretamente ou use o FFmpeg embutido.")
-                
-                # Tentar baixar FFmpeg embutido se o erro for relacionado ao FFmpeg
-                try:
-                    st.info("Tentando baixar e configurar o FFmpeg embutido...")
-                    from download_ffmpeg import download_ffmpeg_for_current_os
-                    download_ffmpeg_for_current_os()
-                    
-                    # Tentar novamente com FFmpeg embutido
-                    from embedded_ffmpeg import EmbeddedFFmpeg
-                    result = EmbeddedFFmpeg.extract_audio(video_path, output_path)
-                    if result:
-                        st.success("Áudio extraído com sucesso usando FFmpeg embutido!")
-                        return result
-                except Exception as e2:
-                    st.error(f"Não foi possível configurar o FFmpeg embutido: {str(e2)}")
-            return None
-
-# Classe para transcrição de áudio
-class GroqTranscriber:
-    def __init__(self, api_key):
-        self.client = Groq(api_key=api_key)
-        self.MAX_FILE_SIZE = 25 * 1024 * 1024  # 25 MB em bytes
-        self.MODEL_ID = "whisper-large-v3-turbo"
-        
-    def get_file_size(self, file_path):
-        """Retorna o tamanho do arquivo em bytes"""
-        return os.path.getsize(file_path)
-    
-    def split_audio(self, audio_path, chunk_duration=300000):  # 300000 ms = 5 minutos
-        """
-        Divide o áudio em partes menores
-        Retorna: Lista com os caminhos dos arquivos temporários
-        """
-        try:
-            audio = AudioSegment.from_file(audio_path)
-            duration = len(audio)
-            chunks = []
-            
-            # Calcula o número de chunks necessários baseado no tamanho do arquivo
-            file_size = self.get_file_size(audio_path)
-            if file_size > self.MAX_FILE_SIZE:
-                num_chunks = math.ceil(file_size / (self.MAX_FILE_SIZE * 0.95))  # 95% do limite para margem de segurança
-                chunk_duration = duration / num_chunks
-            
-            # Duração mínima de um chunk em ms (0.01 segundos = 10ms)
-            MIN_CHUNK_DURATION = 100  # 100ms para ter uma margem de segurança
-            
-            # Divide o áudio
-            for i in range(0, duration, int(chunk_duration)):
-                end_point = min(i + chunk_duration, duration)
-                
-                # Verifica se o chunk tem a duração mínima
-                if (end_point - i) < MIN_CHUNK_DURATION:
-                    # Se o chunk for muito curto, pule-o
-                    continue
-                    
-                chunk = audio[i:end_point]
-                chunk_path = os.path.join(temp_dir, f"temp_chunk_{i}.mp3")
-                chunk.export(chunk_path, format="mp3")
-                chunks.append(chunk_path)
-                
-            return chunks
-        except Exception as e:
-            st.error(f"Erro ao dividir áudio: {str(e)}")
-            return []
-    
-    def transcribe_chunk(self, chunk_path):
-        """Transcreve um único chunk de áudio usando a API do Groq"""
-        try:
-            # Verificar se o arquivo existe e tem tamanho mínimo
-            if not os.path.exists(chunk_path) or os.path.getsize(chunk_path) < 100:  # 100 bytes mínimos
-                st.warning(f"Arquivo de chunk muito pequeno ou inexistente: {chunk_path}")
-                return ""
-                
-            with open(chunk_path, "rb") as audio_file:
-                # Usa a API do Groq para transcrição
-                response = self.client.audio.transcriptions.create(
-                    model=self.MODEL_ID,
-                    file=audio_file,
-                    language="pt"
-                )
-                return response.text
-        except Exception as e:
-            error_msg = str(e)
-            if "Audio file is too short" in error_msg:
-                st.warning(f"Chunk {chunk_path} ignorado por ser muito curto")
-            else:
-                st.error(f"Erro ao transcrever chunk {chunk_path}: {error_msg}")
-            return ""
+# Função para reservar espaço no diretório da sessão durante um processamento
+@contextmanager
+def session_space(nbytes):
+    """
+    Reserva espaço no diretório da sessão enquanto um processamento grava arquivos.
+    Sem espaço no servidor, espera outros processamentos terminarem, com um aviso na página.
     
-    def transcribe(self, audio_path, output_path=None, progress_callback=None):
-        """
-        Transcreve um arquivo de áudio, dividindo-o se necessário
-        """
-        try:
-            if output_path is None:
-                output_path = os.path.join(temp_dir, "transcricao.txt")
-                
-            # Verifica se o arquivo precisa ser dividido
-            if self.get_file_size(audio_path) <= self.MAX_FILE_SIZE:
-                # Se não precisar dividir, transcreve diretamente
-                if progress_callback:
-                    progress_callback(0.5)
-                transcription = self.transcribe_chunk(audio_path)
-                with open(output_path, "w", encoding="utf-8") as f:
-                    f.write(transcription)
-                if progress_callback:
-                    progress_callback(1.0)
-                return transcription, output_path
-            
-            # Se precisar dividir, processa em chunks
-            chunks = self.split_audio(audio_path)
-            if not chunks:
-                raise Exception("Falha ao dividir o áudio em partes")
-                
-            full_transcription = ""
-            
-            # Transcreve cada chunk - aqui pode estar usando threads internamente
-            # Usar uma abordagem sequencial para evitar problemas com ScriptRunContext
-            for i, chunk_path in enumerate(chunks, 1):
-                if progress_callback:
-                    # Garantir que as chamadas de callback tenham o contexto do Streamlit
-                    if ctx:
-                        # Segurar o contexto atual do Streamlit
-                        add_script_run_ctx(progress_callback, ctx)
-                    progress_callback(i / len(chunks))
-                transcription = self.transcribe_chunk(chunk_path)
-                full_transcription += transcription + "\n"
-                
-                # Remove o arquivo temporário
-                try:
-                    os.remove(chunk_path)
-                except:
-                    pass
-            
-            # Salva a transcrição completa
-            with open(output_path, "w", encoding="utf-8") as f:
-                f.write(full_transcription)
-            
-            return full_transcription, output_path
-            
-        except Exception as e:
-            st.error(f"Erro durante a transcrição: {str(e)}")
-            return None, None
-
-# Classe para resumo e geração de documento
-class SummaryGenerator:
-    def __init__(self, api_key):
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
-        
-        # Baixar recursos necessários do NLTK
-        try:
-            nltk.data.find('tokenizers/punkt')
-        except LookupError:
-            nltk.download('punkt')
-        
-        try:
-            nltk.data.find('corpora/stopwords')
-        except LookupError:
-            nltk.download('stopwords')
-            
-        # Tentar baixar o recurso punkt_tab (pode não estar disponível)
-        try:
-            nltk.data.find('tokenizers/punkt_tab')
-        except LookupError:
-            try:
-                nltk.download('punkt_tab')
-            except:
-                # Se não conseguir baixar o punkt_tab, usaremos o método padrão
-                st.warning("Não foi possível baixar o recurso NLTK 'punkt_tab'. Usando método alternativo para tokenização.")
-        
-        # Configurar o tokenizador - com fallback seguro
+    Yields:
+        bool: True se o espaço foi reservado; False se não (o erro já foi exibido)
+    """
+    reservation = None
+    try:
         try:
-            # Tentar carregar o tokenizador para português
-            self.tokenizer = nltk.data.load('tokenizers/punkt/portuguese.pickle')
-        except:
-            # Se falhar, criar um tokenizador simples
-            class SimpleTokenizer:
-                def tokenize(self, text):
-                    # Um tokenizador de sentenças simples baseado em pontuação
-                    import re
-                    return re.split(r'(?<=[.!?])\s+', text)
-            self.tokenizer = SimpleTokenizer()
-    
-    def preprocessar_texto(self, texto):
-        # Tokenização de sentenças e palavras
-        # Usando o tokenizador personalizado em vez de sent_tokenize
-        sentencas = self.tokenizer.tokenize(texto)
-        palavras = word_tokenize(texto.lower())
-        
-        # Remover stopwords
-        stop_words = set(stopwords.words('portuguese'))
-        palavras_filtradas = [palavra for palavra in palavras if palavra.isalnum() and palavra not in stop_words]
-        
-        # Análise de frequência de palavras
-        freq_dist = FreqDist(palavras_filtradas)
-        palavras_mais_comuns = freq_dist.most_common(10)
-        
-        return sentencas, palavras_filtradas, palavras_mais_comuns
-
-    def gerar_resumo_profissional(self, conteudo, progress_callback=None):
-        if progress_callback:
-            # Adicionando contexto do Streamlit ao callback
-            if ctx:
-                add_script_run_ctx(progress_callback, ctx)
-            progress_callback(0.3)
-            
-        sentencas, palavras_filtradas, palavras_mais_comuns = self.preprocessar_texto(conteudo)
-
-        prompt = f"""
-        Como professor de português, analise o conteúdo do arquivo em anexo e faça um texto destacando os principais pontos, com um tom profissional.
-
-        Conteúdo original:
-        {conteudo}
-
-        Análise prévia:
-        - Número de sentenças: {len(sentencas)}
-        - Palavras-chave mais frequentes: {', '.join([palavra for palavra, _ in palavras_mais_comuns])}
-
-        O resumo deve:
-        1. Ter um tom profissional e formal
-        2. Destacar os pontos-chave do texto original
-        3. Ser estruturado em tópicos claros
-        4. Usar a seguinte formatação:
-           - Tópicos principais sem marcadores
-           - Subtópicos com • (ex: • Subtópico)
-           - Sub-subtópicos com dois espaços e • (ex:   • Sub-subtópico)
-        5. Manter uma estrutura hierárquica clara
-        6. NÃO usar asteriscos (**) ou hashtags (###) na formatação
-
-        Por favor, formate o resumo de maneira clara e legível, seguindo estritamente as regras de formatação acima.
-        """
+            reservation = workspaces.acquire(session_workspace.name, nbytes, timeout=0)
+        except NoSpaceError:
+            with st.spinner("O servidor está sem espaço em disco; aguardando outros processamentos terminarem..."):
+                reservation = workspaces.acquire(session_workspace.name, nbytes)
+    except QuotaExceededError as e:
+        display_error(str(e))
+    try:
+        yield reservation is not None
+    finally:
+        if reservation is not None:
+            workspaces.release(reservation)
 
-        if progress_callback:
-            progress_callback(0.5)
-            
-        try:
-            resposta = self.model.generate_content(prompt)
-            
-            if progress_callback:
-                progress_callback(1.0)
-                
-            return resposta.text
-        except Exception as e:
-            st.error(f"Erro ao gerar resumo: {str(e)}")
+# Função para gravar o vídeo enviado no diretório da sessão
+def persist_upload(uploaded_file):
+    """
+    Grava o upload uma única vez, em blocos, calculando o hash durante a escrita.
+    Nas execuções seguintes do script, o mesmo upload não é gravado de novo.
+    
+    Returns:
+        dict: {"file_id", "path", "hash"} do vídeo gravado ou None se não houver espaço
+    """
+    file_id = getattr(uploaded_file, "file_id", None) or f"{uploaded_file.name}:{uploaded_file.size}"
+    saved = st.session_state.upload
+    if saved and saved["file_id"] == file_id and os.path.exists(saved["path"]):
+        return saved
+    
+    session_dir = st.session_state.session_dir
+    os.makedirs(session_dir, exist_ok=True)
+    if saved and os.path.exists(saved["path"]):
+        # Novo vídeo na sessão: o anterior não é mais necessário
+        os.remove(saved["path"])
+    
+    video_path = os.path.join(session_dir, os.path.basename(uploaded_file.name))
+    with session_space(uploaded_file.size) as reservado:
+        if not reservado:
             return None
+        video_hash = copy_and_hash(uploaded_file, video_path)
+    st.session_state.upload = {"file_id": file_id, "path": video_path, "hash": video_hash}
+    return st.session_state.upload
 
-    def salvar_como_doc(self, conteudo, caminho_arquivo=None):
-        if caminho_arquivo is None:
-            caminho_arquivo = os.path.join(temp_dir, "resumo.docx")
-            
-        documento = Document()
-
-        # Definir estilos
-        estilos = {
-            'Normal': {
-                'nome': 'Calibri',
-                'tamanho': 11,
-                'alinhamento': WD_PARAGRAPH_ALIGNMENT.JUSTIFY
-            },
-            'Titulo': {
-                'nome': 'Calibri',
-                'tamanho': 12,
-                'negrito': True,
-                'alinhamento': WD_PARAGRAPH_ALIGNMENT.LEFT
-            },
-            'Marcador1': {
-                'nome': 'Calibri',
-                'tamanho': 11,
-                'alinhamento': WD_PARAGRAPH_ALIGNMENT.LEFT,
-                'estilo': 'List Bullet'
-            },
-            'Marcador2': {
-                'nome': 'Calibri',
-                'tamanho': 11,
-                'alinhamento': WD_PARAGRAPH_ALIGNMENT.LEFT,
-                'estilo': 'List Bullet 2'
-            }
-        }
-
-        # Criar ou atualizar estilos
-        for nome, config in estilos.items():
-            if nome in documento.styles:
-                estilo = documento.styles[nome]
-            else:
-                estilo = documento.styles.add_style(nome, WD_STYLE_TYPE.PARAGRAPH)
-            
-            estilo.font.name = config['nome']
-            estilo.font.size = Pt(config['tamanho'])
-            if 'negrito' in config:
-                estilo.font.bold = config['negrito']
-            if 'estilo' in config:
-                estilo.base_style = documento.styles[config['estilo']]
-
-        # Processar o conteúdo
-        linhas = conteudo.split('\n')
-        nivel_atual = 0
-
-        for linha in linhas:
-            linha = linha.strip()
-            if not linha:
-                continue
-
-            # Remover asteriscos e hashtags
-            linha = linha.replace('*', '').replace('#', '')
-
-            if not linha.startswith('•'):
-                # Tópico principal
-                p = documento.add_paragraph(linha, style='Titulo')
-                nivel_atual = 0
-            elif linha.startswith('•'):
-                # Marcador de primeiro nível
-                p = documento.add_paragraph(linha.lstrip('• '), style='Marcador1')
-                nivel_atual = 1
-            elif linha.startswith('  •'):
-                # Marcador de segundo nível
-                p = documento.add_paragraph(linha.lstrip(' •'), style='Marcador2')
-                nivel_atual = 2
-            else:
-                # Texto normal
-                p = documento.add_paragraph(linha, style='Normal')
-
-            p.alignment = estilos[p.style.name]['alinhamento']
-
-        try:
-            # Salvar o documento
-            documento.save(caminho_arquivo)
-            
-            # Retornar também os bytes para download
-            file_stream = io.BytesIO()
-            documento.save(file_stream)
-            file_stream.seek(0)
-            
-            return file_stream.getvalue(), caminho_arquivo
-        except Exception as e:
-            st.error(f"Erro ao salvar documento: {str(e)}")
-            return None, None
+# Função para abrir a fila de trabalhos configurada (None se o processamento for local)
+def get_job_queue():
+    if not check_config():
+        return None
+    fila_dir = load_config().get("FILA_DIR")
+    return JobQueue(fila_dir) if fila_dir else None
 
 # Função para exibir o status de cada etapa
 def display_step_status(step_number, step_name):
@@ -986,9 +688,34 @@ def display_spinner():
     </div>
     """, unsafe_allow_html=True)
 
+# Pré-aquecimento do processo (já iniciado pelo streamlit_app.py; aqui só é obtido)
+prewarm = start_prewarm()
+
 # Verificar se FFmpeg está instalado
 ffmpeg_available = check_ffmpeg()
 
+# Intervalo, em segundos, entre as atualizações dos painéis que acompanham tarefas em segundo plano
+INTERVALO_PAINEIS = 2
+
+def show_prewarm_status():
+    """
+    Exibe o estado da preparação do servidor. Roda como fragmento, atualizado sozinho
+    enquanto a preparação não termina; quando ela termina, a página inteira é executada
+    uma vez para refletir o FFmpeg e os recursos carregados.
+    """
+    if prewarm.ready():
+        if st.session_state.get('prewarm_pendente'):
+            st.session_state.prewarm_pendente = False
+            st.rerun()
+        return
+    
+    st.session_state.prewarm_pendente = True
+    st.markdown("---")
+    st.markdown("### Preparando o Servidor")
+    icones = {PRONTO: "✅", FALHOU: "⚠️"}
+    for status in prewarm.snapshot().values():
+        st.markdown(f"{icones.get(status['estado'], '⏳')} {status['descricao']}")
+
 # Sidebar para configurações
 with st.sidebar:
     st.markdown('<div class="sidebar-header"><h3>⚙️ Configurações</h3></div>', unsafe_allow_html=True)
@@ -999,18 +726,50 @@ with st.sidebar:
     display_step_status(2, "Transcrição")
     display_step_status(3, "Resumo e Documento")
     
+    # Estado da preparação do servidor, atualizado sem executar a página inteira
+    st.fragment(show_prewarm_status, run_every=None if prewarm.ready() else INTERVALO_PAINEIS)()
+    
     st.markdown("---")
     
     st.markdown("### Configurações de API")
     
     google_api_key = st.text_input("Google API Key (Gemini)", type="password")
     groq_api_key = st.text_input("Groq API Key", type="password")
+    groq_max_workers = st.number_input(
+        "Transcrições simultâneas",
+        min_value=1,
+        max_value=16,
+        value=4,
+        help="Número máximo de partes do áudio enviadas ao Groq ao mesmo tempo"
+    )
+    perfil_extracao = st.selectbox(
+        "Perfil de extração de áudio",
+        options=list(PERFIS_AUDIO.keys()),
+        format_func=lambda perfil: PERFIS_AUDIO[perfil]["descricao"],
+        help="O perfil de transcrição gera arquivos bem menores, que normalmente cabem em uma única requisição"
+    )
+    compressao_tokens = st.number_input(
+        "Compressão local antes do resumo (tokens)",
+        min_value=0,
+        max_value=200000,
+        value=0,
+        step=1000,
+        help="Mantém apenas as sentenças mais informativas da transcrição até este número de tokens antes de enviá-la ao Gemini (0 desativa)"
+    )
+    fila_dir = st.text_input(
+        "Diretório da fila de processamento (opcional)",
+        help="Com um diretório compartilhado, os vídeos são processados por workers separados (python worker.py --fila DIRETÓRIO) e o processamento continua mesmo se a página for fechada"
+    )
     
     if st.button("Salvar Configurações"):
         # Criar arquivo de configuração
         config = {
             "GOOGLE_API_KEY": google_api_key,
-            "GROQ_API_KEY": groq_api_key
+            "GROQ_API_KEY": groq_api_key,
+            "GROQ_MAX_WORKERS": int(groq_max_workers),
+            "PERFIL_EXTRACAO": perfil_extracao,
+            "COMPRESSAO_TOKENS": int(compressao_tokens),
+            "FILA_DIR": fila_dir.strip()
         }
         
         config_path = os.path.join(temp_dir, 'config.json')
@@ -1081,11 +840,11 @@ st.markdown("""
 
 video_file = st.file_uploader("Selecione um arquivo de vídeo", type=['mp4', 'avi', 'mov', 'mkv'])
 
-if video_file is not None:
-    # Salvar o arquivo de vídeo temporariamente
-    video_path = os.path.join(temp_dir, video_file.name)
-    with open(video_path, 'wb') as f:
-        f.write(video_file.getbuffer())
+# Salvar o arquivo de vídeo no diretório da sessão (apenas na primeira execução)
+upload = persist_upload(video_file) if video_file is not None else None
+
+if upload is not None:
+    video_path = upload["path"]
     
     # Exibir o vídeo
     st.video(video_path)
@@ -1112,47 +871,264 @@ if video_file is not None:
         else:
             st.session_state.processing = True
             
-            with st.spinner("Extraindo áudio do vídeo..."):
-                # Criar nome de arquivo baseado no nome original
-                file_name = os.path.splitext(video_file.name)[0]
-                audio_path = os.path.join(temp_dir, f"{file_name}.mp3")
-                
-                # Exibir progresso
-                progress_placeholder = st.empty()
-                progress_placeholder.markdown('<div class="progress-container"><div class="progress-label"><span>Extraindo áudio...</span><span>0%</span></div><div class="progress-bar"><div class="progress-bar-fill" style="width: 0%;"></div></div></div>', unsafe_allow_html=True)
-                
-                # Extrair áudio
-                extractor = AudioExtractor()
-                audio_path = extractor.extract_audio(video_path, audio_path)
-                
-                # Atualizar progresso
-                for i in range(10):
-                    progress_placeholder.markdown(f'<div class="progress-container"><div class="progress-label"><span>Extraindo áudio...</span><span>{(i+1)*10}%</span></div><div class="progress-bar"><div class="progress-bar-fill" style="width: {(i+1)*10}%;"></div></div></div>', unsafe_allow_html=True)
-                    time.sleep(0.1)
-                
-                if audio_path:
-                    # Salvar o caminho do áudio na sessão
-                    st.session_state.audio_path = audio_path
-                    st.session_state.current_step = 2
-                    st.session_state.steps_completed.append(1)
+            # O FFmpeg pode ainda estar sendo preparado (ou baixado) em segundo plano
+            if not prewarm.wait("ffmpeg", timeout=0):
+                with st.spinner("Aguardando a preparação do FFmpeg..."):
+                    prewarm.wait("ffmpeg")
+            
+            # Estimativa do espaço: o áudio extraído costuma ser menor que o vídeo
+            with st.spinner("Extraindo áudio do vídeo..."), session_space(video_file.size) as reservado:
+                if reservado:
+                    # Perfil de extração configurado (transcrição por padrão)
+                    perfil = load_config().get("PERFIL_EXTRACAO", PERFIL_PADRAO) if check_config() else PERFIL_PADRAO
+                    
+                    # Criar nome de arquivo baseado no nome original
+                    file_name = os.path.splitext(video_file.name)[0]
+                    audio_path = audio_output_path(os.path.join(st.session_state.session_dir, file_name), perfil)
+                    
+                    # Exibir progresso real do FFmpeg, com velocidade e tempo restante
+                    progress_placeholder = st.empty()
                     
-                    display_success("Áudio extraído com sucesso!")
+                    def update_progress(progress, speed=None, eta=None):
+                        label = "Extraindo áudio..."
+                        if speed:
+                            label += f" {speed:.1f}x"
+                        if eta is not None and progress < 1:
+                            label += f" · faltam {int(eta // 60)}:{int(eta % 60):02d}"
+                        progress_placeholder.markdown(f'<div class="progress-container"><div class="progress-label"><span>{label}</span><span>{int(progress * 100)}%</span></div><div class="progress-bar"><div class="progress-bar-fill" style="width: {int(progress * 100)}%;"></div></div></div>', unsafe_allow_html=True)
+                    
+                    update_progress(0.0)
+                    
+                    # Extrair áudio
+                    extractor = AudioExtractor()
+                    audio_path = extractor.extract_audio(
+                        video_path,
+                        audio_path,
+                        perfil,
+                        store=artifact_store,
+                        video_hash=upload["hash"],
+                        progress_callback=update_progress
+                    )
+                    
+                    if audio_path:
+                        # Salvar o caminho do áudio na sessão
+                        st.session_state.audio_path = audio_path
+                        st.session_state.segment_index = None
+                        st.session_state.current_step = 2
+                        st.session_state.steps_completed.append(1)
+                        
+                        display_success("Áudio extraído com sucesso!")
+                        
+                        # Exibir player de áudio
+                        try:
+                            audio_file = open(audio_path, 'rb')
+                            audio_bytes = audio_file.read()
+                            st.audio(audio_bytes, format=MIME_AUDIO.get(os.path.splitext(audio_path)[1], "audio/mp3"))
+                            audio_file.close()
+                        except Exception as e:
+                            display_error(f"Erro ao exibir áudio: {str(e)}")
+                    else:
+                        display_error("Falha ao extrair áudio. Verifique se o FFmpeg está instalado corretamente.")
+            
+            st.session_state.processing = False
+
+    pipeline_button = st.button(
+        "⚡ Extrair e Transcrever",
+        key="pipeline",
+        help="Transcreve os primeiros trechos enquanto o restante do áudio ainda está sendo extraído"
+    )
+    
+    if pipeline_button:
+        if not ffmpeg_available:
+            display_error("FFmpeg não está instalado. Por favor, instale o FFmpeg para continuar.")
+        elif not check_config():
+            display_warning("Por favor, configure as chaves de API na barra lateral antes de continuar.")
+        else:
+            st.session_state.processing = True
+            config = load_config()
+            perfil = config.get("PERFIL_EXTRACAO", PERFIL_PADRAO)
+            
+            # Criar barra de progresso e área da transcrição parcial
+            progress_placeholder = st.empty()
+            partial_text = st.empty()
+            
+            def update_progress(progress):
+                progress_placeholder.markdown(f'<div class="progress-container"><div class="progress-label"><span>Extraindo e transcrevendo...</span><span>{int(progress * 100)}%</span></div><div class="progress-bar"><div class="progress-bar-fill" style="width: {int(progress * 100)}%;"></div></div></div>', unsafe_allow_html=True)
+            
+            def update_text(texto):
+                partial_text.text(texto)
+            
+            # O FFmpeg pode ainda estar sendo preparado (ou baixado) em segundo plano
+            if not prewarm.wait("ffmpeg", timeout=0):
+                with st.spinner("Aguardando a preparação do FFmpeg..."):
+                    prewarm.wait("ffmpeg")
+            
+            # Estimativa do espaço: o áudio e as partes enviadas ao Groq
+            with st.spinner("Extraindo e transcrevendo..."), session_space(2 * video_file.size) as reservado:
+                if reservado:
+                    file_name = os.path.splitext(video_file.name)[0]
+                    transcriber = GroqTranscriber(
+                        api_key=config["GROQ_API_KEY"],
+                        max_workers=config.get("GROQ_MAX_WORKERS"),
+                        store=artifact_store,
+                        work_dir=st.session_state.session_dir
+                    )
                     
-                    # Exibir player de áudio
                     try:
-                        audio_file = open(audio_path, 'rb')
-                        audio_bytes = audio_file.read()
-                        st.audio(audio_bytes, format='audio/mp3')
-                        audio_file.close()
+                        resultado = transcribe_video_pipelined(
+                            video_path,
+                            transcriber,
+                            st.session_state.session_dir,
+                            perfil,
+                            audio_path=os.path.join(st.session_state.session_dir, file_name),
+                            video_hash=upload["hash"],
+                            on_text=update_text,
+                            progress_callback=update_progress
+                        )
                     except Exception as e:
-                        display_error(f"Erro ao exibir áudio: {str(e)}")
-                else:
-                    display_error("Falha ao extrair áudio. Verifique se o FFmpeg está instalado corretamente.")
+                        resultado = None
+                        display_error(f"Erro no processamento em pipeline: {str(e)}")
+                    
+                    if resultado:
+                        for segmento, erro in resultado["falhas"]:
+                            if segmento:
+                                transcriber._report_chunk_error(segmento, erro)
+                            else:
+                                display_error(f"Erro ao extrair áudio: {erro}")
+                        
+                        transcription = resultado["texto"]
+                        output_path = os.path.join(st.session_state.session_dir, "transcricao.txt")
+                        with open(output_path, "w", encoding="utf-8") as f:
+                            f.write(transcription)
+                        
+                        if transcription.strip():
+                            st.session_state.audio_path = resultado["audio_path"]
+                            st.session_state.transcription_path = output_path
+                            st.session_state.transcription_text = transcription
+                            st.session_state.segment_index = resultado["indice"]
+                            st.session_state.current_step = 3
+                            st.session_state.steps_completed.extend([1, 2])
+                            display_success("Áudio extraído e transcrito com sucesso!")
+                        else:
+                            display_error("Falha na transcrição. Verifique os logs para mais detalhes.")
             
             st.session_state.processing = False
 
+    job_queue = get_job_queue()
+    if job_queue is not None:
+        queue_button = st.button(
+            "📥 Enviar para a Fila",
+            key="enqueue",
+            help="Um worker separado extrai, transcreve e gera o resumo; o processamento continua mesmo se esta página for fechada"
+        )
+        
+        if queue_button:
+            try:
+                job_id = job_queue.enqueue(
+                    video_path,
+                    nome=video_file.name,
+                    perfil=load_config().get("PERFIL_EXTRACAO", PERFIL_PADRAO)
+                )
+                st.session_state.job_ids.append(job_id)
+                st.session_state.jobs_ativos = True
+                st.query_params["trabalhos"] = ",".join(st.session_state.job_ids)
+                display_success("Vídeo enviado para a fila de processamento!")
+            except Exception as e:
+                display_error(f"Erro ao enviar para a fila: {str(e)}")
+
 st.markdown("</div>", unsafe_allow_html=True)
 
+# Trabalhos enviados à fila
+def show_jobs():
+    """
+    Exibe os trabalhos enviados à fila. Roda como fragmento, atualizado sozinho enquanto
+    algum trabalho está pendente ou em execução, sem executar a página inteira.
+    """
+    active_jobs = False
+    job_queue = get_job_queue()
+    
+    st.markdown("""
+    <div class="section-card">
+        <div class="section-header">
+            <div class="section-number">⏳</div>
+            <div class="section-title">Trabalhos na Fila</div>
+        </div>
+    """, unsafe_allow_html=True)
+    
+    if job_queue is None:
+        display_warning("Configure o diretório da fila na barra lateral para acompanhar os trabalhos.")
+    else:
+        etapas = {
+            "extracao": "Extraindo áudio",
+            "transcricao": "Transcrevendo",
+            "resumo": "Gerando resumo",
+            "documento": "Gerando documento"
+        }
+        
+        for job_id in st.session_state.job_ids:
+            job = job_queue.get(job_id)
+            if job is None:
+                display_warning(f"Trabalho não encontrado: {job_id}")
+                continue
+            
+            if job["estado"] == "pendente":
+                active_jobs = True
+                display_info(f"{job['nome']}: aguardando um worker")
+            elif job["estado"] == "em_execucao":
+                active_jobs = True
+                display_progress(job.get("progresso") or 0.0, f"{job['nome']}: {etapas.get(job.get('etapa'), 'Processando')}...")
+            elif job["estado"] == "falhou":
+                display_error(f"{job['nome']}: {job.get('erro') or 'falha no processamento'}")
+            else:
+                job_dir = job_queue.job_dir(job_id)
+                resultado = job.get("resultado") or {}
+                display_success(f"{job['nome']}: processamento concluído")
+                
+                if st.button("📂 Abrir Resultado", key=f"abrir_{job_id}"):
+                    # Carregar os resultados nas etapas da página
+                    transcription_path = os.path.join(job_dir, resultado["transcricao"])
+                    with open(transcription_path, "r", encoding="utf-8") as f:
+                        st.session_state.transcription_text = f.read()
+                    st.session_state.transcription_path = transcription_path
+                    st.session_state.segment_index = None
+                    if resultado.get("segmentos"):
+                        with open(os.path.join(job_dir, resultado["segmentos"]), "r", encoding="utf-8") as f:
+                            st.session_state.segment_index = SegmentIndex.from_json(f.read())
+                    st.session_state.audio_path = os.path.join(job_dir, resultado["audio"])
+                    st.session_state.steps_completed = [1, 2]
+                    st.session_state.current_step = 3
+                    
+                    if resultado.get("documento"):
+                        docx_path = os.path.join(job_dir, resultado["documento"])
+                        with open(docx_path, "rb") as f:
+                            st.session_state.docx_bytes = f.read()
+                        st.session_state.docx_path = docx_path
+                        st.session_state.steps_completed.append(3)
+                    
+                    # As etapas ficam fora do fragmento: executar a página inteira para exibi-las
+                    st.session_state.resultado_aberto = job_id
+                    st.rerun()
+                
+                if st.session_state.resultado_aberto == job_id and resultado.get("documento") and st.session_state.docx_bytes:
+                    st.download_button(
+                        label="📥 Baixar Documento DOCX",
+                        data=st.session_state.docx_bytes,
+                        file_name=f"{os.path.splitext(job['nome'])[0]}.docx",
+                        mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+                        key=f"docx_{job_id}"
+                    )
+    
+    st.markdown("</div>", unsafe_allow_html=True)
+    
+    # Sem trabalhos em andamento, o fragmento para de se atualizar
+    if st.session_state.jobs_ativos != active_jobs:
+        st.session_state.jobs_ativos = active_jobs
+        if not active_jobs:
+            st.rerun()
+
+if st.session_state.job_ids:
+    st.fragment(show_jobs, run_every=INTERVALO_PAINEIS if st.session_state.jobs_ativos else None)()
+
 # Seção 2: Transcrição de áudio
 st.markdown("""
 <div class="section-card">
@@ -1186,38 +1162,111 @@ if st.session_state.audio_path and os.path.exists(st.session_state.audio_path):
                 progress_placeholder.markdown(f'<div class="progress-container"><div class="progress-label"><span>Transcrevendo áudio...</span><span>{int(progress * 100)}%</span></div><div class="progress-bar"><div class="progress-bar-fill" style="width: {int(progress * 100)}%;"></div></div></div>', unsafe_allow_html=True)
                 status_text.markdown(f"<p>Processando... Por favor, aguarde.</p>", unsafe_allow_html=True)
             
-            with st.spinner("Transcrevendo áudio..."):
-                # Iniciar transcrição
-                transcriber = GroqTranscriber(api_key=config["GROQ_API_KEY"])
-                transcription, output_path = transcriber.transcribe(
-                    st.session_state.audio_path,
-                    progress_callback=update_progress
-                )
-                
-                if transcription and output_path:
-                    # Salvar o caminho e o texto da transcrição na sessão
-                    st.session_state.transcription_path = output_path
-                    st.session_state.transcription_text = transcription
-                    st.session_state.current_step = 3
-                    st.session_state.steps_completed.append(2)
-                    
-                    display_success("Transcrição concluída com sucesso!")
-                    
-                    # Exibir prévia da transcrição
-                    st.markdown("### Prévia da Transcrição")
-                    st.text_area("Transcrição", transcription, height=200)
-                    
-                    # Botão para baixar a transcrição
-                    st.download_button(
-                        label="📝 Baixar Transcrição TXT",
-                        data=transcription,
-                        file_name=f"{os.path.splitext(os.path.basename(st.session_state.audio_path))[0]}_transcricao.txt",
-                        mime="text/plain"
+            # Estimativa do espaço: as partes do áudio enviadas ao Groq
+            with st.spinner("Transcrevendo áudio..."), session_space(os.path.getsize(st.session_state.audio_path)) as reservado:
+                if reservado:
+                    # Iniciar transcrição
+                    transcriber = GroqTranscriber(
+                        api_key=config["GROQ_API_KEY"],
+                        max_workers=config.get("GROQ_MAX_WORKERS"),
+                        store=artifact_store,
+                        work_dir=st.session_state.session_dir
                     )
-                else:
-                    display_error("Falha na transcrição. Verifique os logs para mais detalhes.")
+                    transcription, output_path = transcriber.transcribe(
+                        st.session_state.audio_path,
+                        output_path=os.path.join(st.session_state.session_dir, "transcricao.txt"),
+                        progress_callback=update_progress
+                    )
+                    
+                    if transcription and output_path:
+                        # Salvar o caminho e o texto da transcrição na sessão
+                        st.session_state.transcription_path = output_path
+                        st.session_state.transcription_text = transcription
+                        st.session_state.segment_index = transcriber.ultimo_indice
+                        st.session_state.current_step = 3
+                        st.session_state.steps_completed.append(2)
+                        
+                        display_success("Transcrição concluída com sucesso!")
+                        
+                        # Exibir prévia da transcrição
+                        st.markdown("### Prévia da Transcrição")
+                        st.text_area("Transcrição", transcription, height=200)
+                        
+                        # Botão para baixar a transcrição
+                        st.download_button(
+                            label="📝 Baixar Transcrição TXT",
+                            data=transcription,
+                            file_name=f"{os.path.splitext(os.path.basename(st.session_state.audio_path))[0]}_transcricao.txt",
+                            mime="text/plain"
+                        )
+                    else:
+                        display_error("Falha na transcrição. Verifique os logs para mais detalhes.")
             
             st.session_state.processing = False
+    
+    # Legendas e correção de trechos a partir dos segmentos com tempo da transcrição
+    segment_index = st.session_state.segment_index
+    if segment_index:
+        base_name = os.path.splitext(os.path.basename(st.session_state.audio_path))[0]
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button(
+                label="🎬 Baixar Legendas SRT",
+                data=segment_index.to_srt(),
+                file_name=f"{base_name}.srt",
+                mime="application/x-subrip"
+            )
+        with col2:
+            st.download_button(
+                label="🎬 Baixar Legendas VTT",
+                data=segment_index.to_vtt(),
+                file_name=f"{base_name}.vtt",
+                mime="text/vtt"
+            )
+        
+        with st.expander("Retranscrever um trecho"):
+            col1, col2 = st.columns(2)
+            with col1:
+                range_start = st.number_input("Início (segundos)", min_value=0.0, max_value=segment_index.duration,
+                                              value=0.0, step=1.0, key="trecho_inicio")
+            with col2:
+                range_end = st.number_input("Fim (segundos)", min_value=0.0, max_value=segment_index.duration,
+                                            value=min(30.0, segment_index.duration), step=1.0, key="trecho_fim")
+            
+            st.text_area("Texto atual do trecho", segment_index.text_between(range_start, range_end), height=100)
+            
+            if st.button("🔁 Retranscrever Trecho", key="retranscrever_trecho"):
+                if not check_config():
+                    display_warning("Por favor, configure as chaves de API na barra lateral antes de continuar.")
+                else:
+                    config = load_config()
+                    transcriber = GroqTranscriber(
+                        api_key=config["GROQ_API_KEY"],
+                        store=artifact_store,
+                        work_dir=st.session_state.session_dir
+                    )
+                    with st.spinner("Transcrevendo o trecho..."):
+                        texto_trecho, novo_indice = transcriber.transcribe_range(
+                            st.session_state.audio_path,
+                            range_start,
+                            range_end,
+                            segment_index
+                        )
+                    
+                    if novo_indice:
+                        # A transcrição passa a ser o texto dos segmentos, com o trecho corrigido
+                        transcription = novo_indice.text
+                        output_path = st.session_state.transcription_path or os.path.join(
+                            st.session_state.session_dir, "transcricao.txt")
+                        with open(output_path, "w", encoding="utf-8") as f:
+                            f.write(transcription)
+                        
+                        st.session_state.segment_index = novo_indice
+                        st.session_state.transcription_path = output_path
+                        st.session_state.transcription_text = transcription
+                        display_success("Trecho retranscrito com sucesso!")
+                        st.text_area("Novo texto do trecho", texto_trecho, height=100)
 elif st.session_state.audio_path:
     display_error(f"O arquivo de áudio não foi encontrado: {st.session_state.audio_path}")
     st.session_state.audio_path = None
@@ -1238,6 +1287,7 @@ st.markdown("""
 if st.session_state.transcription_text:
     display_info("Transcrição pronta para resumo")
     
+    incluir_transcricao = st.checkbox("Incluir a transcrição completa no documento", value=False, key="incluir_transcricao")
     summarize_button = st.button("📄 Gerar Resumo e Documento", key="generate_summary")
     
     if summarize_button:
@@ -1263,20 +1313,46 @@ if st.session_state.transcription_text:
                 # Criar nome de arquivo baseado no nome original
                 file_name = os.path.splitext(os.path.basename(st.session_state.transcription_path)) if st.session_state.transcription_path else ("resumo",)
                 file_name = file_name[0]
-                docx_path = os.path.join(temp_dir, f"{file_name}.docx")
+                docx_path = os.path.join(st.session_state.session_dir, f"{file_name}.docx")
                 
                 # Gerar resumo e documento
-                generator = SummaryGenerator(api_key=config["GOOGLE_API_KEY"])
+                generator = SummaryGenerator(
+                    api_key=config["GOOGLE_API_KEY"],
+                    store=artifact_store,
+                    compression_budget=config.get("COMPRESSAO_TOKENS") or None
+                )
+                
+                # O resumo aparece e entra no documento à medida que o Gemini o gera
+                builder = SummaryDocumentBuilder()
+                preview_placeholder = st.empty()
+                partes_resumo = []
+                
+                def update_summary(parte):
+                    partes_resumo.append(parte)
+                    builder.feed(parte)
+                    preview_placeholder.text("".join(partes_resumo))
                 
                 # Gerar resumo
                 resumo_profissional = generator.gerar_resumo_profissional(
                     st.session_state.transcription_text,
-                    progress_callback=update_progress
+                    progress_callback=update_progress,
+                    on_chunk=update_summary
                 )
+                preview_placeholder.empty()
+                
+                if generator.ultima_compressao:
+                    compressao = generator.ultima_compressao
+                    display_info(
+                        f"Compressão local: {compressao['tokens_originais']} → {compressao['tokens_finais']} tokens "
+                        f"({compressao['taxa']:.0%} do original, {compressao['sentencas_mantidas']} de "
+                        f"{compressao['sentencas_originais']} sentenças)"
+                    )
                 
                 if resumo_profissional:
-                    # Salvar como documento
-                    docx_bytes, docx_path = generator.salvar_como_doc(resumo_profissional, docx_path)
+                    # O documento já foi montado durante o streaming; falta apenas salvar
+                    if incluir_transcricao:
+                        builder.add_transcript(st.session_state.transcription_text)
+                    docx_bytes, docx_path = builder.save(docx_path)
                     
                     if docx_bytes and docx_path:
                         # Salvar o caminho do documento na sessão
@@ -1336,22 +1412,4 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-# Limpar arquivos temporários antigos (mais de 1 hora)
-def clean_temp_files():
-    try:
-        current_time = time.time()
-        for filename in os.listdir(temp_dir):
-            file_path = os.path.join(temp_dir, filename)
-            if os.path.isfile(file_path):
-                # Se o arquivo tem mais de 1 hora
-                if current_time - os.path.getmtime(file_path) > 3600:
-                    try:
-                        os.remove(file_path)
-                    except:
-                        pass
-    except:
-        pass
-
-# Executar limpeza de arquivos temporários
-clean_temp_files()
 
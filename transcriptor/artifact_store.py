@@ -0,0 +1,307 @@
+"""
+Módulo com um armazenamento de artefatos endereçado por conteúdo.
+Cada etapa (extração, transcrição, resumo) guarda o resultado sob uma chave formada pelo
+hash da entrada e pelos parâmetros da etapa, então o mesmo arquivo enviado de novo, por
+qualquer usuário, reaproveita os resultados sem chamar as APIs nem recodificar o áudio.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+# Tamanho máximo padrão do armazenamento antes de remover os artefatos menos usados
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024  # 2 GB
+
+# Tamanho dos blocos lidos ao calcular o hash de um arquivo
+HASH_CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+def hash_file(file_path):
+    """
+    Calcula o SHA-256 de um arquivo lendo-o em blocos.
+
+    Args:
+        file_path (str): Caminho para o arquivo
+
+    Returns:
+        str: Hash em hexadecimal
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def copy_and_hash(source, output_path):
+    """
+    Copia um arquivo aberto para o disco em blocos, calculando o SHA-256 durante a escrita.
+
+    O conteúdo é gravado em um arquivo temporário renomeado no final, então output_path
+    nunca fica com uma cópia incompleta.
+
+    Args:
+        source: Objeto de arquivo binário aberto para leitura (ex: upload do Streamlit)
+        output_path (str): Caminho de destino
+
+    Returns:
+        str: Hash em hexadecimal
+    """
+    digest = hashlib.sha256()
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+    fd, staging_path = tempfile.mkstemp(prefix=".", dir=os.path.dirname(os.path.abspath(output_path)))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for block in iter(lambda: source.read(HASH_CHUNK_SIZE), b""):
+                digest.update(block)
+                f.write(block)
+        os.replace(staging_path, output_path)
+    except Exception:
+        if os.path.exists(staging_path):
+            os.remove(staging_path)
+        raise
+    return digest.hexdigest()
+
+def hash_text(text):
+    """Calcula o SHA-256 de um texto codificado em UTF-8"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+class ArtifactStore:
+    """
+    Armazenamento de artefatos em disco, com remoção dos menos usados (LRU) por tamanho.
+
+    O horário de modificação de cada arquivo guarda o último acesso, então o estado
+    sobrevive a reinícios e é compartilhado por processos que usam o mesmo diretório:
+    uma chave ausente do índice é procurada no disco, e o índice é refeito a partir do
+    disco antes de cada remoção por tamanho.
+    """
+
+    def __init__(self, root, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+        # Índice em memória: chave -> (caminho, tamanho, último acesso)
+        self._index = {}
+        self._scan()
+
+    @staticmethod
+    def make_key(input_hash, **params):
+        """
+        Monta a chave de um artefato a partir do hash da entrada e dos parâmetros da etapa.
+
+        Args:
+            input_hash (str): Hash do conteúdo de entrada
+            **params: Parâmetros que alteram o resultado (modelo, idioma, perfil, versão do prompt...)
+
+        Returns:
+            str: Chave em hexadecimal
+        """
+        payload = json.dumps({"entrada": input_hash, **params}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _scan(self):
+        """Refaz o índice a partir do disco, incluindo os artefatos de outros processos (chamar com o lock)"""
+        index = {}
+        try:
+            entries = list(os.scandir(self.root))
+        except OSError:
+            entries = []
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+            try:
+                if entry.is_file():
+                    stat = entry.stat()
+                    index[os.path.splitext(entry.name)[0]] = (entry.path, stat.st_size, stat.st_mtime)
+            except OSError:
+                pass
+        self._index = index
+
+    def _find_on_disk(self, key):
+        """Procura no disco um artefato que não está no índice, como um guardado por outro processo"""
+        for path in glob.glob(os.path.join(self.root, glob.escape(key) + ".*")):
+            try:
+                return path, os.path.getsize(path)
+            except OSError:
+                pass
+        return None
+
+    def _touch(self, key, path, size):
+        """Registra o acesso a um artefato"""
+        now = time.time()
+        try:
+            os.utime(path, (now, now))
+        except OSError:
+            pass
+        self._index[key] = (path, size, now)
+
+    def get_path(self, key):
+        """
+        Procura um artefato pela chave.
+
+        Returns:
+            str: Caminho do artefato no armazenamento ou None se não existir
+        """
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is not None and not os.path.exists(entry[0]):
+                # Removido ou substituído por outro processo
+                del self._index[key]
+                entry = None
+            if entry is None:
+                found = self._find_on_disk(key)
+                if found is None:
+                    return None
+                path, size = found
+            else:
+                path, size, _ = entry
+
+            self._touch(key, path, size)
+            return path
+
+    def get_file(self, key, output_path):
+        """
+        Copia um artefato para fora do armazenamento, mantendo a extensão com que foi guardado.
+
+        A cópia é independente do artefato (sem link físico), então gravar depois no
+        caminho de saída, como faz o "ffmpeg -y", não altera o conteúdo guardado.
+
+        Args:
+            key (str): Chave do artefato
+            output_path (str): Caminho desejado; a extensão é trocada pela do artefato
+
+        Returns:
+            str: Caminho do arquivo copiado ou None se o artefato não existir
+        """
+        path = self.get_path(key)
+        if path is None:
+            return None
+
+        output_path = os.path.splitext(output_path)[0] + os.path.splitext(path)[1]
+        fd, staging_path = tempfile.mkstemp(prefix=".", dir=os.path.dirname(os.path.abspath(output_path)))
+        os.close(fd)
+        try:
+            shutil.copyfile(path, staging_path)
+            os.replace(staging_path, output_path)
+        except OSError:
+            if os.path.exists(staging_path):
+                os.remove(staging_path)
+            # Removido por outro processo durante a cópia
+            return None
+        return output_path
+
+    def put_file(self, key, source_path):
+        """
+        Guarda uma cópia de um arquivo no armazenamento.
+
+        Args:
+            key (str): Chave do artefato
+            source_path (str): Arquivo a guardar
+
+        Returns:
+            str: Caminho do artefato no armazenamento
+        """
+        path = os.path.join(self.root, key + os.path.splitext(source_path)[1])
+
+        # Copiar para um arquivo temporário e renomear, para nunca expor um artefato incompleto
+        fd, staging_path = tempfile.mkstemp(prefix=".", dir=self.root)
+        os.close(fd)
+        try:
+            shutil.copyfile(source_path, staging_path)
+            os.replace(staging_path, path)
+        except Exception:
+            if os.path.exists(staging_path):
+                os.remove(staging_path)
+            raise
+
+        with self._lock:
+            self._touch(key, path, os.path.getsize(path))
+            self._evict()
+        return path
+
+    def get_text(self, key):
+        """
+        Procura um artefato de texto pela chave.
+
+        Returns:
+            str: Conteúdo do artefato ou None se não existir
+        """
+        path = self.get_path(key)
+        if path is None:
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def put_text(self, key, text):
+        """
+        Guarda um artefato de texto.
+
+        Returns:
+            str: Caminho do artefato no armazenamento
+        """
+        path = os.path.join(self.root, key + ".txt")
+        fd, staging_path = tempfile.mkstemp(prefix=".", dir=self.root)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(staging_path, path)
+
+        with self._lock:
+            self._touch(key, path, os.path.getsize(path))
+            self._evict()
+        return path
+
+    def total_bytes(self):
+        """Retorna o espaço ocupado pelos artefatos, medido no disco"""
+        with self._lock:
+            self._scan()
+            return sum(size for _, size, _ in self._index.values())
+
+    def _evict(self):
+        """Remove os artefatos acessados há mais tempo até caber em max_bytes (chamar com o lock)"""
+        # O uso é medido no disco, que é compartilhado com os outros processos
+        self._scan()
+        total = sum(size for _, size, _ in self._index.values())
+        if total <= self.max_bytes:
+            return
+
+        for key, (path, size, _) in sorted(self._index.items(), key=lambda item: item[1][2]):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            del self._index[key]
+            total -= size
+
+# Um armazenamento por diretório e por processo, compartilhado entre as sessões
+_stores = {}
+_stores_lock = threading.Lock()
+
+def get_artifact_store(root, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Retorna o armazenamento de artefatos de um diretório, criando-o na primeira chamada.
+
+    Args:
+        root (str): Diretório do armazenamento
+        max_bytes (int, optional): Tamanho máximo antes de remover artefatos
+
+    Returns:
+        ArtifactStore: Armazenamento compartilhado pelo processo
+    """
+    with _stores_lock:
+        store = _stores.get(root)
+        if store is None:
+            store = ArtifactStore(root, max_bytes)
+            _stores[root] = store
+        return store
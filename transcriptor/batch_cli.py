@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Processamento em lote de vídeos pela linha de comando, sem Streamlit.
+Extrai o áudio em um pool de processos (etapa que usa CPU) e faz as chamadas ao Groq e ao
+Gemini em um pool de threads com limite próprio de requisições simultâneas. Cada vídeo
+gera uma pasta com o áudio, a transcrição, as legendas e o resumo; vídeos já concluídos são pulados.
+
+Uso:
+    python batch_cli.py videos/ --saida resultados/
+    python batch_cli.py --manifesto lista.txt --saida resultados/ --processos 4 --concorrencia-api 8
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from embedded_ffmpeg import EmbeddedFFmpeg, PERFIS_AUDIO, PERFIL_PADRAO
+
+# Mesmos formatos aceitos pelo upload do app
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv")
+
+# Arquivo gravado na pasta de saída quando todas as etapas de um vídeo terminam
+DONE_MARKER = "concluido.json"
+
+def find_videos(directory):
+    """Lista os vídeos de um diretório e de seus subdiretórios, em ordem"""
+    videos = []
+    for root, dirs, files in os.walk(directory):
+        for file in files:
+            if file.lower().endswith(VIDEO_EXTENSIONS):
+                videos.append(os.path.join(root, file))
+    return sorted(videos)
+
+def read_manifest(manifest_path):
+    """
+    Lê um manifesto com um caminho de vídeo por linha.
+    Linhas vazias e iniciadas por # são ignoradas; caminhos relativos partem do diretório do manifesto.
+    """
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    videos = []
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                videos.append(os.path.join(base_dir, line))
+    return videos
+
+def output_dir_for(video_path, output_root):
+    """Pasta de saída de um vídeo: nome do arquivo mais um hash do caminho, para não colidir"""
+    stem = os.path.splitext(os.path.basename(video_path))[0]
+    suffix = hashlib.sha1(os.path.abspath(video_path).encode("utf-8")).hexdigest()[:8]
+    return os.path.join(output_root, f"{stem}_{suffix}")
+
+def load_api_keys(config_path=None):
+    """Lê as chaves das variáveis de ambiente, sobrescritas pelo arquivo de configuração se houver"""
+    keys = {
+        "GROQ_API_KEY": os.environ.get("GROQ_API_KEY"),
+        "GOOGLE_API_KEY": os.environ.get("GOOGLE_API_KEY")
+    }
+    if config_path:
+        with open(config_path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+        keys.update({name: value for name, value in config.items() if value})
+    return keys
+
+def extract_stage(video_path, output_dir, perfil, cache_dir):
+    """Extrai o áudio de um vídeo (executado no pool de processos)"""
+    from processing import AudioExtractor
+    from artifact_store import get_artifact_store
+
+    os.makedirs(output_dir, exist_ok=True)
+    store = get_artifact_store(cache_dir) if cache_dir else None
+    return AudioExtractor.extract_audio(video_path, os.path.join(output_dir, "audio"), perfil, store=store)
+
+def api_stage(video_path, output_dir, audio_path, keys, api_semaphore, max_workers, cache_dir, with_summary,
+              compression_budget=None):
+    """
+    Transcreve o áudio e gera o resumo (executado no pool de threads).
+
+    Returns:
+        float: Duração do áudio processado em segundos
+    """
+    from processing import GroqTranscriber, SummaryGenerator
+    from artifact_store import get_artifact_store
+
+    store = get_artifact_store(cache_dir) if cache_dir else None
+
+    transcriber = GroqTranscriber(
+        api_key=keys["GROQ_API_KEY"],
+        max_workers=max_workers,
+        store=store,
+        api_semaphore=api_semaphore,
+        work_dir=output_dir
+    )
+    transcription, _ = transcriber.transcribe(audio_path, output_path=os.path.join(output_dir, "transcricao.txt"))
+    if not transcription or transcriber.failed_chunks:
+        raise RuntimeError("transcrição incompleta")
+    if transcriber.ultimo_indice:
+        with open(os.path.join(output_dir, "transcricao.srt"), "w", encoding="utf-8") as f:
+            f.write(transcriber.ultimo_indice.to_srt())
+        with open(os.path.join(output_dir, "transcricao.vtt"), "w", encoding="utf-8") as f:
+            f.write(transcriber.ultimo_indice.to_vtt())
+
+    if with_summary:
+        generator = SummaryGenerator(
+            api_key=keys["GOOGLE_API_KEY"],
+            store=store,
+            api_semaphore=api_semaphore,
+            compression_budget=compression_budget
+        )
+        resumo = generator.gerar_resumo_profissional(transcription)
+        if not resumo:
+            raise RuntimeError("falha ao gerar o resumo")
+        with open(os.path.join(output_dir, "resumo.txt"), "w", encoding="utf-8") as f:
+            f.write(resumo)
+        docx_bytes, _ = generator.salvar_como_doc(resumo, os.path.join(output_dir, "resumo.docx"))
+        if not docx_bytes:
+            raise RuntimeError("falha ao salvar o documento")
+
+    duration = EmbeddedFFmpeg.get_duration(audio_path) or 0.0
+    with open(os.path.join(output_dir, DONE_MARKER), "w", encoding="utf-8") as f:
+        json.dump({
+            "video": os.path.abspath(video_path),
+            "audio": os.path.basename(audio_path),
+            "duracao_audio": duration,
+            "resumo": with_summary,
+            "concluido_em": datetime.now().isoformat(timespec="seconds")
+        }, f, ensure_ascii=False, indent=2)
+    return duration
+
+def print_summary(stats, elapsed):
+    """Mostra o resumo de desempenho do lote"""
+    audio_hours = stats["audio_segundos"] / 3600
+    print("\n=== Resumo do lote ===")
+    print(f"Vídeos processados: {stats['concluidos']}")
+    print(f"Vídeos pulados (já concluídos): {stats['pulados']}")
+    print(f"Vídeos com falha: {stats['falhas']}")
+    print(f"Tempo total: {elapsed:.1f}s")
+    print(f"Áudio processado: {audio_hours:.2f} h")
+    print(f"Dados de entrada: {stats['bytes_entrada'] / (1024 * 1024):.1f} MB")
+    if elapsed > 0:
+        print(f"Vazão: {stats['concluidos'] * 3600 / elapsed:.1f} vídeos/h, "
+              f"{stats['audio_segundos'] / elapsed:.1f}x o tempo real, "
+              f"{stats['bytes_entrada'] / (1024 * 1024) / elapsed:.2f} MB/s")
+
+def run_batch(videos, output_root, processes=2, api_concurrency=4, perfil=PERFIL_PADRAO,
+              keys=None, cache_dir=None, with_summary=True, compression_budget=None):
+    """
+    Processa uma lista de vídeos.
+
+    Args:
+        videos (list): Caminhos dos vídeos
+        output_root (str): Diretório das pastas de saída
+        processes (int): Processos para a extração de áudio
+        api_concurrency (int): Máximo de requisições simultâneas às APIs
+        perfil (str): Perfil de extração em PERFIS_AUDIO
+        keys (dict): Chaves GROQ_API_KEY e GOOGLE_API_KEY
+        cache_dir (str, optional): Diretório do armazenamento de artefatos
+        with_summary (bool): Se deve gerar o resumo e o documento
+        compression_budget (int, optional): Orçamento de tokens da compressão local antes do resumo
+
+    Returns:
+        dict: Estatísticas do lote
+    """
+    stats = {"concluidos": 0, "pulados": 0, "falhas": 0, "audio_segundos": 0.0, "bytes_entrada": 0}
+    api_semaphore = threading.BoundedSemaphore(api_concurrency)
+
+    pending = []
+    for video_path in videos:
+        output_dir = output_dir_for(video_path, output_root)
+        if os.path.exists(os.path.join(output_dir, DONE_MARKER)):
+            stats["pulados"] += 1
+            continue
+        if not os.path.exists(video_path):
+            print(f"Erro: vídeo não encontrado: {video_path}", file=sys.stderr)
+            stats["falhas"] += 1
+            continue
+        pending.append((video_path, output_dir))
+
+    print(f"{len(pending)} vídeo(s) para processar, {stats['pulados']} já concluído(s).")
+
+    with ProcessPoolExecutor(max_workers=processes) as process_pool, \
+            ThreadPoolExecutor(max_workers=api_concurrency, thread_name_prefix="lote-api") as api_pool:
+        extract_futures = {
+            process_pool.submit(extract_stage, video_path, output_dir, perfil, cache_dir): (video_path, output_dir)
+            for video_path, output_dir in pending
+        }
+
+        # Cada áudio extraído segue para as APIs enquanto os outros vídeos ainda são extraídos
+        api_futures = {}
+        for future in as_completed(extract_futures):
+            video_path, output_dir = extract_futures[future]
+            try:
+                audio_path = future.result()
+            except Exception as e:
+                audio_path = None
+                print(f"Erro ao extrair áudio de {video_path}: {str(e)}", file=sys.stderr)
+            if not audio_path:
+                stats["falhas"] += 1
+                continue
+
+            print(f"Áudio extraído: {video_path}")
+            api_futures[api_pool.submit(
+                api_stage, video_path, output_dir, audio_path, keys,
+                api_semaphore, api_concurrency, cache_dir, with_summary, compression_budget
+            )] = video_path
+
+        for future in as_completed(api_futures):
+            video_path = api_futures[future]
+            try:
+                stats["audio_segundos"] += future.result()
+                stats["bytes_entrada"] += os.path.getsize(video_path)
+                stats["concluidos"] += 1
+                print(f"Concluído: {video_path}")
+            except Exception as e:
+                stats["falhas"] += 1
+                print(f"Erro ao processar {video_path}: {str(e)}", file=sys.stderr)
+
+    return stats
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extrai, transcreve e resume vídeos em lote.")
+    parser.add_argument("diretorio", nargs="?", help="Diretório com os vídeos")
+    parser.add_argument("--manifesto", help="Arquivo com um caminho de vídeo por linha")
+    parser.add_argument("--saida", required=True, help="Diretório das pastas de saída")
+    parser.add_argument("--processos", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="Processos para a extração de áudio")
+    parser.add_argument("--concorrencia-api", type=int, default=4,
+                        help="Máximo de requisições simultâneas ao Groq e ao Gemini")
+    parser.add_argument("--perfil", choices=list(PERFIS_AUDIO.keys()), default=PERFIL_PADRAO,
+                        help="Perfil de extração de áudio")
+    parser.add_argument("--config", help="Arquivo JSON com GROQ_API_KEY e GOOGLE_API_KEY")
+    parser.add_argument("--cache", help="Diretório do armazenamento de artefatos, para reaproveitar resultados")
+    parser.add_argument("--sem-resumo", action="store_true", help="Apenas extrai e transcreve")
+    parser.add_argument("--compressao", type=int, default=None,
+                        help="Comprime a transcrição localmente até este número de tokens antes do resumo")
+    args = parser.parse_args(argv)
+
+    if not args.diretorio and not args.manifesto:
+        parser.error("informe um diretório ou --manifesto")
+
+    videos = read_manifest(args.manifesto) if args.manifesto else find_videos(args.diretorio)
+    keys = load_api_keys(args.config)
+    if not keys.get("GROQ_API_KEY") or (not args.sem_resumo and not keys.get("GOOGLE_API_KEY")):
+        parser.error("defina GROQ_API_KEY e GOOGLE_API_KEY no ambiente ou em --config")
+
+    os.makedirs(args.saida, exist_ok=True)
+    start = time.monotonic()
+    stats = run_batch(
+        videos,
+        args.saida,
+        processes=args.processos,
+        api_concurrency=args.concorrencia_api,
+        perfil=args.perfil,
+        keys=keys,
+        cache_dir=args.cache,
+        with_summary=not args.sem_resumo,
+        compression_budget=args.compressao
+    )
+    print_summary(stats, time.monotonic() - start)
+    return 1 if stats["falhas"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Compara a vazão (MB/s de texto) da extração de palavras-chave interna com o caminho
+anterior baseado no NLTK (tokenizador de sentenças + Treebank + FreqDist), e confere se
+os resultados coincidem.
+
+Uso:
+    python benchmark_nlp.py                      # texto sintético de 20 MB
+    python benchmark_nlp.py --tamanho 50         # texto sintético de 50 MB
+    python benchmark_nlp.py transcricao.txt      # texto de um arquivo
+"""
+
+import argparse
+import importlib.util
+import random
+import sys
+import time
+
+from nlp_resources import extract_keywords, get_sentence_tokenizer, get_stopwords
+
+# Frases usadas para montar o texto sintético, com pontuação, números e hífens
+FRASES = [
+    "Bom dia a todos, vamos começar a reunião de planejamento do segundo trimestre.",
+    "O orçamento previsto para o projeto é de 1,5 milhão de reais, segundo a diretoria.",
+    "Então, né, a gente precisa revisar o cronograma com os fornecedores até sexta-feira.",
+    "A auditoria encontrou três problemas no processo de compras; dois já foram corrigidos.",
+    "Qual é o prazo para a entrega do relatório? Precisamos dele antes da assembleia!",
+    "O treinamento da equipe de segurança foi remarcado para o dia 12 de março.",
+    "Como eu disse, o guarda-chuva corporativo cobre os contratos de manutenção.",
+    "As vendas cresceram 3.5% em relação ao mesmo período do ano passado.",
+]
+
+def make_text(size_mb, seed=42):
+    """Monta um texto sintético de aproximadamente size_mb megabytes"""
+    rng = random.Random(seed)
+    target = int(size_mb * 1024 * 1024)
+    parts = []
+    total = 0
+    while total < target:
+        frase = rng.choice(FRASES)
+        parts.append(frase)
+        total += len(frase.encode("utf-8")) + 1
+    return " ".join(parts)
+
+def keywords_nltk(text, top_n=10):
+    """Caminho anterior: sentenças + NLTKWordTokenizer + FreqDist"""
+    from nltk.tokenize import NLTKWordTokenizer
+    from nltk.probability import FreqDist
+
+    word_tokenizer = NLTKWordTokenizer()
+    stop_words = get_stopwords()
+    words = [
+        word
+        for sentence in get_sentence_tokenizer().tokenize(text.lower())
+        for word in word_tokenizer.tokenize(sentence)
+        if word.isalnum() and word not in stop_words
+    ]
+    return words, FreqDist(words).most_common(top_n)
+
+def measure(func, text, repeat):
+    """Executa func(text) repeat vezes e retorna o melhor tempo e o último resultado"""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(text)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede a vazão da extração de palavras-chave.")
+    parser.add_argument("arquivo", nargs="?", help="Arquivo de texto (padrão: texto sintético)")
+    parser.add_argument("--tamanho", type=float, default=20, help="Tamanho do texto sintético em MB")
+    parser.add_argument("--repeticoes", type=int, default=3, help="Execuções de cada método (vale a melhor)")
+    args = parser.parse_args(argv)
+
+    if args.arquivo:
+        with open(args.arquivo, "r", encoding="utf-8") as f:
+            text = f.read()
+    else:
+        text = make_text(args.tamanho)
+    size_mb = len(text.encode("utf-8")) / (1024 * 1024)
+    print(f"Texto: {size_mb:.1f} MB")
+
+    # Carregar os recursos antes de medir
+    get_sentence_tokenizer()
+    get_stopwords()
+
+    elapsed, (words, keywords) = measure(extract_keywords, text, args.repeticoes)
+    print(f"Interno (regex + Counter): {elapsed:.2f}s, {size_mb / elapsed:.1f} MB/s")
+
+    if importlib.util.find_spec("nltk") is None:
+        print("NLTK não instalado; comparação não realizada.")
+        return 0
+
+    elapsed_nltk, (words_nltk, keywords_nltk_) = measure(keywords_nltk, text, args.repeticoes)
+    print(f"NLTK (Treebank + FreqDist): {elapsed_nltk:.2f}s, {size_mb / elapsed_nltk:.1f} MB/s")
+    print(f"Aceleração: {elapsed_nltk / elapsed:.1f}x")
+
+    same_keywords = keywords == keywords_nltk_
+    same_words = words == words_nltk
+    print(f"Palavras-chave iguais: {'sim' if same_keywords else 'não'}")
+    print(f"Palavras significativas iguais: {'sim' if same_words else 'não'} "
+          f"({len(words)} no interno, {len(words_nltk)} no NLTK)")
+    return 0 if same_keywords else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
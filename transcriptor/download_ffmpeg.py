@@ -2,19 +2,44 @@
 """
 Script para baixar versões estáticas do FFmpeg para diferentes sistemas operacionais.
 Este script baixa e configura o FFmpeg para ser embutido no aplicativo.
+
+A instalação é segura com vários processos (workers do Streamlit) iniciando juntos:
+um lock entre processos garante um único download, o pacote é baixado e extraído em um
+diretório temporário dentro de ffmpeg_bin, o checksum é verificado e os binários só
+então são renomeados para o lugar, então nenhum processo executa um ffmpeg incompleto.
+
+Pacotes baixados da rede só são instalados com um checksum (FFMPEG_SHA256, um arquivo
+.sha256/.md5 publicado junto do pacote ou o checksum da origem). Sem checksum, só os
+pacotes colocados no espelho local ou em ffmpeg_archives/ são aceitos, conferindo
+apenas se o ffmpeg executa.
+
+Variáveis de ambiente:
+    FFMPEG_MIRROR   Diretório com os pacotes já baixados ou URL base de um espelho
+    FFMPEG_OFFLINE  Com "1", nunca baixa da internet (usa só o espelho e ffmpeg_archives/)
+    FFMPEG_SHA256   SHA-256 esperado do pacote do sistema atual
 """
 
+import hashlib
 import os
 import platform
 import shutil
 import subprocess
 import sys
+import tempfile
+import time
 import zipfile
 import tarfile
 import urllib.request
+from contextlib import contextmanager
 from pathlib import Path
 
-FFMPEG_DIR = "ffmpeg_bin"
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Caminho absoluto: o diretório de trabalho do Streamlit nem sempre é o do script
+FFMPEG_DIR = os.path.join(SCRIPT_DIR, "ffmpeg_bin")
+
+# Diretório com pacotes pré-baixados (por exemplo, copiados na imagem do servidor)
+ARCHIVE_DIR = os.path.join(SCRIPT_DIR, "ffmpeg_archives")
 
 # URLs para versões estáticas do FFmpeg
 FFMPEG_URLS = {
@@ -23,6 +48,31 @@ FFMPEG_URLS = {
     "Darwin": "https://evermeet.cx/ffmpeg/getrelease/ffmpeg/zip"  # macOS
 }
 
+# Nome do pacote de cada sistema no espelho e em ARCHIVE_DIR
+ARCHIVE_NAMES = {
+    "Windows": "ffmpeg-master-latest-win64-gpl.zip",
+    "Linux": "ffmpeg-release-amd64-static.tar.xz",
+    "Darwin": "ffmpeg-macos.zip"
+}
+
+# Checksums publicados junto dos pacotes: (URL, algoritmo)
+CHECKSUM_URLS = {
+    "Windows": ("https://github.com/BtbN/FFmpeg-Builds/releases/download/latest/checksums.sha256", "sha256"),
+    "Linux": (FFMPEG_URLS["Linux"] + ".md5", "md5")
+}
+
+# Tempo máximo de cada operação de rede, para um servidor sem internet não ficar parado
+DOWNLOAD_TIMEOUT = 20  # segundos
+
+# Tempo máximo esperando outro processo terminar a instalação
+LOCK_TIMEOUT = 600  # segundos
+
+# Depois de uma falha de download, os processos não tentam a rede de novo por este tempo
+FAILURE_BACKOFF = 600  # segundos
+
+LOCK_FILE = ".instalacao.lock"
+FAILURE_FILE = ".falha_download"
+
 def ensure_dir(directory):
     """Garante que o diretório existe"""
     os.makedirs(directory, exist_ok=True)
@@ -36,129 +86,337 @@ def get_current_os():
         sys.exit(1)
     return system
 
+@contextmanager
+def file_lock(lock_path, timeout=LOCK_TIMEOUT):
+    """
+    Lock exclusivo entre processos, baseado em um arquivo.
+
+    Args:
+        lock_path (str): Caminho do arquivo de lock
+        timeout (float, optional): Tempo máximo de espera em segundos
+
+    Raises:
+        TimeoutError: Se o lock não for obtido dentro do tempo
+    """
+    ensure_dir(os.path.dirname(lock_path))
+    with open(lock_path, "a+b") as f:
+        if os.name == "nt":
+            import msvcrt
+            def try_lock():
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            def unlock():
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            def try_lock():
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            def unlock():
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                try_lock()
+                break
+            except OSError:
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"Tempo esgotado esperando o lock {lock_path}")
+                time.sleep(0.2)
+        try:
+            yield
+        finally:
+            unlock()
+
+def file_digest(file_path, algorithm="sha256"):
+    """Calcula o hash de um arquivo lendo-o em blocos"""
+    digest = hashlib.new(algorithm)
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def parse_checksum(text, archive_name):
+    """
+    Lê o hash de um arquivo de checksums ("<hash>  <arquivo>" por linha, ou só o hash).
+
+    Returns:
+        str: Hash em hexadecimal ou None se o pacote não estiver listado
+    """
+    for line in text.splitlines():
+        parts = line.strip().split()
+        if len(parts) == 1:
+            return parts[0].lower()
+        if len(parts) >= 2 and os.path.basename(parts[-1].lstrip("*")) == archive_name:
+            return parts[0].lower()
+    return None
+
 def download_file(url, destination):
-    """Baixa um arquivo da URL especificada para o destino"""
+    """
+    Baixa um arquivo da URL especificada para o destino.
+
+    O conteúdo é gravado em um arquivo ".part" renomeado no final, então o destino nunca
+    fica com um download incompleto. Cada operação de rede tem o limite DOWNLOAD_TIMEOUT.
+
+    Returns:
+        str: Caminho do arquivo baixado ou None em caso de erro
+    """
     print(f"Baixando de {url}...")
+    partial_path = destination + ".part"
     try:
-        urllib.request.urlretrieve(url, destination)
+        with urllib.request.urlopen(url, timeout=DOWNLOAD_TIMEOUT) as response, open(partial_path, "wb") as f:
+            shutil.copyfileobj(response, f, 1024 * 1024)
+        os.replace(partial_path, destination)
         print(f"Download concluído: {destination}")
         return destination
     except Exception as e:
         print(f"Erro ao baixar: {str(e)}")
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        return None
+
+def _read_url(url):
+    """Conteúdo de uma URL pequena (arquivo de checksums), ou None"""
+    try:
+        with urllib.request.urlopen(url, timeout=DOWNLOAD_TIMEOUT) as response:
+            return response.read().decode("utf-8", errors="replace")
+    except Exception as e:
+        print(f"Erro ao baixar o checksum: {str(e)}")
         return None
 
-def extract_windows_ffmpeg(zip_path, output_dir):
-    """Extrai o FFmpeg para Windows do arquivo zip"""
+def _write_executable(source, destination):
+    """Copia um binário aberto para o destino e o torna executável"""
+    with open(destination, "wb") as f:
+        shutil.copyfileobj(source, f, 1024 * 1024)
+    os.chmod(destination, 0o755)
+
+def extract_windows_ffmpeg(zip_path, destino=FFMPEG_DIR):
+    """Extrai os executáveis da pasta bin do pacote zip do FFmpeg para Windows"""
     with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-        zip_ref.extractall(output_dir)
-    
-    # Encontrar o executável ffmpeg.exe e movê-lo para o diretório final
-    for root, dirs, files in os.walk(output_dir):
-        if "bin" in dirs:
-            bin_dir = os.path.join(root, "bin")
-            for file in os.listdir(bin_dir):
-                if file.endswith(".exe"):
-                    src = os.path.join(bin_dir, file)
-                    dst = os.path.join(FFMPEG_DIR, file)
-                    shutil.copy2(src, dst)
-                    print(f"Copiado {file} para {FFMPEG_DIR}")
-    
-    # Limpar arquivos temporários
-    shutil.rmtree(output_dir)
-
-def extract_linux_ffmpeg(tar_path, output_dir):
-    """Extrai o FFmpeg para Linux do arquivo tar.xz"""
+        for member in zip_ref.namelist():
+            parts = member.split("/")
+            if len(parts) >= 2 and parts[-2] == "bin" and parts[-1].endswith(".exe"):
+                with zip_ref.open(member) as source:
+                    _write_executable(source, os.path.join(destino, parts[-1]))
+                print(f"Extraído {parts[-1]}")
+
+def extract_linux_ffmpeg(tar_path, destino=FFMPEG_DIR):
+    """Extrai apenas o ffmpeg e o ffprobe do pacote tar.xz do FFmpeg para Linux"""
     with tarfile.open(tar_path, 'r:xz') as tar_ref:
-        tar_ref.extractall(output_dir)
-    
-    # Encontrar o binário ffmpeg e copiá-lo para o diretório final
-    for root, dirs, files in os.walk(output_dir):
-        if "ffmpeg" in files:
-            src = os.path.join(root, "ffmpeg")
-            dst = os.path.join(FFMPEG_DIR, "ffmpeg")
-            shutil.copy2(src, dst)
-            # Tornar o arquivo executável
-            os.chmod(dst, 0o755)
-            print(f"Copiado ffmpeg para {FFMPEG_DIR}")
-        if "ffprobe" in files:
-            src = os.path.join(root, "ffprobe")
-            dst = os.path.join(FFMPEG_DIR, "ffprobe")
-            shutil.copy2(src, dst)
-            # Tornar o arquivo executável
-            os.chmod(dst, 0o755)
-            print(f"Copiado ffprobe para {FFMPEG_DIR}")
-    
-    # Limpar arquivos temporários
-    shutil.rmtree(output_dir)
-
-def extract_macos_ffmpeg(zip_path, output_dir):
+        for member in tar_ref:
+            name = os.path.basename(member.name)
+            if member.isfile() and name in ("ffmpeg", "ffprobe"):
+                _write_executable(tar_ref.extractfile(member), os.path.join(destino, name))
+                print(f"Extraído {name}")
+
+def extract_macos_ffmpeg(zip_path, destino=FFMPEG_DIR):
     """Extrai o FFmpeg para macOS do arquivo zip"""
     with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-        zip_ref.extractall(output_dir)
-    
-    # Copiar o binário ffmpeg para o diretório final
-    for file in os.listdir(output_dir):
-        if file.startswith("ffmpeg"):
-            src = os.path.join(output_dir, file)
-            dst = os.path.join(FFMPEG_DIR, "ffmpeg")
-            shutil.copy2(src, dst)
-            # Tornar o arquivo executável
-            os.chmod(dst, 0o755)
-            print(f"Copiado ffmpeg para {FFMPEG_DIR}")
-    
-    # Limpar arquivos temporários
-    shutil.rmtree(output_dir)
+        for member in zip_ref.namelist():
+            if os.path.basename(member).startswith("ffmpeg") and not member.endswith("/"):
+                with zip_ref.open(member) as source:
+                    _write_executable(source, os.path.join(destino, "ffmpeg"))
+                print("Extraído ffmpeg")
 
-def download_ffmpeg_for_current_os():
-    """Baixa o FFmpeg para o sistema operacional atual"""
-    os_name = get_current_os()
+EXTRACTORS = {
+    "Windows": extract_windows_ffmpeg,
+    "Linux": extract_linux_ffmpeg,
+    "Darwin": extract_macos_ffmpeg
+}
+
+def is_offline():
+    """True se FFMPEG_OFFLINE estiver ligada"""
+    return os.environ.get("FFMPEG_OFFLINE", "").lower() in ("1", "true", "sim")
+
+def _recent_failure():
+    """True se um download falhou há menos de FAILURE_BACKOFF segundos"""
+    try:
+        return time.time() - os.path.getmtime(os.path.join(FFMPEG_DIR, FAILURE_FILE)) < FAILURE_BACKOFF
+    except OSError:
+        return False
+
+def _find_local_archive(os_name):
+    """Procura o pacote no espelho local (FFMPEG_MIRROR) e em ARCHIVE_DIR"""
+    mirror = os.environ.get("FFMPEG_MIRROR", "")
+    for directory in (mirror, ARCHIVE_DIR):
+        if directory and os.path.isdir(directory):
+            archive_path = os.path.join(directory, ARCHIVE_NAMES[os_name])
+            if os.path.exists(archive_path):
+                return archive_path
+    return None
+
+def _expected_checksum(os_name, archive_path, source_url=None):
+    """
+    Checksum esperado do pacote: FFMPEG_SHA256, um arquivo .sha256/.md5 ao lado do
+    pacote ou, para pacotes baixados, o publicado pela origem (CHECKSUM_URLS) ou o
+    arquivo .sha256/.md5 ao lado do pacote no espelho HTTP.
+
+    Args:
+        os_name (str): "Windows", "Linux" ou "Darwin"
+        archive_path (str): Caminho do pacote no disco
+        source_url (str, optional): URL de onde o pacote foi baixado
+
+    Returns:
+        tuple: (algoritmo, hash) ou None se não houver checksum disponível
+    """
+    if os_name == platform.system() and os.environ.get("FFMPEG_SHA256"):
+        return "sha256", os.environ["FFMPEG_SHA256"].strip().lower()
+
+    archive_name = ARCHIVE_NAMES[os_name]
+    for algorithm in ("sha256", "md5"):
+        sidecar_path = archive_path + "." + algorithm
+        if os.path.exists(sidecar_path):
+            with open(sidecar_path, "r", encoding="utf-8") as f:
+                expected = parse_checksum(f.read(), archive_name)
+            if expected:
+                return algorithm, expected
+
+    if source_url is None:
+        return None
+    if source_url == FFMPEG_URLS[os_name]:
+        published = [CHECKSUM_URLS[os_name]] if os_name in CHECKSUM_URLS else []
+    else:
+        published = [(source_url + "." + algorithm, algorithm) for algorithm in ("sha256", "md5")]
+    for url, algorithm in published:
+        text = _read_url(url)
+        expected = parse_checksum(text, os.path.basename(FFMPEG_URLS[os_name])) if text else None
+        if not expected and text:
+            expected = parse_checksum(text, archive_name)
+        if expected:
+            return algorithm, expected
+    return None
+
+def _installed(os_name):
+    """True se o ffmpeg do sistema informado já está em FFMPEG_DIR"""
+    executable = "ffmpeg.exe" if os_name == "Windows" else "ffmpeg"
+    return os.path.exists(os.path.join(FFMPEG_DIR, executable))
+
+def _obtain_archive(os_name, staging_dir):
+    """
+    Obtém o pacote do FFmpeg: do espelho local, de ARCHIVE_DIR, de um espelho HTTP ou
+    da URL oficial, nessa ordem. A rede não é usada em modo offline nem logo depois
+    de uma falha de download.
+
+    Returns:
+        tuple: (caminho do pacote, URL de onde foi baixado ou None se é um pacote local);
+            (None, None) se não foi possível obter o pacote
+    """
+    archive_path = _find_local_archive(os_name)
+    if archive_path:
+        print(f"Usando o pacote local {archive_path}")
+        return archive_path, None
+
+    if is_offline():
+        print("Modo offline (FFMPEG_OFFLINE): nenhum pacote local do FFmpeg encontrado.")
+        return None, None
+    if _recent_failure():
+        print("O download do FFmpeg falhou há pouco tempo; não tentando de novo agora.")
+        return None, None
+
+    mirror = os.environ.get("FFMPEG_MIRROR", "")
     url = FFMPEG_URLS[os_name]
-    temp_dir = ensure_dir(os.path.join("temp", os_name))
-    
-    print(f"Baixando FFmpeg para {os_name}...")
-    
-    # Criar diretório para os binários do FFmpeg
+    if mirror and not os.path.isdir(mirror):
+        url = mirror.rstrip("/") + "/" + ARCHIVE_NAMES[os_name]
+
+    archive_path = download_file(url, os.path.join(staging_dir, ARCHIVE_NAMES[os_name]))
+    if archive_path is None:
+        _mark_failure()
+        return None, None
+    return archive_path, url
+
+def _mark_failure():
+    """Registra uma falha de download, para os processos não tentarem a rede de novo logo em seguida"""
+    Path(os.path.join(FFMPEG_DIR, FAILURE_FILE)).touch()
+
+def _verify_binary(ffmpeg_path):
+    """Confere se o ffmpeg extraído executa"""
+    try:
+        subprocess.run([ffmpeg_path, "-version"], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=30)
+        return True
+    except (OSError, subprocess.SubprocessError) as e:
+        print(f"O ffmpeg extraído não executa: {str(e)}")
+        return False
+
+def install_ffmpeg(os_name):
+    """
+    Instala o FFmpeg de um sistema operacional em FFMPEG_DIR.
+
+    Só um processo instala por vez; quem espera o lock encontra o FFmpeg já instalado
+    e retorna sem baixar de novo. Os binários são extraídos em um diretório temporário
+    dentro de FFMPEG_DIR e renomeados para o lugar só depois das verificações.
+
+    Args:
+        os_name (str): "Windows", "Linux" ou "Darwin"
+
+    Returns:
+        bool: True se o FFmpeg está instalado ao final
+    """
     ensure_dir(FFMPEG_DIR)
-    
-    if os_name == "Windows":
-        zip_path = os.path.join(temp_dir, "ffmpeg.zip")
-        download_file(url, zip_path)
-        extract_windows_ffmpeg(zip_path, temp_dir)
-    
-    elif os_name == "Linux":
-        tar_path = os.path.join(temp_dir, "ffmpeg.tar.xz")
-        download_file(url, tar_path)
-        extract_linux_ffmpeg(tar_path, temp_dir)
-    
-    elif os_name == "Darwin":  # macOS
-        zip_path = os.path.join(temp_dir, "ffmpeg.zip")
-        download_file(url, zip_path)
-        extract_macos_ffmpeg(zip_path, temp_dir)
+    try:
+        with file_lock(os.path.join(FFMPEG_DIR, LOCK_FILE)):
+            if _installed(os_name):
+                return True
+
+            # Diretórios temporários deixados por um processo interrompido
+            for name in os.listdir(FFMPEG_DIR):
+                if name.startswith(".staging-"):
+                    shutil.rmtree(os.path.join(FFMPEG_DIR, name), ignore_errors=True)
+
+            print(f"Baixando FFmpeg para {os_name}...")
+            staging_dir = tempfile.mkdtemp(prefix=".staging-", dir=FFMPEG_DIR)
+            try:
+                archive_path, source_url = _obtain_archive(os_name, staging_dir)
+                if archive_path is None:
+                    return False
+
+                checksum = _expected_checksum(os_name, archive_path, source_url)
+                if checksum:
+                    algorithm, expected = checksum
+                    actual = file_digest(archive_path, algorithm)
+                    if actual != expected:
+                        print(f"Checksum inválido para {archive_path}: esperado {expected}, obtido {actual}")
+                        return False
+                    print(f"Checksum {algorithm} verificado.")
+                elif source_url is not None:
+                    # Pacote da rede sem checksum: não instalar um binário não verificado
+                    print(f"Nenhum checksum disponível para {source_url}; o pacote não será instalado. "
+                          "Defina FFMPEG_SHA256 ou coloque o pacote em ffmpeg_archives/ ou no FFMPEG_MIRROR.")
+                    _mark_failure()
+                    return False
+                else:
+                    print(f"Nenhum checksum disponível para o pacote local {archive_path}; verificando apenas a execução.")
+
+                binaries_dir = ensure_dir(os.path.join(staging_dir, "bin"))
+                EXTRACTORS[os_name](archive_path, binaries_dir)
+                binaries = os.listdir(binaries_dir)
+                if not binaries:
+                    print(f"Nenhum executável do FFmpeg encontrado em {archive_path}")
+                    return False
+
+                executable = "ffmpeg.exe" if os_name == "Windows" else "ffmpeg"
+                if os_name == platform.system() and not _verify_binary(os.path.join(binaries_dir, executable)):
+                    return False
+
+                # O ffmpeg por último: quem encontra o ffmpeg já encontra o ffprobe no lugar
+                for name in sorted(binaries, key=lambda name: name.startswith("ffmpeg.") or name == "ffmpeg"):
+                    os.replace(os.path.join(binaries_dir, name), os.path.join(FFMPEG_DIR, name))
+                    print(f"Instalado {name} em {FFMPEG_DIR}")
+                return True
+            finally:
+                shutil.rmtree(staging_dir, ignore_errors=True)
+    except TimeoutError as e:
+        print(str(e))
+        return _installed(os_name)
+
+def download_ffmpeg_for_current_os():
+    """Baixa o FFmpeg para o sistema operacional atual"""
+    return install_ffmpeg(get_current_os())
 
 def download_all_ffmpeg():
     """Baixa o FFmpeg para todos os sistemas operacionais suportados"""
-    # Criar diretório para os binários do FFmpeg
-    ensure_dir(FFMPEG_DIR)
-    
-    for os_name, url in FFMPEG_URLS.items():
-        temp_dir = ensure_dir(os.path.join("temp", os_name))
-        
-        print(f"Baixando FFmpeg para {os_name}...")
-        
-        if os_name == "Windows":
-            zip_path = os.path.join(temp_dir, "ffmpeg.zip")
-            if download_file(url, zip_path):
-                extract_windows_ffmpeg(zip_path, temp_dir)
-        
-        elif os_name == "Linux":
-            tar_path = os.path.join(temp_dir, "ffmpeg.tar.xz")
-            if download_file(url, tar_path):
-                extract_linux_ffmpeg(tar_path, temp_dir)
-        
-        elif os_name == "Darwin":  # macOS
-            zip_path = os.path.join(temp_dir, "ffmpeg.zip")
-            if download_file(url, zip_path):
-                extract_macos_ffmpeg(zip_path, temp_dir)
+    for os_name in FFMPEG_URLS:
+        install_ffmpeg(os_name)
 
 def show_help():
     """Mostra ajuda sobre o uso do script"""
@@ -170,36 +428,27 @@ def show_help():
     print("  --windows   : Baixa apenas o FFmpeg para Windows")
     print("  --linux     : Baixa apenas o FFmpeg para Linux")
     print("  --macos     : Baixa apenas o FFmpeg para macOS")
+    print("Variáveis de ambiente: FFMPEG_MIRROR, FFMPEG_OFFLINE, FFMPEG_SHA256 (veja o início do script)")
 
 if __name__ == "__main__":
     if len(sys.argv) > 1:
         option = sys.argv[1].lower()
-        
+
         if option == "--help":
             show_help()
         elif option == "--all":
             download_all_ffmpeg()
+        elif option == "--current":
+            download_ffmpeg_for_current_os()
         elif option == "--windows":
-            ensure_dir(FFMPEG_DIR)
-            temp_dir = ensure_dir(os.path.join("temp", "Windows"))
-            zip_path = os.path.join(temp_dir, "ffmpeg.zip")
-            if download_file(FFMPEG_URLS["Windows"], zip_path):
-                extract_windows_ffmpeg(zip_path, temp_dir)
+            install_ffmpeg("Windows")
         elif option == "--linux":
-            ensure_dir(FFMPEG_DIR)
-            temp_dir = ensure_dir(os.path.join("temp", "Linux"))
-            tar_path = os.path.join(temp_dir, "ffmpeg.tar.xz")
-            if download_file(FFMPEG_URLS["Linux"], tar_path):
-                extract_linux_ffmpeg(tar_path, temp_dir)
+            install_ffmpeg("Linux")
         elif option == "--macos":
-            ensure_dir(FFMPEG_DIR)
-            temp_dir = ensure_dir(os.path.join("temp", "Darwin"))
-            zip_path = os.path.join(temp_dir, "ffmpeg.zip")
-            if download_file(FFMPEG_URLS["Darwin"], zip_path):
-                extract_macos_ffmpeg(zip_path, temp_dir)
+            install_ffmpeg("Darwin")
         else:
             print(f"Opção desconhecida: {option}")
             show_help()
     else:
         # Por padrão, baixar apenas para o sistema operacional atual
-        download_ffmpeg_for_current_os() 
\ No newline at end of file
+        download_ffmpeg_for_current_os()
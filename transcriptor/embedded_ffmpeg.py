@@ -4,93 +4,560 @@ Este módulo detecta e configura o FFmpeg embutido, independente do sistema oper
 """
 
 import os
+import re
+import json
 import sys
-import platform
 import subprocess
 import shutil
+import threading
 from pathlib import Path
 
+from ffmpeg_resolver import get_ffmpeg_info, probe
+
+# Perfis de extração de áudio
+# "transcricao" gera um arquivo pequeno (16 kHz, mono, Opus) suficiente para o Whisper:
+# cerca de 11 MB por hora, então gravações longas cabem em uma única requisição ao Groq.
+# "preview" mantém o MP3 de alta qualidade para ouvir no navegador.
+# Quando o FFmpeg encontrado não tem o codificador (ou o muxer do contêiner) de um perfil,
+# get_audio_profile usa a primeira das "alternativas" que ele suporta.
+PERFIS_AUDIO = {
+    "transcricao": {
+        "descricao": "Transcrição (Opus 16 kHz mono)",
+        "extensao": ".ogg",
+        "parametros": [
+            "-ac", "1",  # Mono
+            "-ar", "16000",  # 16 kHz, a taxa usada internamente pelo Whisper
+            "-acodec", "libopus",
+            "-b:a", "24k",
+            "-application", "voip"  # Otimizado para voz
+        ],
+        # Codecs aceitos pelo Whisper que podem ser copiados sem recodificar, e o
+        # contêiner usado para cada um. Só copia fluxos compactos (até 64 kbps);
+        # acima disso vale mais a pena recodificar para Opus e evitar chunks.
+        "copia": {"opus": ".ogg", "vorbis": ".ogg", "aac": ".m4a", "mp3": ".mp3"},
+        "bitrate_maximo_copia": 64000,
+        "moviepy": {"codec": "libopus", "fps": 16000, "bitrate": "24k", "ffmpeg_params": ["-ac", "1"]},
+        "encoder": "libopus",
+        "alternativas": [
+            {
+                "descricao": "Transcrição (Vorbis 16 kHz mono)",
+                "extensao": ".ogg",
+                "parametros": ["-ac", "1", "-ar", "16000", "-acodec", "libvorbis", "-q:a", "0"],
+                "moviepy": {"codec": "libvorbis", "fps": 16000, "ffmpeg_params": ["-ac", "1", "-q:a", "0"]},
+                "encoder": "libvorbis"
+            },
+            {
+                "descricao": "Transcrição (AAC 16 kHz mono)",
+                "extensao": ".m4a",
+                "parametros": ["-ac", "1", "-ar", "16000", "-acodec", "aac", "-b:a", "32k"],
+                "moviepy": {"codec": "aac", "fps": 16000, "bitrate": "32k", "ffmpeg_params": ["-ac", "1"]},
+                "encoder": "aac"
+            }
+        ]
+    },
+    "transcricao_flac": {
+        "descricao": "Transcrição sem perdas (FLAC 16 kHz mono)",
+        "extensao": ".flac",
+        "parametros": [
+            "-ac", "1",
+            "-ar", "16000",
+            "-acodec", "flac",
+            "-sample_fmt", "s16",
+            "-compression_level", "8"
+        ],
+        "copia": {"flac": ".flac"},
+        "bitrate_maximo_copia": None,
+        "moviepy": {"codec": "flac", "fps": 16000, "ffmpeg_params": ["-ac", "1"]},
+        "encoder": "flac"
+    },
+    "preview": {
+        "descricao": "Pré-visualização (MP3 alta qualidade)",
+        "extensao": ".mp3",
+        "parametros": [
+            "-acodec", "libmp3lame",  # Usar codec MP3
+            "-q:a", "2"  # Qualidade do áudio (0-9, onde 0 é a melhor)
+        ],
+        # Formatos que o navegador reproduz diretamente
+        "copia": {"mp3": ".mp3", "aac": ".m4a"},
+        "bitrate_maximo_copia": None,
+        "moviepy": {},
+        "encoder": "libmp3lame",
+        "alternativas": [
+            {
+                "descricao": "Pré-visualização (AAC alta qualidade)",
+                "extensao": ".m4a",
+                "parametros": ["-acodec", "aac", "-b:a", "192k"],
+                "moviepy": {"codec": "aac", "bitrate": "192k"},
+                "encoder": "aac"
+            }
+        ]
+    }
+}
+
+PERFIL_PADRAO = "transcricao"
+
+# Tipo MIME de cada contêiner de áudio gerado, para exibição no navegador
+MIME_AUDIO = {
+    ".mp3": "audio/mp3",
+    ".ogg": "audio/ogg",
+    ".m4a": "audio/mp4",
+    ".flac": "audio/flac"
+}
+
+def get_audio_profile(perfil=None):
+    """
+    Retorna a configuração de um perfil de extração de áudio.
+    
+    Args:
+        perfil (str, optional): Nome do perfil em PERFIS_AUDIO
+        
+    Returns:
+        dict: Configuração do perfil; o perfil padrão se o nome for desconhecido. Se o
+            FFmpeg encontrado não suportar o codificador do perfil, a configuração da
+            primeira alternativa suportada
+    """
+    if perfil not in PERFIS_AUDIO:
+        if perfil is not None:
+            print(f"Perfil de áudio desconhecido: {perfil}. Usando '{PERFIL_PADRAO}'.")
+        perfil = PERFIL_PADRAO
+    return _select_encoder(PERFIS_AUDIO[perfil], get_ffmpeg_info())
+
+def _select_encoder(config, info):
+    """Troca o codificador do perfil pela primeira alternativa que o FFmpeg suporta"""
+    if info is None or info.supports(config["encoder"], config["extensao"]):
+        return config
+    for alternativa in config.get("alternativas", []):
+        if info.supports(alternativa["encoder"], alternativa["extensao"]):
+            return {**config, **alternativa}
+    return config
+
+def audio_output_path(output_path, perfil=None):
+    """
+    Ajusta a extensão do arquivo de saída para o contêiner do perfil.
+    
+    Args:
+        output_path (str): Caminho desejado para o arquivo de áudio
+        perfil (str, optional): Nome do perfil em PERFIS_AUDIO
+        
+    Returns:
+        str: Caminho com a extensão do perfil
+    """
+    return os.path.splitext(output_path)[0] + get_audio_profile(perfil)["extensao"]
+
+def _parse_out_time(values):
+    """Lê a posição já processada de um bloco de "-progress", em segundos"""
+    # out_time_ms também está em microssegundos, por um erro histórico do FFmpeg
+    for key in ("out_time_us", "out_time_ms"):
+        value = values.get(key, "")
+        if value.lstrip("-").isdigit():
+            return max(0.0, int(value) / 1_000_000)
+
+    match = re.match(r"(\d+):(\d+):(\d+(?:\.\d+)?)", values.get("out_time", ""))
+    if match:
+        hours, minutes, seconds = match.groups()
+        return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    return None
+
+def _parse_speed(value):
+    """Converte a velocidade do FFmpeg ("12.5x" ou "N/A") em múltiplos do tempo real"""
+    try:
+        speed = float((value or "").strip().rstrip("x"))
+    except ValueError:
+        return None
+    return speed if speed > 0 else None
+
 class EmbeddedFFmpeg:
     """Classe para gerenciar o FFmpeg embutido no aplicativo."""
     
     @staticmethod
     def get_ffmpeg_path():
         """
-        Retorna o caminho para o executável FFmpeg embutido.
+        Retorna o caminho para o executável FFmpeg.
+        
+        A busca (embutido, PATH, download do embutido e imageio-ffmpeg) é feita uma única
+        vez por processo pelo ffmpeg_resolver; as chamadas seguintes usam o resultado guardado.
         
         Returns:
             str: Caminho para o executável FFmpeg ou None se não encontrado
         """
-        # Obter o diretório do script atual
-        script_dir = os.path.dirname(os.path.abspath(__file__))
+        info = get_ffmpeg_info()
+        return info.ffmpeg_path if info else None
+    
+    @staticmethod
+    def get_ffprobe_path(ffmpeg_path=None):
+        """
+        Retorna o caminho para o executável ffprobe, que acompanha o FFmpeg.
         
-        # Diretório onde estão os binários do FFmpeg
-        ffmpeg_dir = os.path.join(script_dir, "ffmpeg_bin")
+        Args:
+            ffmpeg_path (str, optional): Executável FFmpeg de referência; por padrão, o encontrado pelo resolver
         
-        # Nome do executável, dependendo do sistema operacional
-        system = platform.system()
-        if system == "Windows":
-            ffmpeg_exe = "ffmpeg.exe"
-        else:
-            ffmpeg_exe = "ffmpeg"
+        Returns:
+            str: Caminho para o executável ffprobe ou None se não encontrado
+        """
+        info = get_ffmpeg_info() if ffmpeg_path is None else probe(ffmpeg_path)
+        if info:
+            return info.ffprobe_path
+        return shutil.which("ffprobe")
+    
+    @staticmethod
+    def get_duration(media_path):
+        """
+        Retorna a duração de um arquivo de mídia sem decodificá-lo.
         
-        # Caminho completo para o executável
-        ffmpeg_path = os.path.join(ffmpeg_dir, ffmpeg_exe)
+        Args:
+            media_path (str): Caminho para o arquivo de áudio ou vídeo
+            
+        Returns:
+            float: Duração em segundos ou None em caso de erro
+        """
+        try:
+            ffprobe_path = EmbeddedFFmpeg.get_ffprobe_path()
+            if ffprobe_path:
+                process = subprocess.run(
+                    [
+                        ffprobe_path,
+                        "-v", "error",
+                        "-show_entries", "format=duration",
+                        "-of", "default=noprint_wrappers=1:nokey=1",
+                        media_path
+                    ],
+                    check=True,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True
+                )
+                return float(process.stdout.strip())
+            
+            # Sem ffprobe, ler a duração do cabeçalho impresso por "ffmpeg -i"
+            ffmpeg_path = EmbeddedFFmpeg.get_ffmpeg_path()
+            if not ffmpeg_path:
+                print("FFmpeg não encontrado. Não é possível obter a duração.")
+                return None
+            
+            match = re.search(
+                r"Duration:\s*(\d+):(\d+):(\d+(?:\.\d+)?)",
+                EmbeddedFFmpeg._read_media_header(ffmpeg_path, media_path)
+            )
+            if not match:
+                print(f"Duração não encontrada na saída do FFmpeg: {media_path}")
+                return None
+            
+            hours, minutes, seconds = match.groups()
+            return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
         
-        # Verificar se o executável existe
-        if os.path.exists(ffmpeg_path):
-            return ffmpeg_path
+        except subprocess.CalledProcessError as e:
+            print(f"Erro ao executar ffprobe: {str(e)}")
+            print(f"Saída de erro: {e.stderr}")
+            return None
         
-        # Se não encontrou, tentar baixar
-        print(f"FFmpeg não encontrado em {ffmpeg_path}. Tentando baixar...")
+        except Exception as e:
+            print(f"Erro ao obter duração: {str(e)}")
+            return None
+    
+    @staticmethod
+    def _read_media_header(ffmpeg_path, media_path):
+        """Retorna o cabeçalho que "ffmpeg -i" imprime no stderr ao abrir um arquivo sem saída"""
+        process = subprocess.run(
+            [ffmpeg_path, "-hide_banner", "-i", media_path],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True
+        )
+        return process.stderr
+    
+    @staticmethod
+    def probe_audio_stream(media_path, ffmpeg_path=None):
+        """
+        Identifica o codec e o bitrate do primeiro fluxo de áudio de um arquivo.
         
+        Args:
+            media_path (str): Caminho para o arquivo de áudio ou vídeo
+            ffmpeg_path (str, optional): Executável FFmpeg a usar; por padrão, o embutido
+            
+        Returns:
+            dict: {"codec": str, "bit_rate": int ou None} ou None se não houver áudio
+        """
         try:
-            # Tentar importar e executar o script de download
-            from download_ffmpeg import download_ffmpeg_for_current_os
-            download_ffmpeg_for_current_os()
+            if ffmpeg_path is None:
+                ffmpeg_path = EmbeddedFFmpeg.get_ffmpeg_path()
             
-            # Verificar novamente se o executável existe
-            if os.path.exists(ffmpeg_path):
-                return ffmpeg_path
-            else:
-                print("Não foi possível baixar o FFmpeg.")
+            ffprobe_path = EmbeddedFFmpeg.get_ffprobe_path(ffmpeg_path)
+            if ffprobe_path:
+                process = subprocess.run(
+                    [
+                        ffprobe_path,
+                        "-v", "error",
+                        "-select_streams", "a:0",
+                        "-show_entries", "stream=codec_name,bit_rate",
+                        "-of", "json",
+                        media_path
+                    ],
+                    check=True,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True
+                )
+                streams = json.loads(process.stdout).get("streams", [])
+                if not streams:
+                    return None
+                bit_rate = streams[0].get("bit_rate")
+                return {
+                    "codec": streams[0].get("codec_name"),
+                    "bit_rate": int(bit_rate) if bit_rate and bit_rate.isdigit() else None
+                }
+            
+            # Sem ffprobe, ler o codec da linha "Stream #0:1: Audio: aac (LC) ..., 128 kb/s"
+            if not ffmpeg_path:
+                return None
+            header = EmbeddedFFmpeg._read_media_header(ffmpeg_path, media_path)
+            match = re.search(r"Stream #\S+.*?: Audio: (\w+)(.*)", header)
+            if not match:
                 return None
+            bit_rate = re.search(r"(\d+) kb/s", match.group(2))
+            return {
+                "codec": match.group(1),
+                "bit_rate": int(bit_rate.group(1)) * 1000 if bit_rate else None
+            }
+        
         except Exception as e:
-            print(f"Erro ao baixar o FFmpeg: {str(e)}")
+            print(f"Erro ao identificar o fluxo de áudio: {str(e)}")
             return None
     
     @staticmethod
-    def extract_audio(video_path, output_path):
+    def run_with_progress(command, duration=None, progress_callback=None):
         """
-        Extrai áudio de um arquivo de vídeo usando o FFmpeg embutido.
+        Executa um comando do FFmpeg, informando o andamento lido de "-progress pipe:1".
+        
+        Args:
+            command (list): Comando completo, começando pelo executável
+            duration (float, optional): Duração da mídia em segundos, para calcular o percentual
+            progress_callback (callable, optional): Recebe o progresso entre 0 e 1, a velocidade
+                em múltiplos do tempo real e os segundos restantes (os dois últimos podem ser None)
+            
+        Returns:
+            subprocess.CompletedProcess: Processo concluído, com o stderr
+            
+        Raises:
+            subprocess.CalledProcessError: Se o FFmpeg terminar com erro
+        """
+        if progress_callback is None:
+            return subprocess.run(
+                command,
+                check=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True
+            )
+        
+        # Opções globais: andamento em pares chave=valor na saída padrão, sem as estatísticas no stderr
+        command = [command[0], "-progress", "pipe:1", "-nostats", *command[1:]]
+        process = subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True
+        )
+        
+        # Consumir o stderr em paralelo para o FFmpeg não travar com o buffer cheio
+        stderr_lines = []
+        reader = threading.Thread(target=lambda: stderr_lines.extend(process.stderr), daemon=True)
+        reader.start()
+        
+        # Cada bloco de andamento termina com "progress=continue" ou "progress=end"
+        values = {}
+        for line in process.stdout:
+            key, _, value = line.strip().partition("=")
+            if key != "progress":
+                values[key] = value
+                continue
+            
+            speed = _parse_speed(values.get("speed"))
+            out_time = _parse_out_time(values)
+            if value == "end":
+                progress_callback(1.0, speed, 0.0)
+            elif duration and out_time is not None:
+                eta = max(0.0, duration - out_time) / speed if speed else None
+                progress_callback(min(1.0, out_time / duration), speed, eta)
+            values = {}
+        
+        process.wait()
+        reader.join()
+        stderr = "".join(stderr_lines)
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, command, stderr=stderr)
+        return subprocess.CompletedProcess(command, process.returncode, stderr=stderr)
+    
+    @staticmethod
+    def copy_audio_stream(video_path, output_path, perfil="preview", ffmpeg_path=None, progress_callback=None):
+        """
+        Extrai o áudio sem recodificar (-c:a copy) quando o codec de origem já é aceito pelo perfil.
+        
+        A operação só lê e reescreve os pacotes de áudio, então leva segundos mesmo
+        em vídeos longos.
         
         Args:
             video_path (str): Caminho para o arquivo de vídeo
-            output_path (str): Caminho para salvar o arquivo de áudio
+            output_path (str): Caminho desejado; a extensão é trocada pelo contêiner do codec
+            perfil (str, optional): Perfil de extração em PERFIS_AUDIO
+            ffmpeg_path (str, optional): Executável FFmpeg a usar; por padrão, o embutido
+            progress_callback (callable, optional): Recebe o andamento (ver run_with_progress)
             
         Returns:
-            str: Caminho para o arquivo de áudio ou None em caso de erro
+            str: Caminho para o arquivo de áudio ou None se a cópia não for possível
         """
         try:
-            # Obter o caminho para o FFmpeg
-            ffmpeg_path = EmbeddedFFmpeg.get_ffmpeg_path()
+            if ffmpeg_path is None:
+                ffmpeg_path = EmbeddedFFmpeg.get_ffmpeg_path()
             if not ffmpeg_path:
-                print("FFmpeg não encontrado. Não é possível extrair áudio.")
                 return None
             
-            # Comando para extrair áudio
+            config_perfil = get_audio_profile(perfil)
+            stream = EmbeddedFFmpeg.probe_audio_stream(video_path, ffmpeg_path)
+            if not stream or stream["codec"] not in config_perfil["copia"]:
+                return None
+            
+            # Fluxos acima do limite do perfil são recodificados para ficarem menores
+            bitrate_maximo = config_perfil["bitrate_maximo_copia"]
+            if bitrate_maximo and (stream["bit_rate"] is None or stream["bit_rate"] > bitrate_maximo):
+                return None
+            
+            # O FFmpeg precisa ter o muxer do contêiner de destino
+            extensao = config_perfil["copia"][stream["codec"]]
+            if not probe(ffmpeg_path).has_container(extensao):
+                return None
+            output_path = os.path.splitext(output_path)[0] + extensao
+            
+            # Comando para copiar o fluxo de áudio
             command = [
                 ffmpeg_path,
                 "-i", video_path,
                 "-vn",  # Desativa o vídeo
-                "-acodec", "libmp3lame",  # Usar codec MP3
-                "-q:a", "2",  # Qualidade do áudio (0-9, onde 0 é a melhor)
+                "-map", "0:a:0",  # Apenas o primeiro fluxo de áudio
+                "-c:a", "copy",  # Copiar sem recodificar
                 "-y",  # Sobrescrever arquivo se existir
                 output_path
             ]
             
+            duration = EmbeddedFFmpeg.get_duration(video_path) if progress_callback else None
+            EmbeddedFFmpeg.run_with_progress(command, duration, progress_callback)
+            
+            if os.path.exists(output_path):
+                return output_path
+            return None
+        
+        except subprocess.CalledProcessError as e:
+            # Não é um erro fatal: quem chamou recodifica o áudio
+            print(f"Não foi possível copiar o fluxo de áudio: {e.stderr}")
+            return None
+        
+        except Exception as e:
+            print(f"Erro ao copiar o fluxo de áudio: {str(e)}")
+            return None
+    
+    @staticmethod
+    def split_audio(audio_path, output_pattern, segment_time):
+        """
+        Divide um arquivo de áudio em partes usando o muxer de segmentos do FFmpeg.
+        
+        O fluxo de áudio é copiado sem decodificar nem recodificar (-c copy), então o uso
+        de memória não depende da duração do arquivo.
+        
+        Args:
+            audio_path (str): Caminho para o arquivo de áudio
+            output_pattern (str): Padrão dos arquivos de saída, com um campo numérico
+                no estilo printf (ex: "/tmp/chunk_%03d.mp3")
+            segment_time (float): Duração de cada parte em segundos
+            
+        Returns:
+            list: Caminhos das partes em ordem ou None em caso de erro
+        """
+        try:
+            # Obter o caminho para o FFmpeg
+            ffmpeg_path = EmbeddedFFmpeg.get_ffmpeg_path()
+            if not ffmpeg_path:
+                print("FFmpeg não encontrado. Não é possível dividir o áudio.")
+                return None
+            
+            output_dir = os.path.dirname(output_pattern) or "."
+            os.makedirs(output_dir, exist_ok=True)
+            
+            # Comando para dividir o áudio
+            command = [
+                ffmpeg_path,
+                "-i", audio_path,
+                "-map", "0:a:0",  # Apenas o primeiro fluxo de áudio
+                "-c", "copy",  # Copiar sem recodificar
+                "-f", "segment",
+                "-segment_time", f"{segment_time:.3f}",
+                "-reset_timestamps", "1",  # Cada parte começa em 0
+                "-y",  # Sobrescrever arquivo se existir
+                output_pattern
+            ]
+            
             # Executar o comando
-            process = subprocess.run(
+            subprocess.run(
+                command,
+                check=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True
+            )
+            
+            # Coletar as partes geradas, na ordem do índice
+            chunks = []
+            index = 0
+            while os.path.exists(output_pattern % index):
+                chunks.append(output_pattern % index)
+                index += 1
+            
+            if not chunks:
+                print(f"Nenhuma parte foi criada a partir de: {audio_path}")
+                return None
+            return chunks
+        
+        except subprocess.CalledProcessError as e:
+            print(f"Erro ao executar FFmpeg: {str(e)}")
+            print(f"Saída de erro: {e.stderr}")
+            return None
+        
+        except Exception as e:
+            print(f"Erro ao dividir áudio: {str(e)}")
+            return None
+    
+    @staticmethod
+    def cut_audio(audio_path, output_path, start, end):
+        """
+        Copia um trecho de um arquivo de áudio sem recodificar.
+        
+        Args:
+            audio_path (str): Caminho para o arquivo de áudio
+            output_path (str): Caminho para salvar o trecho (mesmo contêiner da origem)
+            start (float): Início do trecho em segundos
+            end (float): Fim do trecho em segundos
+            
+        Returns:
+            str: Caminho para o trecho ou None em caso de erro
+        """
+        try:
+            # Obter o caminho para o FFmpeg
+            ffmpeg_path = EmbeddedFFmpeg.get_ffmpeg_path()
+            if not ffmpeg_path:
+                print("FFmpeg não encontrado. Não é possível cortar o áudio.")
+                return None
+            
+            # Comando para copiar o trecho; -ss antes de -i faz a busca sem decodificar
+            command = [
+                ffmpeg_path,
+                "-ss", f"{start:.3f}",
+                "-i", audio_path,
+                "-t", f"{end - start:.3f}",
+                "-map", "0:a:0",  # Apenas o primeiro fluxo de áudio
+                "-c", "copy",  # Copiar sem recodificar
+                "-y",  # Sobrescrever arquivo se existir
+                output_path
+            ]
+            
+            subprocess.run(
                 command,
                 check=True,
                 stdout=subprocess.PIPE,
@@ -98,6 +565,65 @@ class EmbeddedFFmpeg:
                 text=True
             )
             
+            if os.path.exists(output_path):
+                return output_path
+            print(f"Trecho de áudio não foi criado: {output_path}")
+            return None
+        
+        except subprocess.CalledProcessError as e:
+            print(f"Erro ao executar FFmpeg: {str(e)}")
+            print(f"Saída de erro: {e.stderr}")
+            return None
+        
+        except Exception as e:
+            print(f"Erro ao cortar áudio: {str(e)}")
+            return None
+    
+    @staticmethod
+    def extract_audio(video_path, output_path, perfil="preview", progress_callback=None):
+        """
+        Extrai áudio de um arquivo de vídeo usando o FFmpeg embutido.
+        
+        Args:
+            video_path (str): Caminho para o arquivo de vídeo
+            output_path (str): Caminho para salvar o arquivo de áudio; a extensão é
+                trocada pela do contêiner do perfil
+            perfil (str, optional): Perfil de extração em PERFIS_AUDIO
+            progress_callback (callable, optional): Recebe o progresso entre 0 e 1, a velocidade
+                do FFmpeg e os segundos restantes (ver run_with_progress)
+            
+        Returns:
+            str: Caminho para o arquivo de áudio ou None em caso de erro
+        """
+        try:
+            # Obter o caminho para o FFmpeg
+            ffmpeg_path = EmbeddedFFmpeg.get_ffmpeg_path()
+            if not ffmpeg_path:
+                print("FFmpeg não encontrado. Não é possível extrair áudio.")
+                return None
+            
+            # Caminho rápido: copiar o fluxo se o codec de origem já serve
+            copied_path = EmbeddedFFmpeg.copy_audio_stream(video_path, output_path, perfil, ffmpeg_path, progress_callback)
+            if copied_path:
+                return copied_path
+            
+            config_perfil = get_audio_profile(perfil)
+            output_path = audio_output_path(output_path, perfil)
+            
+            # Comando para extrair áudio
+            command = [
+                ffmpeg_path,
+                "-i", video_path,
+                "-vn",  # Desativa o vídeo
+                *config_perfil["parametros"],
+                "-y",  # Sobrescrever arquivo se existir
+                output_path
+            ]
+            
+            # Executar o comando; a duração só é consultada quando há quem acompanhe o andamento
+            duration = EmbeddedFFmpeg.get_duration(video_path) if progress_callback else None
+            process = EmbeddedFFmpeg.run_with_progress(command, duration, progress_callback)
+            
             # Verificar se o arquivo foi criado
             if os.path.exists(output_path):
                 return output_path
@@ -177,14 +703,14 @@ class EmbeddedFFmpeg:
 # Função auxiliar para verificar se o FFmpeg está disponível
 def check_ffmpeg():
     """
-    Verifica se o FFmpeg embutido está disponível.
+    Verifica se o FFmpeg está disponível.
     
     Returns:
         bool: True se FFmpeg está disponível, False caso contrário
     """
-    ffmpeg_path = EmbeddedFFmpeg.get_ffmpeg_path()
-    if ffmpeg_path:
-        print(f"FFmpeg encontrado em: {ffmpeg_path}")
+    info = get_ffmpeg_info()
+    if info:
+        print(f"FFmpeg {info.versao or ''} ({info.origem}) encontrado em: {info.ffmpeg_path}")
         return True
     else:
         print("FFmpeg não encontrado. Algumas funcionalidades podem não estar disponíveis.")
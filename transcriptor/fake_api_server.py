@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Servidor HTTP local que imita as APIs do Groq e do Gemini, para testar a camada de resiliência.
+Responde às rotas de transcrição do Groq e de geração de conteúdo do Gemini, e pode
+injetar respostas 429, erros 503 e latência.
+
+Exemplo:
+    with FakeAPIServer(rate_limit_failures=2, latency=0.5) as server:
+        transcriber = GroqTranscriber(api_key="teste", base_url=server.url)
+        generator = SummaryGenerator(api_key="teste", api_endpoint=server.url)
+
+Para o streaming do resumo, FakeGenerativeModel substitui o modelo do Gemini sem rede:
+    generator.model = FakeGenerativeModel("Tópico\n• Subtópico\n", chunk_size=8, delay=0.1)
+"""
+
+import json
+import re
+import sys
+import threading
+import time
+from types import SimpleNamespace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class FakeAPIServer:
+    """
+    Servidor falso das APIs do Groq e do Gemini.
+
+    Args:
+        host (str): Endereço de escuta
+        port (int): Porta de escuta (0 escolhe uma porta livre)
+        latency (float): Segundos de espera antes de cada resposta
+        rate_limit_failures (int): Número de requisições iniciais respondidas com 429
+        server_errors (int): Número de requisições seguintes respondidas com 503
+        retry_after (float): Valor do cabeçalho Retry-After nas respostas 429
+        transcription_text (str): Texto devolvido pela rota de transcrição
+        summary_text (str): Texto devolvido pela rota do Gemini
+    """
+
+    # Duração de cada segmento nas respostas verbose_json
+    SEGMENT_SECONDS = 2.0
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, rate_limit_failures=0, server_errors=0,
+                 retry_after=1, transcription_text="Transcrição de teste.", summary_text="Resumo de teste"):
+        self.latency = latency
+        self.rate_limit_failures = rate_limit_failures
+        self.server_errors = server_errors
+        self.retry_after = retry_after
+        self.transcription_text = transcription_text
+        self.summary_text = summary_text
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+
+    @property
+    def url(self):
+        """URL base do servidor"""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _next_status(self):
+        """Decide o código da próxima resposta conforme as falhas configuradas"""
+        with self._lock:
+            self.request_count += 1
+            count = self.request_count
+        if count <= self.rate_limit_failures:
+            return 429
+        if count <= self.rate_limit_failures + self.server_errors:
+            return 503
+        return 200
+
+    def _verbose_transcription(self):
+        """Resposta verbose_json: um segmento de SEGMENT_SECONDS por frase do texto configurado"""
+        frases = [frase for frase in re.split(r"(?<=[.!?])\s+", self.transcription_text.strip()) if frase]
+        segments = [
+            {"id": i, "start": i * self.SEGMENT_SECONDS, "end": (i + 1) * self.SEGMENT_SECONDS, "text": " " + frase}
+            for i, frase in enumerate(frases)
+        ]
+        return {
+            "task": "transcribe",
+            "language": "portuguese",
+            "duration": len(segments) * self.SEGMENT_SECONDS,
+            "text": self.transcription_text,
+            "segments": segments
+        }
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                # Não poluir a saída dos testes
+                pass
+
+            def _send_json(self, status, payload, headers=None):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                # Ler o corpo da requisição (áudio ou prompt) apenas para saber o formato pedido
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+                if server.latency:
+                    time.sleep(server.latency)
+
+                status = server._next_status()
+                if status == 429:
+                    self._send_json(429, {"error": {"message": "Rate limit reached", "code": 429}}, {
+                        "retry-after": str(server.retry_after),
+                        "x-ratelimit-reset-requests": f"{server.retry_after}s"
+                    })
+                    return
+                if status == 503:
+                    self._send_json(503, {"error": {"message": "Service unavailable", "code": 503}})
+                    return
+
+                if "/audio/transcriptions" in self.path and b"verbose_json" in body:
+                    self._send_json(200, server._verbose_transcription())
+                elif "/audio/transcriptions" in self.path:
+                    self._send_json(200, {"text": server.transcription_text})
+                elif ":generateContent" in self.path:
+                    self._send_json(200, {
+                        "candidates": [{
+                            "content": {"parts": [{"text": server.summary_text}], "role": "model"},
+                            "finishReason": "STOP",
+                            "index": 0
+                        }]
+                    })
+                else:
+                    self._send_json(404, {"error": {"message": f"Rota desconhecida: {self.path}", "code": 404}})
+
+        return Handler
+
+    def start(self):
+        """Inicia o servidor em uma thread em segundo plano"""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Encerra o servidor"""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+class FakeGenerativeModel:
+    """
+    Modelo falso com a interface de genai.GenerativeModel.generate_content.
+
+    Com stream=True, devolve o texto em pedaços de chunk_size caracteres, esperando delay
+    segundos antes de cada um, como uma resposta em streaming do Gemini.
+
+    Args:
+        text (str): Texto da resposta
+        chunk_size (int): Caracteres por pedaço
+        delay (float): Segundos de espera antes de cada pedaço
+        fail_after (int, optional): Lança ConnectionError depois deste número de pedaços
+    """
+
+    def __init__(self, text="Resumo de teste", chunk_size=20, delay=0.05, fail_after=None):
+        self.text = text
+        self.chunk_size = chunk_size
+        self.delay = delay
+        self.fail_after = fail_after
+        self.prompts = []
+
+    def _chunks(self):
+        for index, start in enumerate(range(0, len(self.text), self.chunk_size)):
+            if self.fail_after is not None and index >= self.fail_after:
+                raise ConnectionError("Conexão interrompida durante o streaming")
+            time.sleep(self.delay)
+            yield SimpleNamespace(text=self.text[start:start + self.chunk_size])
+
+    def generate_content(self, prompt, stream=False):
+        self.prompts.append(prompt)
+        if stream:
+            return self._chunks()
+        return SimpleNamespace(text="".join(chunk.text for chunk in self._chunks()))
+
+def show_help():
+    """Mostra ajuda sobre o uso do script"""
+    print("Uso: python fake_api_server.py [porta] [falhas_429] [erros_503] [latência]")
+    print("Exemplo: python fake_api_server.py 8765 3 0 0.5")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--help":
+        show_help()
+        sys.exit(0)
+
+    args = sys.argv[1:] + [None] * 4
+    server = FakeAPIServer(
+        port=int(args[0] or 8765),
+        rate_limit_failures=int(args[1] or 0),
+        server_errors=int(args[2] or 0),
+        latency=float(args[3] or 0)
+    )
+    print(f"Servidor falso ouvindo em {server.url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,232 @@
+"""
+Módulo que localiza o FFmpeg uma única vez por processo.
+Procura o ffmpeg e o ffprobe (embutidos, no PATH e nos diretórios do Streamlit Cloud,
+baixando o FFmpeg embutido se nenhum for encontrado) e consulta a versão, os
+codificadores e os muxers disponíveis. O resultado fica em cache, então as extrações
+seguintes não repetem as buscas no sistema de arquivos nem os subprocessos de consulta,
+e os perfis de extração podem escolher um codificador que o binário realmente tem.
+"""
+
+import os
+import platform
+import re
+import shutil
+import subprocess
+import threading
+
+# Diretório do FFmpeg embutido (preenchido pelo download_ffmpeg)
+EMBEDDED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ffmpeg_bin")
+
+# Diretórios onde o ffmpeg pode estar instalado no Streamlit Cloud, além do PATH
+SYSTEM_PATHS = [
+    "/usr/bin",
+    "/usr/local/bin",
+    "/app/.apt/usr/bin",  # Caminho específico do Streamlit Cloud
+    "/home/appuser/.apt/usr/bin"  # Outro caminho possível no Streamlit Cloud
+]
+
+# Muxer usado pelo FFmpeg para cada contêiner de áudio gerado
+MUXER_POR_EXTENSAO = {
+    ".mp3": "mp3",
+    ".ogg": "ogg",
+    ".m4a": "ipod",
+    ".flac": "flac"
+}
+
+def _executable(name):
+    return name + ".exe" if platform.system() == "Windows" else name
+
+class FFmpegInfo:
+    """
+    Binário do FFmpeg encontrado e os recursos que ele oferece.
+
+    Attributes:
+        ffmpeg_path (str): Caminho do ffmpeg
+        ffprobe_path (str): Caminho do ffprobe ou None se não houver
+        origem (str): "embutido", "sistema", "baixado" ou "imageio"
+        versao (str): Versão informada por "ffmpeg -version", ou None
+        encoders (frozenset): Codificadores de áudio disponíveis
+        muxers (frozenset): Muxers disponíveis
+    """
+
+    def __init__(self, ffmpeg_path, ffprobe_path=None, origem=None, versao=None, encoders=frozenset(), muxers=frozenset()):
+        self.ffmpeg_path = ffmpeg_path
+        self.ffprobe_path = ffprobe_path
+        self.origem = origem
+        self.versao = versao
+        self.encoders = encoders
+        self.muxers = muxers
+
+    def has_encoder(self, encoder):
+        """True se o codificador existir; sem a lista de codificadores, presume que sim"""
+        return not self.encoders or encoder in self.encoders
+
+    def has_muxer(self, muxer):
+        """True se o muxer existir; sem a lista de muxers, presume que sim"""
+        return not self.muxers or muxer in self.muxers
+
+    def has_container(self, extensao):
+        """True se o binário grava o contêiner da extensão (".ogg", ".m4a"...)"""
+        muxer = MUXER_POR_EXTENSAO.get(extensao)
+        return muxer is None or self.has_muxer(muxer)
+
+    def supports(self, encoder, extensao):
+        """True se o binário gera o contêiner da extensão com o codificador informado"""
+        return self.has_encoder(encoder) and self.has_container(extensao)
+
+    def __repr__(self):
+        return f"FFmpegInfo({self.ffmpeg_path!r}, origem={self.origem!r}, versao={self.versao!r})"
+
+def _run(ffmpeg_path, option):
+    """Saída de "ffmpeg -hide_banner <opção>", ou "" se o comando falhar"""
+    try:
+        process = subprocess.run(
+            [ffmpeg_path, "-hide_banner", option],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            timeout=30
+        )
+        return process.stdout
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+def _parse_list(output, kind_filter=None):
+    """Lê os nomes das tabelas de "-encoders" e "-muxers", que começam depois da linha de traços"""
+    names = set()
+    started = False
+    for line in output.splitlines():
+        if not started:
+            started = line.strip().startswith("--")
+            continue
+        parts = line.split()
+        if len(parts) < 2:
+            continue
+        flags, name = parts[0], parts[1]
+        if kind_filter and not flags.startswith(kind_filter):
+            continue
+        names.update(name.split(","))
+    return frozenset(names)
+
+def _find_ffprobe(ffmpeg_path):
+    """O ffprobe é copiado para o mesmo diretório do ffmpeg pelo download_ffmpeg; senão, procurar no PATH"""
+    ffprobe_path = os.path.join(os.path.dirname(ffmpeg_path), _executable("ffprobe"))
+    if os.path.exists(ffprobe_path):
+        return ffprobe_path
+    return shutil.which("ffprobe")
+
+# Consultas já feitas, por caminho do binário
+_probes = {}
+_probes_lock = threading.Lock()
+
+def probe(ffmpeg_path, origem=None):
+    """
+    Consulta a versão, os codificadores de áudio e os muxers de um binário do FFmpeg.
+    Cada binário é consultado uma única vez por processo.
+
+    Returns:
+        FFmpegInfo: Recursos do binário
+    """
+    ffmpeg_path = os.path.abspath(ffmpeg_path)
+    with _probes_lock:
+        info = _probes.get(ffmpeg_path)
+        if info is None:
+            match = re.search(r"ffmpeg version (\S+)", _run(ffmpeg_path, "-version"))
+            info = FFmpegInfo(
+                ffmpeg_path,
+                _find_ffprobe(ffmpeg_path),
+                origem,
+                match.group(1) if match else None,
+                _parse_list(_run(ffmpeg_path, "-encoders"), kind_filter="A"),
+                _parse_list(_run(ffmpeg_path, "-muxers"))
+            )
+            _probes[ffmpeg_path] = info
+        return info
+
+def find_system_ffmpeg():
+    """
+    Procura o ffmpeg no PATH, incluindo os diretórios de SYSTEM_PATHS no PATH do processo.
+
+    Returns:
+        str: Caminho do ffmpeg ou None
+    """
+    path_dirs = os.environ.get("PATH", "").split(os.pathsep)
+    missing = [path for path in SYSTEM_PATHS if path not in path_dirs]
+    if missing:
+        os.environ["PATH"] = os.pathsep.join(missing + path_dirs)
+    return shutil.which(_executable("ffmpeg"))
+
+def _find_ffmpeg(download):
+    """Procura o ffmpeg, em ordem: embutido, sistema, download do embutido e imageio-ffmpeg"""
+    embedded_path = os.path.join(EMBEDDED_DIR, _executable("ffmpeg"))
+    if os.path.exists(embedded_path):
+        return embedded_path, "embutido"
+
+    system_path = find_system_ffmpeg()
+    if system_path:
+        return system_path, "sistema"
+
+    if download:
+        print(f"FFmpeg não encontrado em {embedded_path}. Tentando baixar...")
+        try:
+            from download_ffmpeg import download_ffmpeg_for_current_os
+            download_ffmpeg_for_current_os()
+            if os.path.exists(embedded_path):
+                return embedded_path, "baixado"
+            print("Não foi possível baixar o FFmpeg.")
+        except Exception as e:
+            print(f"Erro ao baixar o FFmpeg: {str(e)}")
+
+    # FFmpeg que acompanha o MoviePy, como último recurso
+    try:
+        from imageio_ffmpeg import get_ffmpeg_exe
+        return get_ffmpeg_exe(), "imageio"
+    except Exception:
+        return None, None
+
+# Resultado da busca do processo: None enquanto não houve busca
+_resolved = None
+_resolved_lock = threading.Lock()
+_NAO_ENCONTRADO = object()
+
+def get_ffmpeg_info(refresh=False, download=True):
+    """
+    Localiza o FFmpeg e consulta seus recursos, uma única vez por processo.
+    Chamadas simultâneas esperam a primeira busca (inclusive o download) terminar.
+
+    Args:
+        refresh (bool, optional): Refaz a busca, ignorando o resultado guardado
+        download (bool, optional): Baixa o FFmpeg embutido se nenhum for encontrado
+
+    Returns:
+        FFmpegInfo: FFmpeg encontrado ou None
+    """
+    global _resolved
+    with _resolved_lock:
+        if _resolved is None or refresh:
+            ffmpeg_path, origem = _find_ffmpeg(download)
+            _resolved = probe(ffmpeg_path, origem) if ffmpeg_path else _NAO_ENCONTRADO
+        return None if _resolved is _NAO_ENCONTRADO else _resolved
+
+def cached_ffmpeg_info():
+    """
+    Resultado da busca, sem esperar nem buscar.
+
+    Returns:
+        tuple: (concluída, FFmpegInfo ou None)
+    """
+    resolved = _resolved
+    if resolved is None:
+        return False, None
+    return True, None if resolved is _NAO_ENCONTRADO else resolved
+
+if __name__ == "__main__":
+    info = get_ffmpeg_info()
+    if info is None:
+        print("FFmpeg não encontrado.")
+    else:
+        print(f"FFmpeg {info.versao} ({info.origem}): {info.ffmpeg_path}")
+        print(f"ffprobe: {info.ffprobe_path}")
+        print(f"Codificadores de áudio: {len(info.encoders)}; muxers: {len(info.muxers)}")
+        for extensao, muxer in MUXER_POR_EXTENSAO.items():
+            print(f"  {extensao}: muxer {muxer} {'disponível' if info.has_muxer(muxer) else 'ausente'}")
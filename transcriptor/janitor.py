@@ -0,0 +1,189 @@
+"""
+Módulo com a limpeza dos arquivos temporários em segundo plano.
+Uma única thread por processo remove, a cada intervalo, o que ficou sem uso por mais de
+max_age segundos:
+
+- os diretórios das sessões paradas, escolhidos pelo índice do WorkspaceManager (com o
+  último acesso de cada sessão), sem percorrer os arquivos;
+- os arquivos e subdiretórios soltos no diretório temporário;
+- as sobras do download do FFmpeg (temp/<sistema> das versões antigas e diretórios
+  .staging-* de instalações interrompidas).
+
+Nada em uso é removido: diretórios com reserva de espaço em andamento e caminhos marcados
+com workspace.pin() ficam de fora. O índice das sessões é conferido com o disco apenas a
+cada SYNC_EVERY execuções, para incluir as sessões criadas por outros processos.
+
+O intervalo e a idade máxima podem ser ajustados pelas variáveis de ambiente
+TRANSCRIPTOR_LIMPEZA_INTERVALO e TRANSCRIPTOR_LIMPEZA_IDADE (em segundos).
+"""
+
+import os
+import shutil
+import sys
+import threading
+import time
+
+from workspace import is_pinned
+
+def _env_seconds(name, default):
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+# Tempo entre duas execuções da limpeza
+DEFAULT_INTERVAL = _env_seconds("TRANSCRIPTOR_LIMPEZA_INTERVALO", 600)
+
+# Arquivos e sessões sem uso há mais deste tempo são removidos
+DEFAULT_MAX_AGE = _env_seconds("TRANSCRIPTOR_LIMPEZA_IDADE", 3600)
+
+# A cada quantas execuções o índice das sessões é conferido com o disco
+SYNC_EVERY = 6
+
+class Janitor:
+    """
+    Limpeza periódica do diretório temporário do app.
+
+    Args:
+        workspaces (WorkspaceManager): Gerenciador dos diretórios das sessões
+        temp_root (str): Diretório temporário do app
+        interval (float, optional): Segundos entre as execuções
+        max_age (float, optional): Segundos sem uso antes de um arquivo ser removido
+        keep (iterable, optional): Nomes em temp_root que nunca são removidos
+            (o diretório das sessões é sempre mantido)
+    """
+
+    def __init__(self, workspaces, temp_root, interval=DEFAULT_INTERVAL, max_age=DEFAULT_MAX_AGE, keep=()):
+        self.workspaces = workspaces
+        self.temp_root = os.path.abspath(temp_root)
+        self.interval = interval
+        self.max_age = max_age
+        self.keep = set(keep) | {os.path.basename(workspaces.root)}
+        self.runs = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _remove_path(self, path):
+        """Remove um arquivo ou diretório; retorna True se removeu"""
+        try:
+            if os.path.isdir(path) and not os.path.islink(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+            return True
+        except OSError:
+            return False
+
+    def _expired(self, path, limit):
+        """True se o caminho não é usado desde limit e não está marcado como em uso"""
+        try:
+            return os.stat(path).st_mtime < limit and not is_pinned(path)
+        except OSError:
+            return False
+
+    def _clean_loose(self, limit):
+        """Remove os arquivos e subdiretórios soltos e antigos do diretório temporário"""
+        removed = []
+        try:
+            entries = list(os.scandir(self.temp_root))
+        except OSError:
+            return removed
+        for entry in entries:
+            if entry.name in self.keep or entry.path == self.workspaces.root:
+                continue
+            if self._expired(entry.path, limit) and self._remove_path(entry.path):
+                removed.append(entry.path)
+        return removed
+
+    def _clean_ffmpeg_leftovers(self, limit):
+        """Remove as sobras dos downloads do FFmpeg"""
+        from download_ffmpeg import FFMPEG_DIR, FFMPEG_URLS, LOCK_FILE, SCRIPT_DIR, file_lock
+
+        removed = []
+        # Versões antigas extraíam em temp/<sistema>, relativo ao diretório de trabalho
+        for base in {os.getcwd(), SCRIPT_DIR}:
+            for os_name in FFMPEG_URLS:
+                path = os.path.join(base, "temp", os_name)
+                if os.path.isdir(path) and self._expired(path, limit) and self._remove_path(path):
+                    removed.append(path)
+
+        # Diretórios de instalações interrompidas, só se nenhuma instalação estiver em andamento
+        if os.path.isdir(FFMPEG_DIR):
+            staging = [name for name in os.listdir(FFMPEG_DIR) if name.startswith(".staging-")]
+            if staging:
+                try:
+                    with file_lock(os.path.join(FFMPEG_DIR, LOCK_FILE), timeout=0):
+                        for name in staging:
+                            path = os.path.join(FFMPEG_DIR, name)
+                            if self._remove_path(path):
+                                removed.append(path)
+                except TimeoutError:
+                    pass
+        return removed
+
+    def run_once(self):
+        """
+        Executa uma limpeza.
+
+        Returns:
+            list: Caminhos removidos
+        """
+        if self.runs % SYNC_EVERY == 0:
+            self.workspaces.sync()
+        self.runs += 1
+
+        limit = time.time() - self.max_age
+        removed = [
+            os.path.join(self.workspaces.root, name)
+            for name in self.workspaces.remove_idle(self.max_age)
+        ]
+        removed.extend(self._clean_loose(limit))
+        removed.extend(self._clean_ffmpeg_leftovers(limit))
+        return removed
+
+    def _run(self):
+        while True:
+            try:
+                removed = self.run_once()
+                if removed:
+                    print(f"Limpeza: {len(removed)} item(ns) temporário(s) removido(s)")
+            except Exception as e:
+                print(f"Erro na limpeza dos arquivos temporários: {str(e)}", file=sys.stderr)
+            if self._stop.wait(self.interval):
+                return
+
+    def start(self):
+        """Executa a limpeza periodicamente em uma thread em segundo plano"""
+        self._thread = threading.Thread(target=self._run, daemon=True, name="limpeza")
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Encerra a thread da limpeza"""
+        self._stop.set()
+
+# Limpeza do processo, iniciada uma única vez
+_janitor = None
+_janitor_lock = threading.Lock()
+
+def start_janitor(workspaces, temp_root, **opcoes):
+    """
+    Inicia a limpeza do processo em segundo plano, se ainda não foi iniciada, e a retorna.
+
+    Args:
+        workspaces (WorkspaceManager): Gerenciador dos diretórios das sessões
+        temp_root (str): Diretório temporário do app
+        **opcoes: interval, max_age e keep (usados apenas na criação)
+
+    Returns:
+        Janitor: Limpeza do processo
+    """
+    global _janitor
+    with _janitor_lock:
+        if _janitor is None:
+            _janitor = Janitor(workspaces, temp_root, **opcoes).start()
+        return _janitor
+
+def get_janitor():
+    """Retorna a limpeza do processo, ou None se não foi iniciada"""
+    return _janitor
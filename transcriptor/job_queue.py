@@ -0,0 +1,350 @@
+"""
+Módulo com uma fila de trabalhos durável, guardada em um diretório.
+Cada trabalho é um arquivo JSON que muda de estado por renomeação atômica entre os
+subdiretórios da fila, então vários workers, inclusive em máquinas diferentes que
+compartilham o mesmo diretório (NFS, SMB), podem disputar os trabalhos sem banco de dados.
+
+Um worker reserva um trabalho por um tempo (lease) e renova a reserva enquanto processa.
+Se o worker morrer, a reserva expira e o trabalho volta para a fila. A entrega é "pelo
+menos uma vez": um trabalho pode ser processado de novo depois de uma falha, e o
+armazenamento de artefatos torna essa repetição barata.
+
+Toda alteração de um trabalho em execução (renovação, conclusão, falha, devolução) começa
+renomeando o arquivo para um nome privado: quem consegue a renomeação é o único que pode
+alterá-lo, então uma renovação nunca recria um trabalho que acabou de ser devolvido à fila.
+
+O vencimento das reservas usa o relógio (time.time()) de cada máquina: os relógios dos
+workers que compartilham a fila precisam estar sincronizados (NTP), com uma diferença bem
+menor que a duração da reserva.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import time
+import uuid
+
+# Subdiretório de cada estado
+ESTADOS = {
+    "pendente": "pendentes",
+    "em_execucao": "em_execucao",
+    "concluido": "concluidos",
+    "falhou": "falhas",
+}
+
+# Tempo padrão de reserva de um trabalho, renovado pelo worker enquanto processa
+DEFAULT_LEASE_SECONDS = 120
+
+# Número padrão de tentativas antes de um trabalho ir para as falhas
+DEFAULT_MAX_ATTEMPTS = 3
+
+class LeaseLostError(Exception):
+    """Erro lançado quando o worker perdeu a reserva de um trabalho"""
+
+class JobQueue:
+    """
+    Fila de trabalhos em um diretório compartilhado.
+
+    Args:
+        root (str): Diretório da fila
+        lease_seconds (float): Duração da reserva de um trabalho
+        max_attempts (int): Tentativas antes de um trabalho ir para as falhas
+    """
+
+    def __init__(self, root, lease_seconds=DEFAULT_LEASE_SECONDS, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        self.root = os.path.abspath(root)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        for dirname in list(ESTADOS.values()) + ["trabalhos"]:
+            os.makedirs(os.path.join(self.root, dirname), exist_ok=True)
+
+    def _path(self, estado, job_id):
+        return os.path.join(self.root, ESTADOS[estado], job_id + ".json")
+
+    def job_dir(self, job_id):
+        """Diretório com os arquivos de entrada e saída de um trabalho"""
+        return os.path.join(self.root, "trabalhos", job_id)
+
+    @staticmethod
+    def _read(path):
+        """Lê um trabalho; retorna None se o arquivo mudou de estado nesse meio tempo"""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _write(path, job):
+        """Grava um trabalho em um arquivo temporário e o renomeia, para nunca expor um JSON incompleto"""
+        job["atualizado_em"] = time.time()
+        fd, staging_path = tempfile.mkstemp(prefix=".", suffix=".tmp", dir=os.path.dirname(path))
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(job, f, ensure_ascii=False, indent=2)
+        os.replace(staging_path, path)
+
+    def enqueue(self, source_path, nome=None, perfil=None, resumo=True, move=False):
+        """
+        Adiciona um vídeo à fila, copiando-o para o diretório da fila.
+
+        Args:
+            source_path (str): Caminho do vídeo
+            nome (str, optional): Nome original do arquivo, usado nos resultados
+            perfil (str, optional): Perfil de extração de áudio
+            resumo (bool, optional): Se o worker deve gerar o resumo e o documento
+            move (bool, optional): Move o vídeo em vez de copiá-lo
+
+        Returns:
+            str: Identificador do trabalho
+        """
+        # O prefixo com o horário mantém a ordem de chegada na listagem
+        job_id = f"{time.time():.6f}".replace(".", "") + "_" + uuid.uuid4().hex[:8]
+        job_dir = self.job_dir(job_id)
+        os.makedirs(job_dir)
+
+        video_path = os.path.join(job_dir, "video" + os.path.splitext(source_path)[1].lower())
+        if move:
+            shutil.move(source_path, video_path)
+        else:
+            shutil.copyfile(source_path, video_path)
+
+        job = {
+            "id": job_id,
+            "estado": "pendente",
+            "nome": nome or os.path.basename(source_path),
+            "video": os.path.basename(video_path),
+            "perfil": perfil,
+            "resumo": resumo,
+            "criado_em": time.time(),
+            "tentativas": 0,
+            "lease": None,
+            "etapa": None,
+            "progresso": 0.0,
+            "resultado": None,
+            "erro": None
+        }
+        self._write(self._path("pendente", job_id), job)
+        return job_id
+
+    def get(self, job_id):
+        """
+        Procura um trabalho em qualquer estado.
+
+        Returns:
+            dict: Trabalho ou None se não existir
+        """
+        # Um trabalho pode mudar de estado durante a busca; tentar de novo resolve
+        for _ in range(3):
+            for estado in ("concluido", "falhou", "em_execucao", "pendente"):
+                job = self._read(self._path(estado, job_id))
+                if job is not None:
+                    return job
+        return None
+
+    def _lease_expiry(self, path, job):
+        """Horário em que a reserva expira; sem reserva gravada, conta desde a renomeação"""
+        lease = job.get("lease") if job else None
+        if lease:
+            return lease["expira_em"]
+        try:
+            return os.stat(path).st_ctime + self.lease_seconds
+        except OSError:
+            return float("inf")
+
+    @staticmethod
+    def _rename_private(path):
+        """
+        Renomeia um arquivo para um nome privado, ignorado nas listagens, para alterá-lo sem
+        disputa. O horário de modificação é atualizado, para o arquivo não parecer abandonado.
+
+        Returns:
+            str: Caminho privado
+
+        Raises:
+            FileNotFoundError: Se outro processo já renomeou o arquivo
+        """
+        directory, name = os.path.split(path)
+        private_path = os.path.join(directory, f".{name}.{uuid.uuid4().hex[:8]}")
+        os.rename(path, private_path)
+        try:
+            os.utime(private_path)
+        except OSError:
+            pass
+        return private_path
+
+    def _recover_abandoned(self, running_dir, now):
+        """
+        Devolve a em_execucao os trabalhos deixados com nome privado por um processo que
+        morreu durante uma alteração (sem alterações há mais que a duração da reserva).
+        """
+        for name in os.listdir(running_dir):
+            if not name.startswith(".") or name.endswith(".tmp") or ".json." not in name:
+                continue
+            path = os.path.join(running_dir, name)
+            try:
+                if now - os.stat(path).st_mtime < self.lease_seconds:
+                    continue
+                job_name = name[1:name.index(".json.") + len(".json")]
+                os.rename(path, os.path.join(running_dir, job_name))
+            except (OSError, ValueError):
+                continue
+
+    def requeue_expired(self):
+        """
+        Devolve à fila os trabalhos com a reserva expirada (worker morto ou travado).
+
+        Returns:
+            int: Número de trabalhos devolvidos ou enviados para as falhas
+        """
+        running_dir = os.path.join(self.root, ESTADOS["em_execucao"])
+        now = time.time()
+        count = 0
+        self._recover_abandoned(running_dir, now)
+
+        for name in os.listdir(running_dir):
+            if name.startswith(".") or not name.endswith(".json"):
+                continue
+            path = os.path.join(running_dir, name)
+            job = self._read(path)
+            if self._lease_expiry(path, job) > now:
+                continue
+
+            # Renomear para um nome privado garante que só um worker faz a devolução
+            try:
+                private_path = self._rename_private(path)
+            except FileNotFoundError:
+                continue
+
+            # A reserva pode ter sido renovada entre a leitura e a renomeação
+            job = self._read(private_path) or job
+            if job.get("lease") and job["lease"]["expira_em"] > now:
+                os.rename(private_path, path)
+                continue
+            job_id = job["id"]
+            job["lease"] = None
+            if job.get("tentativas", 0) >= self.max_attempts:
+                job["estado"] = "falhou"
+                job["erro"] = job.get("erro") or "O worker parou de responder em todas as tentativas."
+                destination = self._path("falhou", job_id)
+            else:
+                job["estado"] = "pendente"
+                destination = self._path("pendente", job_id)
+
+            self._write(private_path, job)
+            os.rename(private_path, destination)
+            count += 1
+        return count
+
+    def claim(self, worker_id):
+        """
+        Reserva o trabalho pendente mais antigo.
+
+        Args:
+            worker_id (str): Identificador do worker
+
+        Returns:
+            dict: Trabalho reservado ou None se a fila estiver vazia
+        """
+        self.requeue_expired()
+
+        pending_dir = os.path.join(self.root, ESTADOS["pendente"])
+        for name in sorted(os.listdir(pending_dir)):
+            if name.startswith(".") or not name.endswith(".json"):
+                continue
+
+            job_id = name[:-len(".json")]
+            running_path = self._path("em_execucao", job_id)
+            try:
+                # A renomeação é atômica: só um worker consegue mover o arquivo
+                os.rename(os.path.join(pending_dir, name), running_path)
+            except FileNotFoundError:
+                continue
+
+            job = self._read(running_path)
+            if job is None:
+                continue
+            job["estado"] = "em_execucao"
+            job["tentativas"] = job.get("tentativas", 0) + 1
+            job["lease"] = {"worker": worker_id, "expira_em": time.time() + self.lease_seconds}
+            job["erro"] = None
+            self._write(running_path, job)
+            return job
+        return None
+
+    def _take(self, job_id, worker_id):
+        """
+        Retira um trabalho em execução para alterá-lo, renomeando-o para um nome privado,
+        e confere se a reserva ainda é deste worker.
+
+        Returns:
+            tuple: (caminho em execução, caminho privado, trabalho); o chamador grava o
+                trabalho no caminho privado e o renomeia para o destino
+
+        Raises:
+            LeaseLostError: Se o trabalho não está em execução ou a reserva é de outro worker
+        """
+        path = self._path("em_execucao", job_id)
+        try:
+            private_path = self._rename_private(path)
+        except FileNotFoundError:
+            raise LeaseLostError(f"O trabalho {job_id} não está mais reservado para {worker_id}.")
+
+        job = self._read(private_path)
+        if job is None or not job.get("lease") or job["lease"]["worker"] != worker_id:
+            # Não é deste worker: devolver o arquivo como estava
+            os.rename(private_path, path)
+            raise LeaseLostError(f"O trabalho {job_id} não está mais reservado para {worker_id}.")
+        return path, private_path, job
+
+    def heartbeat(self, job_id, worker_id, etapa=None, progresso=None):
+        """
+        Renova a reserva de um trabalho e registra o andamento.
+
+        Raises:
+            LeaseLostError: Se a reserva expirou e o trabalho foi devolvido à fila
+        """
+        path, private_path, job = self._take(job_id, worker_id)
+        job["lease"]["expira_em"] = time.time() + self.lease_seconds
+        if etapa is not None:
+            job["etapa"] = etapa
+        if progresso is not None:
+            job["progresso"] = progresso
+        self._write(private_path, job)
+        os.rename(private_path, path)
+        return job
+
+    def complete(self, job_id, worker_id, resultado):
+        """
+        Marca um trabalho como concluído.
+
+        Args:
+            job_id (str): Identificador do trabalho
+            worker_id (str): Identificador do worker
+            resultado (dict): Arquivos gerados, relativos ao diretório do trabalho
+        """
+        _, private_path, job = self._take(job_id, worker_id)
+        job.update(estado="concluido", lease=None, etapa=None, progresso=1.0, resultado=resultado)
+        self._write(private_path, job)
+        os.rename(private_path, self._path("concluido", job_id))
+
+    def fail(self, job_id, worker_id, erro, retry=True):
+        """
+        Registra a falha de um trabalho, devolvendo-o à fila enquanto houver tentativas.
+
+        Args:
+            job_id (str): Identificador do trabalho
+            worker_id (str): Identificador do worker
+            erro (str): Mensagem de erro
+            retry (bool, optional): Se a falha pode ser temporária
+        """
+        _, private_path, job = self._take(job_id, worker_id)
+        job.update(lease=None, erro=erro)
+        if retry and job.get("tentativas", 0) < self.max_attempts:
+            job["estado"] = "pendente"
+            destination = self._path("pendente", job_id)
+        else:
+            job["estado"] = "falhou"
+            destination = self._path("falhou", job_id)
+        self._write(private_path, job)
+        os.rename(private_path, destination)
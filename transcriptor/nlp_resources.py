@@ -0,0 +1,173 @@
+"""
+Módulo com os recursos de NLP (tokenizadores, stopwords e palavras-chave) compartilhados pelo processo.
+A divisão em palavras e a contagem de palavras-chave são feitas em Python puro, com
+expressões regulares e Counter. O NLTK é opcional: quando instalado, com os dados
+baixados na instalação (python nlp_resources.py, chamado pelo setup.sh), fornece o
+tokenizador de sentenças Punkt e a lista de stopwords; sem ele, são usados um
+tokenizador por pontuação e a lista de stopwords incluída abaixo. O NLTK só é importado
+quando um desses recursos é pedido pela primeira vez. Nenhuma função daqui acessa a rede
+durante as requisições.
+"""
+
+import os
+import re
+import sys
+import threading
+from collections import Counter
+
+from startup_profile import lazy_import
+
+# Diretório local com os dados do NLTK baixados na instalação
+NLTK_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "nltk_data")
+
+# Recursos baixados na instalação
+NLTK_RESOURCES = ("punkt_tab", "punkt", "stopwords")
+
+# Lista de stopwords do NLTK para o português, usada quando o corpus não está instalado
+PORTUGUESE_STOPWORDS = frozenset("""
+a à ao aos aquela aquelas aquele aqueles aquilo as às até com como da das de dela delas
+dele deles depois do dos e é ela elas ele eles em entre era eram éramos essa essas esse
+esses esta está estamos estão estar estas estava estavam estávamos este esteja estejam
+estejamos estes esteve estive estivemos estiver estivera estiveram estivéramos estiverem
+estivermos estivesse estivessem estivéssemos estou eu foi fomos for fora foram fôramos
+forem formos fosse fossem fôssemos fui há haja hajam hajamos hão havemos haver hei houve
+houvemos houver houvera houverá houveram houvéramos houverão houverei houverem houveremos
+houveria houveriam houveríamos houvermos houvesse houvessem houvéssemos isso isto já lhe
+lhes mais mas me mesmo meu meus minha minhas muito na não nas nem no nos nós nossa nossas
+nosso nossos num numa o os ou para pela pelas pelo pelos por qual quando que quem são se
+seja sejam sejamos sem ser será serão serei seremos seria seriam seríamos seu seus só somos
+sou sua suas também te tem tém temos tenha tenham tenhamos tenho terá terão terei teremos
+teria teriam teríamos teu teus teve tinha tinham tínhamos tive tivemos tiver tivera tiveram
+tivéramos tiverem tivermos tivesse tivessem tivéssemos tu tua tuas um uma você vocês vos
+""".split())
+
+# Palavras, mantendo unidos os hífens, apóstrofos e pontos internos ("guarda-chuva", "d'água",
+# "3.5") e as vírgulas decimais ("1,5"), como o tokenizador Treebank do NLTK; sequências de
+# pontuação viram tokens próprios
+WORD_PATTERN = re.compile(r"\w+(?:[-'’.]\w+|,\d+)*|[^\w\s]+")
+
+class SimpleSentenceTokenizer:
+    """Tokenizador de sentenças baseado em pontuação, usado sem os dados do Punkt"""
+
+    _pattern = re.compile(r"(?<=[.!?])\s+")
+
+    def tokenize(self, text):
+        return [sentence for sentence in self._pattern.split(text) if sentence]
+
+# Recursos já carregados, compartilhados por todas as sessões do processo
+# (reentrante: o carregamento de um recurso pode pedir outro, como o NLTK)
+_resources = {}
+_resources_lock = threading.RLock()
+
+def _get_resource(name, loader):
+    """Carrega um recurso na primeira chamada e devolve sempre a mesma instância"""
+    resource = _resources.get(name)
+    if resource is not None:
+        return resource
+    with _resources_lock:
+        resource = _resources.get(name)
+        if resource is None:
+            resource = loader()
+            _resources[name] = resource
+        return resource
+
+def _import_nltk():
+    """Importa o NLTK com o diretório local de dados no caminho; False se não estiver instalado"""
+    try:
+        nltk = lazy_import("nltk")
+    except ImportError:
+        return False
+    if NLTK_DATA_DIR not in nltk.data.path:
+        nltk.data.path.insert(0, NLTK_DATA_DIR)
+    return nltk
+
+def get_nltk():
+    """Retorna o módulo do NLTK, importado na primeira chamada, ou None se não estiver instalado"""
+    return _get_resource("nltk", _import_nltk) or None
+
+def _load_sentence_tokenizer():
+    nltk = get_nltk()
+    if nltk is None:
+        return SimpleSentenceTokenizer()
+
+    # NLTK 3.8.2+: modelo em punkt_tab (sem pickle)
+    try:
+        from nltk.tokenize import PunktTokenizer
+        return PunktTokenizer("portuguese")
+    except (ImportError, LookupError, OSError):
+        pass
+
+    # Versões anteriores do NLTK: modelo em pickle do pacote punkt
+    try:
+        return nltk.data.load("tokenizers/punkt/portuguese.pickle")
+    except Exception:
+        print("Aviso: dados do Punkt não encontrados; usando tokenização por pontuação.", file=sys.stderr)
+        return SimpleSentenceTokenizer()
+
+def _load_stopwords():
+    if get_nltk() is None:
+        return PORTUGUESE_STOPWORDS
+    try:
+        from nltk.corpus import stopwords
+        return frozenset(stopwords.words("portuguese"))
+    except LookupError:
+        return PORTUGUESE_STOPWORDS
+
+def get_sentence_tokenizer():
+    """Retorna o tokenizador de sentenças do português, compartilhado pelo processo"""
+    return _get_resource("sentencas", _load_sentence_tokenizer)
+
+def get_stopwords():
+    """Retorna as stopwords do português como frozenset, compartilhado pelo processo"""
+    return _get_resource("stopwords", _load_stopwords)
+
+def tokenize_words(text):
+    """
+    Divide um texto em palavras e sinais de pontuação, em Python puro, como o
+    nltk.word_tokenize(text, "portuguese") (tokenizador Treebank)
+    """
+    return WORD_PATTERN.findall(text)
+
+def content_words(text):
+    """Retorna as palavras significativas de um texto: em minúsculas, alfanuméricas e sem stopwords"""
+    stop_words = get_stopwords()
+    return [word for word in tokenize_words(text.lower()) if word.isalnum() and word not in stop_words]
+
+def extract_keywords(text, top_n=10):
+    """
+    Conta as palavras significativas de um texto.
+
+    Args:
+        text (str): Texto
+        top_n (int, optional): Número de palavras-chave
+
+    Returns:
+        tuple: (palavras significativas em ordem, lista de (palavra, frequência) das top_n mais comuns)
+    """
+    words = content_words(text)
+    return words, Counter(words).most_common(top_n)
+
+def prefetch(download_dir=NLTK_DATA_DIR):
+    """
+    Baixa os dados do NLTK para o diretório local. Usado na instalação, nunca durante as requisições.
+
+    Returns:
+        bool: True se todos os recursos foram baixados
+    """
+    nltk = get_nltk()
+    if nltk is None:
+        print("NLTK não instalado; será usado o tokenizador interno.", file=sys.stderr)
+        return False
+    os.makedirs(download_dir, exist_ok=True)
+    ok = True
+    for resource in NLTK_RESOURCES:
+        ok = nltk.download(resource, download_dir=download_dir, quiet=True) and ok
+    return ok
+
+if __name__ == "__main__":
+    print(f"Baixando recursos do NLTK para {NLTK_DATA_DIR}...")
+    if prefetch():
+        print("Recursos do NLTK baixados com sucesso!")
+    else:
+        print("Não foi possível baixar todos os recursos; será usado o método alternativo.", file=sys.stderr)
+        sys.exit(1)
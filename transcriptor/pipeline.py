@@ -0,0 +1,277 @@
+"""
+Módulo com o modo de processamento em pipeline: extração e transcrição simultâneas.
+O FFmpeg grava o áudio em segmentos e anuncia cada segmento concluído na saída padrão;
+cada segmento vai direto para a transcrição enquanto os seguintes ainda estão sendo
+extraídos. O primeiro texto aparece segundos depois do início, e o tempo total se
+aproxima do da etapa mais lenta, em vez da soma das etapas.
+
+Os cortes são feitos em tempos fixos (não há como procurar silêncios em um áudio que
+ainda não foi extraído), então as emendas não têm sobreposição.
+
+Cada segmento é transcrito com os tempos (verbose_json), como em GroqTranscriber.transcribe,
+e o resultado é guardado nas mesmas chaves: o botão "Transcrever" reaproveita a transcrição
+feita em pipeline e vice-versa.
+"""
+
+import os
+import queue
+import subprocess
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from artifact_store import hash_file
+from embedded_ffmpeg import EmbeddedFFmpeg, get_audio_profile, audio_output_path, PERFIL_PADRAO
+from processing import AudioExtractor
+from resilience import CircuitOpenError
+from segment_index import merge_chunk_segments
+from workspace import pin, unpin, pinned
+
+# Duração do primeiro segmento: curto para o primeiro texto aparecer logo
+FIRST_SEGMENT_SECONDS = 30
+# Duração máxima dos segmentos seguintes; cada um dobra de tamanho até este limite,
+# para não fazer requisições demais em gravações longas
+MAX_SEGMENT_SECONDS = 600
+
+def segment_times(duration, first=FIRST_SEGMENT_SECONDS, maximum=MAX_SEGMENT_SECONDS):
+    """
+    Calcula os pontos de corte dos segmentos, que crescem em progressão geométrica.
+
+    Args:
+        duration (float): Duração do áudio em segundos (None se desconhecida)
+        first (float, optional): Duração do primeiro segmento
+        maximum (float, optional): Duração máxima de um segmento
+
+    Returns:
+        list: Pontos de corte em segundos
+    """
+    if not duration:
+        # Sem a duração, cortes para as primeiras 24 horas bastam
+        duration = 24 * 3600
+
+    times = []
+    position = 0.0
+    length = first
+    while position + length < duration:
+        position += length
+        times.append(position)
+        length = min(length * 2, maximum)
+    return times
+
+def _cached_result(transcriber, extraction_key, audio_path):
+    """
+    Procura a transcrição já feita do áudio deste vídeo, nas chaves de GroqTranscriber.transcribe.
+
+    Args:
+        transcriber (GroqTranscriber): Transcritor com armazenamento de artefatos
+        extraction_key (str): Chave do áudio extraído no armazenamento
+        audio_path (str): Caminho onde copiar o áudio (None para não copiar)
+
+    Returns:
+        dict: Resultado no formato de transcribe_video_pipelined, ou None se não houver
+    """
+    store = transcriber.store
+    stored_audio = store.get_path(extraction_key)
+    if stored_audio is None:
+        return None
+    try:
+        audio_hash = hash_file(stored_audio)
+    except OSError:
+        # Removido pela limpeza do armazenamento
+        return None
+
+    text = store.get_text(transcriber.cache_key(stored_audio, audio_hash=audio_hash))
+    if text is None:
+        return None
+    index = transcriber._load_index(transcriber.cache_key(stored_audio, etapa="segmentos", audio_hash=audio_hash))
+    if audio_path:
+        audio_path = store.get_file(extraction_key, audio_path)
+    return {"texto": text, "audio_path": audio_path, "indice": index, "falhas": []}
+
+def _store_result(transcriber, extraction_key, audio_path, text, index):
+    """Guarda o áudio, a transcrição e o índice nas mesmas chaves de AudioExtractor e GroqTranscriber"""
+    store = transcriber.store
+    audio_hash = hash_file(audio_path)
+    store.put_text(transcriber.cache_key(audio_path, audio_hash=audio_hash), text)
+    if index:
+        store.put_text(transcriber.cache_key(audio_path, etapa="segmentos", audio_hash=audio_hash), index.to_json())
+    store.put_file(extraction_key, audio_path)
+
+def transcribe_video_pipelined(video_path, transcriber, output_dir, perfil=PERFIL_PADRAO,
+                               audio_path=None, video_hash=None, on_text=None, progress_callback=None):
+    """
+    Extrai o áudio de um vídeo e transcreve os segmentos à medida que ficam prontos.
+
+    Os callbacks são sempre chamados na thread que chamou esta função (no app, a thread
+    do script do Streamlit); as threads de trabalho só fazem as chamadas à API.
+
+    Args:
+        video_path (str): Caminho para o arquivo de vídeo
+        transcriber (GroqTranscriber): Transcritor usado em cada segmento
+        output_dir (str): Diretório dos segmentos temporários
+        perfil (str, optional): Perfil de extração em PERFIS_AUDIO
+        audio_path (str, optional): Se informado, grava também o áudio completo neste caminho
+        video_hash (str, optional): Hash do vídeo, se já conhecido (evita reler o arquivo)
+        on_text (callable, optional): Recebe o texto já transcrito, em ordem, sempre que ele cresce
+        progress_callback (callable, optional): Recebe o progresso entre 0 e 1
+
+    Returns:
+        dict: {"texto": str, "audio_path": str ou None, "indice": SegmentIndex ou None,
+            "falhas": lista de (segmento, erro)}
+    """
+    transcriber.ultimo_indice = None
+    if audio_path:
+        audio_path = audio_output_path(audio_path, perfil)
+
+    # Reaproveitar a transcrição já feita do áudio deste vídeo, em pipeline ou não
+    extraction_key = None
+    if transcriber.store is not None:
+        extraction_key = AudioExtractor.cache_key(transcriber.store, video_path, perfil, video_hash)
+        cached = _cached_result(transcriber, extraction_key, audio_path)
+        if cached is not None:
+            transcriber.ultimo_indice = cached["indice"]
+            if on_text:
+                on_text(cached["texto"])
+            if progress_callback:
+                progress_callback(1.0)
+            return cached
+
+    ffmpeg_path = EmbeddedFFmpeg.get_ffmpeg_path()
+    if not ffmpeg_path:
+        raise RuntimeError("FFmpeg não encontrado. Não é possível extrair áudio.")
+
+    config_perfil = get_audio_profile(perfil)
+    extension = config_perfil["extensao"]
+    duration = EmbeddedFFmpeg.get_duration(video_path)
+    times = segment_times(duration)
+    expected_segments = len(times) + 1
+
+    os.makedirs(output_dir, exist_ok=True)
+    prefix = f"pipeline_{uuid.uuid4().hex[:8]}_"
+    output_pattern = os.path.join(output_dir, f"{prefix}%03d{extension}")
+
+    # Segmentos anunciados na saída padrão assim que cada um é fechado
+    command = [
+        ffmpeg_path,
+        "-i", video_path,
+        "-vn",
+        *config_perfil["parametros"],
+        "-f", "segment",
+        "-segment_times", ",".join(f"{t:.3f}" for t in times),
+        "-reset_timestamps", "1",
+        "-segment_list", "pipe:1",
+        "-segment_list_type", "flat",
+        "-y",
+        output_pattern
+    ]
+    if audio_path:
+        # Segunda saída com o áudio completo, para reprodução e novas transcrições
+        command += ["-vn", *config_perfil["parametros"], "-y", audio_path]
+
+    events = queue.Queue()
+    process = subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True
+    )
+
+    def read_segments():
+        # Lê os nomes dos segmentos concluídos e avisa a thread principal
+        for line in process.stdout:
+            name = line.strip()
+            if name:
+                events.put(("segmento", os.path.join(output_dir, os.path.basename(name))))
+        events.put(("fim_extracao", None))
+
+    stderr_lines = []
+
+    def drain_stderr():
+        # Consome o stderr para o FFmpeg não travar com o buffer cheio
+        for line in process.stderr:
+            stderr_lines.append(line)
+
+    threading.Thread(target=read_segments, daemon=True).start()
+    threading.Thread(target=drain_stderr, daemon=True).start()
+
+    segments = []
+    results = {}
+    # Segmentos com tempo de cada parte, no tempo da parte
+    chunk_segments = {}
+    failures = []
+    emitted = 0
+    extraction_done = False
+    completed = 0
+
+    # O vídeo e os segmentos ainda não transcritos não podem ser removidos pela limpeza dos temporários
+    with pinned(video_path), ThreadPoolExecutor(max_workers=transcriber.MAX_WORKERS, thread_name_prefix="pipeline-chunk") as executor:
+        while not extraction_done or completed < len(segments):
+            kind, payload = events.get()
+
+            if kind == "segmento":
+                index = len(segments)
+                segments.append(payload)
+                pin(payload)
+                future = executor.submit(transcriber.request_segments, payload)
+                future.add_done_callback(lambda f, index=index: events.put(("transcrito", (index, f))))
+
+            elif kind == "fim_extracao":
+                extraction_done = True
+                process.wait()
+                if process.returncode != 0:
+                    failures.append((None, "".join(stderr_lines[-20:])))
+
+            elif kind == "transcrito":
+                index, future = payload
+                completed += 1
+                try:
+                    results[index], chunk_segments[index] = future.result() or ("", [])
+                except Exception as e:
+                    results[index], chunk_segments[index] = "", []
+                    failures.append((segments[index], e))
+                    # Provedor fora do ar: não adianta continuar extraindo
+                    if isinstance(e, CircuitOpenError) and process.poll() is None:
+                        process.kill()
+
+                # Remove o segmento temporário
+                try:
+                    os.remove(segments[index])
+                except OSError:
+                    pass
+                unpin(segments[index])
+
+                # Emite o texto apenas quando todos os segmentos anteriores estão prontos
+                advanced = False
+                while emitted in results:
+                    emitted += 1
+                    advanced = True
+                if advanced and on_text:
+                    on_text("".join(results[i] + "\n" for i in range(emitted)))
+
+                if progress_callback:
+                    progress_callback(min(1.0, completed / max(expected_segments, len(segments))))
+
+    text = "".join(results[i] + "\n" for i in range(len(segments)))
+
+    # As partes começam nos pontos de corte; o Whisper dá os tempos a partir do início de cada uma
+    index = merge_chunk_segments([
+        (
+            times[i - 1] if i > 0 else 0.0,
+            times[i] if i < len(times) else (duration or float("inf")),
+            chunk_segments[i]
+        )
+        for i in range(len(segments))
+    ]) or None
+    transcriber.ultimo_indice = index
+
+    audio_path = audio_path if audio_path and os.path.exists(audio_path) else None
+    # Só guarda transcrições completas; sem o áudio não há como chegar à chave da transcrição
+    if extraction_key and audio_path and not failures and text.strip():
+        _store_result(transcriber, extraction_key, audio_path, text, index)
+
+    return {
+        "texto": text,
+        "audio_path": audio_path,
+        "indice": index,
+        "falhas": failures
+    }
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Módulo com o pré-aquecimento do servidor.
+Quando o processo do servidor começa, uma thread em segundo plano prepara o que a
+primeira sessão pagaria sozinha: a busca do FFmpeg e a consulta dos seus recursos
+(inclusive o download, se necessário), os recursos de NLP, as bibliotecas pesadas, o
+modelo do documento e os clientes do Groq e do Gemini. Tudo fica em caches do processo, então as sessões seguintes
+reaproveitam os recursos prontos.
+
+O estado de cada etapa fica disponível para a interface (get_prewarm().snapshot()), e
+quem depende de uma etapa pode esperar por ela com wait().
+
+Uso pela linha de comando (executa as etapas e mostra o tempo de cada uma):
+    python prewarm.py
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+
+from startup_profile import stage, lazy_import
+
+# Etapas do pré-aquecimento, em ordem de execução, com a descrição mostrada na interface
+ETAPAS = {
+    "ffmpeg": "FFmpeg e seus recursos",
+    "nlp": "Recursos de NLP",
+    "bibliotecas": "Bibliotecas de processamento",
+    "documento": "Modelo do documento",
+    "clientes": "Clientes das APIs",
+}
+
+# Bibliotecas importadas na etapa "bibliotecas"
+BIBLIOTECAS = ("moviepy", "pydub", "numpy", "groq", "google.generativeai", "docx")
+
+# Estados de uma etapa
+PENDENTE = "pendente"
+EXECUTANDO = "executando"
+PRONTO = "pronto"
+FALHOU = "falhou"
+
+def _load_saved_keys():
+    """Chaves das variáveis de ambiente, sobrescritas pela configuração salva pelo app"""
+    from processing import temp_dir
+
+    keys = {
+        "GROQ_API_KEY": os.environ.get("GROQ_API_KEY"),
+        "GOOGLE_API_KEY": os.environ.get("GOOGLE_API_KEY")
+    }
+    config_path = os.path.join(temp_dir, "config.json")
+    try:
+        with open(config_path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+        keys.update({name: config[name] for name in keys if config.get(name)})
+    except (OSError, ValueError):
+        pass
+    return keys
+
+class Prewarm:
+    """
+    Executa as etapas do pré-aquecimento e guarda o estado de cada uma.
+
+    Args:
+        keys (dict, optional): Chaves GROQ_API_KEY e GOOGLE_API_KEY para criar os clientes;
+            sem elas, usa as variáveis de ambiente e a configuração salva pelo app
+    """
+
+    def __init__(self, keys=None):
+        self.keys = keys
+        self._lock = threading.Lock()
+        self._status = {
+            etapa: {"descricao": descricao, "estado": PENDENTE, "duracao": None, "erro": None, "resultado": None}
+            for etapa, descricao in ETAPAS.items()
+        }
+        self._events = {etapa: threading.Event() for etapa in ETAPAS}
+        self._thread = None
+
+    def _step_ffmpeg(self):
+        from ffmpeg_resolver import get_ffmpeg_info
+        return get_ffmpeg_info()
+
+    def _step_nlp(self):
+        from nlp_resources import get_sentence_tokenizer, get_stopwords
+        get_sentence_tokenizer()
+        return len(get_stopwords())
+
+    def _step_bibliotecas(self):
+        loaded = []
+        for module_name in BIBLIOTECAS:
+            try:
+                lazy_import(module_name)
+                loaded.append(module_name)
+            except ImportError:
+                pass
+        return loaded
+
+    def _step_documento(self):
+        from processing import SummaryDocumentBuilder
+        return len(SummaryDocumentBuilder.get_template())
+
+    def _step_clientes(self):
+        from processing import get_groq_client, get_gemini_model, SummaryGenerator
+
+        keys = self.keys or _load_saved_keys()
+        created = []
+        if keys.get("GROQ_API_KEY"):
+            get_groq_client(keys["GROQ_API_KEY"], os.environ.get("GROQ_BASE_URL"))
+            created.append("groq")
+        if keys.get("GOOGLE_API_KEY"):
+            get_gemini_model(keys["GOOGLE_API_KEY"], SummaryGenerator.MODEL_ID)
+            created.append("gemini")
+        return created
+
+    def _run_step(self, etapa):
+        with self._lock:
+            self._status[etapa]["estado"] = EXECUTANDO
+        start = time.perf_counter()
+        try:
+            with stage(f"pré-aquecimento: {etapa}"):
+                resultado = getattr(self, f"_step_{etapa}")()
+            estado, erro = PRONTO, None
+        except Exception as e:
+            resultado, estado, erro = None, FALHOU, str(e)
+            print(f"Erro no pré-aquecimento ({ETAPAS[etapa]}): {erro}", file=sys.stderr)
+        with self._lock:
+            self._status[etapa].update(
+                estado=estado,
+                duracao=time.perf_counter() - start,
+                erro=erro,
+                resultado=resultado
+            )
+        self._events[etapa].set()
+
+    def run(self):
+        """Executa todas as etapas, em ordem, na thread atual"""
+        for etapa in ETAPAS:
+            self._run_step(etapa)
+
+    def start(self):
+        """Executa as etapas em uma thread em segundo plano"""
+        self._thread = threading.Thread(target=self.run, daemon=True, name="pre-aquecimento")
+        self._thread.start()
+        return self
+
+    def snapshot(self):
+        """Cópia do estado de cada etapa"""
+        with self._lock:
+            return {etapa: dict(status) for etapa, status in self._status.items()}
+
+    def ready(self):
+        """True quando todas as etapas terminaram (com ou sem erro)"""
+        return all(event.is_set() for event in self._events.values())
+
+    def wait(self, etapa=None, timeout=None):
+        """
+        Espera uma etapa (ou todas) terminar.
+
+        Returns:
+            bool: True se a etapa terminou dentro do tempo
+        """
+        if etapa is not None:
+            return self._events[etapa].wait(timeout)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for event in self._events.values():
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not event.wait(remaining):
+                return False
+        return True
+
+    def result(self, etapa):
+        """Resultado de uma etapa concluída, ou None"""
+        with self._lock:
+            return self._status[etapa]["resultado"]
+
+# Pré-aquecimento do processo, iniciado uma única vez
+_prewarm = None
+_prewarm_lock = threading.Lock()
+
+def start_prewarm(keys=None):
+    """Inicia o pré-aquecimento do processo em segundo plano, se ainda não foi iniciado, e o retorna"""
+    global _prewarm
+    with _prewarm_lock:
+        if _prewarm is None:
+            _prewarm = Prewarm(keys).start()
+        return _prewarm
+
+def get_prewarm():
+    """Retorna o pré-aquecimento do processo, ou None se não foi iniciado"""
+    return _prewarm
+
+if __name__ == "__main__":
+    prewarm = Prewarm()
+    prewarm.run()
+    for etapa, status in prewarm.snapshot().items():
+        detalhe = status["erro"] or status["resultado"]
+        print(f"{status['descricao']:<30} {status['estado']:<8} {status['duracao']:.3f}s  {detalhe}")
@@ -0,0 +1,1159 @@
+"""
+Módulo com as etapas de processamento: extração de áudio, transcrição e resumo.
+Não depende do Streamlit, então pode ser usado pelo app, pela linha de comando e por
+processos de trabalho. As mensagens para o usuário passam por notify(), que por padrão
+escreve no terminal e no app é redirecionado para o Streamlit com set_notifier().
+"""
+
+import os
+import sys
+import tempfile
+import math
+import io
+import re
+import copy
+import threading
+import uuid
+from collections import Counter
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, as_completed
+# moviepy, google.generativeai, groq, pydub e python-docx são importados com lazy_import
+# apenas quando a etapa que os usa roda pela primeira vez, para o app abrir mais rápido
+from startup_profile import lazy_import
+from silence_split import merge_overlapping_text
+from artifact_store import hash_file, hash_text
+from resilience import RetryPolicy, CircuitOpenError, call_with_retry, get_circuit_breaker
+from embedded_ffmpeg import PERFIL_PADRAO, get_audio_profile, audio_output_path
+from workspace import pin, unpin, pinned
+from nlp_resources import get_sentence_tokenizer, content_words, extract_keywords
+from segment_index import SegmentIndex, parse_segments, merge_chunk_segments
+
+# Diretório temporário para arquivos
+temp_dir = os.path.join(tempfile.gettempdir(), 'streamlit_audio_processor')
+os.makedirs(temp_dir, exist_ok=True)
+
+class ConsoleNotifier:
+    """Exibe as mensagens no terminal; usado fora do Streamlit"""
+    
+    def info(self, message):
+        print(message)
+    
+    def success(self, message):
+        print(message)
+    
+    def warning(self, message):
+        print(f"Aviso: {message}", file=sys.stderr)
+    
+    def error(self, message):
+        print(f"Erro: {message}", file=sys.stderr)
+
+_notifier = ConsoleNotifier()
+
+def set_notifier(notifier):
+    """
+    Define o destino das mensagens para o usuário.
+    
+    Args:
+        notifier: Objeto com os métodos info, success, warning e error
+            (o próprio módulo streamlit serve)
+    """
+    global _notifier
+    _notifier = notifier
+
+def notify(level, message):
+    """Envia uma mensagem ao usuário ("info", "success", "warning" ou "error")"""
+    getattr(_notifier, level)(message)
+
+# Clientes das APIs, compartilhados por todas as sessões do processo
+_api_clients = {}
+_api_clients_lock = threading.Lock()
+# Chave e endpoint com que o google.generativeai está configurado (a configuração é global)
+_gemini_config = None
+
+def get_groq_client(api_key, base_url=None):
+    """
+    Retorna o cliente do Groq para uma chave, criado na primeira chamada e reaproveitado
+    depois (com as conexões já abertas). O cliente pode ser usado por várias threads.
+    """
+    key = ("groq", api_key, base_url)
+    with _api_clients_lock:
+        client = _api_clients.get(key)
+        if client is None:
+            # As repetições ficam com a camada de resiliência, não com o SDK
+            client = lazy_import("groq").Groq(api_key=api_key, base_url=base_url, max_retries=0)
+            _api_clients[key] = client
+        return client
+
+def get_gemini_model(api_key, model_id, api_endpoint=None):
+    """
+    Retorna o modelo do Gemini para uma chave, configurando o google.generativeai apenas
+    quando a chave ou o endpoint mudam.
+    """
+    global _gemini_config
+    genai = lazy_import("google.generativeai")
+    with _api_clients_lock:
+        if _gemini_config != (api_key, api_endpoint):
+            if api_endpoint:
+                # Endpoint alternativo (ex: servidor falso local para testes)
+                genai.configure(api_key=api_key, transport="rest", client_options={"api_endpoint": api_endpoint})
+            else:
+                genai.configure(api_key=api_key)
+            _gemini_config = (api_key, api_endpoint)
+            # Os modelos criados antes usam o cliente da configuração anterior
+            for key in [key for key in _api_clients if key[0] == "gemini"]:
+                del _api_clients[key]
+        
+        key = ("gemini", model_id)
+        model = _api_clients.get(key)
+        if model is None:
+            model = genai.GenerativeModel(model_id)
+            _api_clients[key] = model
+        return model
+
+# Classe para extração de áudio
+class AudioExtractor:
+    @staticmethod
+    def cache_key(store, video_path, perfil=PERFIL_PADRAO, video_hash=None):
+        """Chave do áudio extraído de um vídeo com um perfil no armazenamento de artefatos"""
+        return store.make_key(
+            video_hash or hash_file(video_path),
+            etapa="extracao",
+            perfil=perfil,
+            parametros=get_audio_profile(perfil)["parametros"]
+        )
+    
+    @staticmethod
+    def extract_audio(video_path, output_path, perfil=PERFIL_PADRAO, store=None, video_hash=None, progress_callback=None):
+        # Reaproveitar o áudio já extraído do mesmo vídeo com o mesmo perfil
+        key = None
+        if store is not None:
+            key = AudioExtractor.cache_key(store, video_path, perfil, video_hash)
+            cached_path = store.get_file(key, output_path)
+            if cached_path:
+                if progress_callback:
+                    progress_callback(1.0, None, 0.0)
+                return cached_path
+        
+        result = AudioExtractor._extract_audio(video_path, output_path, perfil, progress_callback)
+        if result and key:
+            store.put_file(key, result)
+        return result
+    
+    @staticmethod
+    def _extract_audio(video_path, output_path, perfil=PERFIL_PADRAO, progress_callback=None):
+        try:
+            # Primeiro tenta usar o FFmpeg embutido
+            try:
+                from embedded_ffmpeg import EmbeddedFFmpeg
+                result = EmbeddedFFmpeg.extract_audio(video_path, output_path, perfil, progress_callback)
+                if result:
+                    return result
+                # Se falhar, continua com o método padrão
+            except ImportError:
+                notify("warning", "FFmpeg embutido não encontrado. Tentando método alternativo...")
+            
+            # Antes de recodificar com o MoviePy, tentar copiar o fluxo de áudio
+            # usando o FFmpeg que acompanha o MoviePy (imageio-ffmpeg)
+            try:
+                from imageio_ffmpeg import get_ffmpeg_exe
+                from embedded_ffmpeg import EmbeddedFFmpeg
+                result = EmbeddedFFmpeg.copy_audio_stream(video_path, output_path, perfil, get_ffmpeg_exe(), progress_callback)
+                if result:
+                    return result
+            except Exception:
+                pass
+            
+            # Método original com MoviePy como fallback, usando as mesmas opções do perfil
+            output_path = audio_output_path(output_path, perfil)
+            video = lazy_import("moviepy").VideoFileClip(video_path)
+            audio = video.audio
+            audio.write_audiofile(output_path, **get_audio_profile(perfil)["moviepy"])
+            return output_path
+        except Exception as e:
+            notify("error", f"Erro ao extrair áudio: {str(e)}")
+            if "ffmpeg" in str(e).lower():
+                notify("error", "Certifique-se de que o FFmpeg está instalado corretamente ou use o FFmpeg embutido.")
+                
+                # Tentar baixar FFmpeg embutido se o erro for relacionado ao FFmpeg
+                try:
+                    notify("info", "Tentando baixar e configurar o FFmpeg embutido...")
+                    from download_ffmpeg import download_ffmpeg_for_current_os
+                    from ffmpeg_resolver import get_ffmpeg_info
+                    if download_ffmpeg_for_current_os():
+                        # Refazer a busca, que pode ter guardado outro FFmpeg (ou nenhum)
+                        get_ffmpeg_info(refresh=True)
+                    
+                    # Tentar novamente com FFmpeg embutido
+                    from embedded_ffmpeg import EmbeddedFFmpeg
+                    result = EmbeddedFFmpeg.extract_audio(video_path, output_path, perfil)
+                    if result:
+                        notify("success", "Áudio extraído com sucesso usando FFmpeg embutido!")
+                        return result
+                except Exception as e2:
+                    notify("error", f"Não foi possível configurar o FFmpeg embutido: {str(e2)}")
+            return None
+
+# Classe para transcrição de áudio
+class GroqTranscriber:
+    def __init__(self, api_key, max_workers=None, store=None, base_url=None, api_semaphore=None, work_dir=None):
+        # Cliente compartilhado pelo processo; as repetições ficam com a camada de resiliência
+        self.client = get_groq_client(api_key, base_url)
+        self.MAX_FILE_SIZE = 25 * 1024 * 1024  # 25 MB em bytes
+        self.MODEL_ID = "whisper-large-v3-turbo"
+        self.LANGUAGE = "pt"
+        # Número máximo de chunks enviados ao mesmo tempo para a API
+        self.MAX_WORKERS = max_workers or 4
+        # Armazenamento de artefatos para reaproveitar transcrições (opcional)
+        self.store = store
+        # Chunks que falharam na última transcrição
+        self.failed_chunks = []
+        # Segmentos com tempo de cada chunk da última transcrição, no tempo do chunk
+        self.chunk_segments = []
+        # Índice de segmentos da última transcrição, no tempo do áudio completo
+        self.ultimo_indice = None
+        # Repetição com espera para 429/erros temporários e disjuntor compartilhado do Groq
+        self.retry_policy = RetryPolicy()
+        self.breaker = get_circuit_breaker("groq")
+        # Semáforo opcional compartilhado com outros transcritores para limitar as requisições simultâneas
+        self.api_semaphore = api_semaphore or nullcontext()
+        # Diretório das partes temporárias (o diretório da sessão ou do trabalho, quando houver)
+        self.work_dir = work_dir or temp_dir
+        
+    def get_file_size(self, file_path):
+        """Retorna o tamanho do arquivo em bytes"""
+        return os.path.getsize(file_path)
+    
+    def split_audio(self, audio_path, chunk_duration=300000):  # 300000 ms = 5 minutos
+        """
+        Divide o áudio em partes menores
+        Retorna: Lista com os caminhos dos arquivos temporários
+        """
+        return [chunk_path for chunk_path, _, _ in self.split_audio_segments(audio_path, chunk_duration)]
+    
+    def split_audio_segments(self, audio_path, chunk_duration=300000):  # 300000 ms = 5 minutos
+        """
+        Divide o áudio em partes menores, cortando nos silêncios mais próximos
+        Os cortes são escolhidos pela análise de energia em silence_split e cada parte repete
+        CHUNK_OVERLAP segundos das vizinhas; as partes são copiadas pelo FFmpeg embutido sem
+        recodificar. Se a análise falhar, usa cortes fixos com o muxer de segmentos, e o
+        pydub fica apenas como último recurso.
+        Retorna: Lista de tuplas (caminho, inicio, fim), com inicio e fim em segundos
+        """
+        try:
+            from embedded_ffmpeg import EmbeddedFFmpeg
+            
+            duration = EmbeddedFFmpeg.get_duration(audio_path)
+            if duration:
+                segment_time = chunk_duration / 1000
+                
+                # Calcula o número de chunks necessários baseado no tamanho do arquivo
+                file_size = self.get_file_size(audio_path)
+                if file_size > self.MAX_FILE_SIZE:
+                    num_chunks = math.ceil(file_size / (self.MAX_FILE_SIZE * 0.95))  # 95% do limite para margem de segurança
+                    segment_time = duration / num_chunks
+                
+                # Prefixo único para não colidir com chunks de outras transcrições
+                extension = os.path.splitext(audio_path)[1] or ".mp3"
+                output_pattern = os.path.join(self.work_dir, f"temp_chunk_{uuid.uuid4().hex[:8]}_%03d{extension}")
+                
+                # Cortes nos silêncios, com sobreposição entre as partes
+                try:
+                    from silence_split import compute_energy_profile, plan_chunks
+                    
+                    energy = compute_energy_profile(EmbeddedFFmpeg.get_ffmpeg_path(), audio_path)
+                    segments = []
+                    for i, (start, end) in enumerate(plan_chunks(duration, energy, segment_time)):
+                        chunk_path = EmbeddedFFmpeg.cut_audio(audio_path, output_pattern % i, start, end)
+                        if not chunk_path:
+                            raise Exception(f"Falha ao cortar o trecho {start:.1f}s-{end:.1f}s")
+                        segments.append((chunk_path, start, end))
+                    return segments
+                except Exception as e:
+                    notify("warning", f"Não foi possível cortar nos silêncios, usando cortes fixos: {str(e)}")
+                
+                chunks = EmbeddedFFmpeg.split_audio(audio_path, output_pattern, segment_time)
+                if chunks:
+                    return [
+                        (chunk_path, i * segment_time, min((i + 1) * segment_time, duration))
+                        for i, chunk_path in enumerate(chunks)
+                    ]
+        except ImportError:
+            pass
+        
+        # Método original com pydub como fallback
+        return self._split_audio_pydub(audio_path, chunk_duration)
+    
+    def _split_audio_pydub(self, audio_path, chunk_duration=300000):
+        """
+        Divide o áudio em partes menores decodificando-o por completo com o pydub
+        Retorna: Lista de tuplas (caminho, inicio, fim), com inicio e fim em segundos
+        """
+        try:
+            audio = lazy_import("pydub").AudioSegment.from_file(audio_path)
+            duration = len(audio)
+            chunks = []
+            
+            # Calcula o número de chunks necessários baseado no tamanho do arquivo
+            file_size = self.get_file_size(audio_path)
+            if file_size > self.MAX_FILE_SIZE:
+                num_chunks = math.ceil(file_size / (self.MAX_FILE_SIZE * 0.95))  # 95% do limite para margem de segurança
+                chunk_duration = duration / num_chunks
+            
+            # Duração mínima de um chunk em ms (0.01 segundos = 10ms)
+            MIN_CHUNK_DURATION = 100  # 100ms para ter uma margem de segurança
+            
+            # Prefixo único para não colidir com chunks de outras transcrições
+            prefix = f"temp_chunk_{uuid.uuid4().hex[:8]}"
+            
+            # Divide o áudio
+            for i in range(0, duration, int(chunk_duration)):
+                end_point = min(i + chunk_duration, duration)
+                
+                # Verifica se o chunk tem a duração mínima
+                if (end_point - i) < MIN_CHUNK_DURATION:
+                    # Se o chunk for muito curto, pule-o
+                    continue
+                    
+                chunk = audio[i:end_point]
+                chunk_path = os.path.join(self.work_dir, f"{prefix}_{i}.mp3")
+                chunk.export(chunk_path, format="mp3")
+                chunks.append((chunk_path, i / 1000, end_point / 1000))
+                
+            return chunks
+        except Exception as e:
+            notify("error", f"Erro ao dividir áudio: {str(e)}")
+            return []
+    
+    def request_transcription(self, chunk_path):
+        """
+        Envia um chunk para a API do Groq sem tratar erros.
+        Não chama nenhuma função do Streamlit, então pode rodar em threads de trabalho.
+        Retorna None se o chunk for pequeno demais para ser enviado.
+        """
+        # Verificar se o arquivo existe e tem tamanho mínimo
+        if not os.path.exists(chunk_path) or os.path.getsize(chunk_path) < 100:  # 100 bytes mínimos
+            return None
+        return self._create_transcription(chunk_path).text
+    
+    def request_segments(self, chunk_path):
+        """
+        Envia um chunk para a API do Groq pedindo os segmentos com tempo (verbose_json).
+        Assim como request_transcription, não trata erros e pode rodar em threads de trabalho.
+        Retorna: Tupla (texto, segmentos), com os segmentos (inicio, fim, texto) no tempo do
+        chunk, ou None se o chunk for pequeno demais para ser enviado
+        """
+        if not os.path.exists(chunk_path) or os.path.getsize(chunk_path) < 100:  # 100 bytes mínimos
+            return None
+        response = self._create_transcription(
+            chunk_path,
+            response_format="verbose_json",
+            timestamp_granularities=["segment"]
+        )
+        return response.text, parse_segments(response)
+    
+    def _create_transcription(self, chunk_path, **params):
+        """Chama a API de transcrição com repetição e disjuntor"""
+        def create_transcription():
+            # Reabre o arquivo a cada tentativa
+            with self.api_semaphore, open(chunk_path, "rb") as audio_file:
+                # Usa a API do Groq para transcrição
+                return self.client.audio.transcriptions.create(
+                    model=self.MODEL_ID,
+                    file=audio_file,
+                    language=self.LANGUAGE,
+                    **params
+                )
+        
+        return call_with_retry(create_transcription, policy=self.retry_policy, breaker=self.breaker)
+    
+    def _report_chunk_error(self, chunk_path, error):
+        """Exibe o erro de um chunk no Streamlit (apenas na thread do script)"""
+        error_msg = str(error)
+        if "Audio file is too short" in error_msg:
+            notify("warning", f"Chunk {chunk_path} ignorado por ser muito curto")
+        else:
+            notify("error", f"Erro ao transcrever chunk {chunk_path}: {error_msg}")
+    
+    def transcribe_chunk(self, chunk_path):
+        """Transcreve um único chunk de áudio usando a API do Groq, guardando os segmentos em chunk_segments"""
+        self.chunk_segments = [[]]
+        try:
+            result = self.request_segments(chunk_path)
+            if result is None:
+                notify("warning", f"Arquivo de chunk muito pequeno ou inexistente: {chunk_path}")
+                return ""
+            transcription, self.chunk_segments[0] = result
+            return transcription
+        except Exception as e:
+            self._report_chunk_error(chunk_path, e)
+            return ""
+    
+    def transcribe_chunks(self, chunks, progress_callback=None):
+        """
+        Transcreve vários chunks em paralelo, com no máximo MAX_WORKERS requisições simultâneas.
+        
+        As threads de trabalho só fazem a chamada à API; o progresso e as mensagens de erro
+        são emitidos daqui, na thread do script, que é a única com ScriptRunContext.
+        Um chunk com falha vira texto vazio e não descarta os demais.
+        Os segmentos com tempo de cada chunk ficam em chunk_segments, na mesma ordem.
+        
+        Retorna: Lista com as transcrições, na mesma ordem dos chunks
+        """
+        transcriptions = [""] * len(chunks)
+        self.chunk_segments = [[] for _ in chunks]
+        self.failed_chunks = []
+        if not chunks:
+            return transcriptions
+        
+        completed = 0
+        max_workers = max(1, min(self.MAX_WORKERS, len(chunks)))
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="groq-chunk") as executor:
+            futures = {
+                executor.submit(self.request_segments, chunk_path): i
+                for i, chunk_path in enumerate(chunks)
+            }
+            circuit_open = False
+            for future in as_completed(futures):
+                i = futures[future]
+                chunk_path = chunks[i]
+                try:
+                    if future.cancelled():
+                        self.failed_chunks.append(chunk_path)
+                    else:
+                        result = future.result()
+                        if result is None:
+                            notify("warning", f"Arquivo de chunk muito pequeno ou inexistente: {chunk_path}")
+                        else:
+                            transcriptions[i], self.chunk_segments[i] = result
+                except CircuitOpenError as e:
+                    # Provedor fora do ar: cancela os chunks que ainda não começaram
+                    self.failed_chunks.append(chunk_path)
+                    if not circuit_open:
+                        circuit_open = True
+                        notify("error", str(e))
+                        for pending in futures:
+                            pending.cancel()
+                except Exception as e:
+                    self.failed_chunks.append(chunk_path)
+                    self._report_chunk_error(chunk_path, e)
+                
+                # Remove o arquivo temporário
+                try:
+                    os.remove(chunk_path)
+                except:
+                    pass
+                
+                completed += 1
+                if progress_callback:
+                    progress_callback(completed / len(chunks))
+        
+        return transcriptions
+    
+    def cache_key(self, audio_path, etapa="transcricao", audio_hash=None):
+        """
+        Chave da transcrição de um áudio no armazenamento de artefatos
+        Com etapa="segmentos", chave do índice de segmentos do mesmo áudio
+        Retorna None se o transcritor não tiver armazenamento
+        """
+        if self.store is None:
+            return None
+        return self.store.make_key(
+            audio_hash or hash_file(audio_path),
+            etapa=etapa,
+            modelo=self.MODEL_ID,
+            idioma=self.LANGUAGE
+        )
+    
+    def _load_index(self, key):
+        """Lê um índice de segmentos do armazenamento; None se não houver"""
+        data = self.store.get_text(key) if key else None
+        if data is None:
+            return None
+        try:
+            return SegmentIndex.from_json(data)
+        except (ValueError, KeyError):
+            return None
+    
+    def transcribe(self, audio_path, output_path=None, progress_callback=None):
+        """
+        Transcreve um arquivo de áudio, dividindo-o se necessário
+        """
+        self.ultimo_indice = None
+        # O áudio e os chunks em uso não podem ser removidos pela limpeza dos temporários
+        pin(audio_path)
+        try:
+            if output_path is None:
+                output_path = os.path.join(self.work_dir, "transcricao.txt")
+            
+            # Reaproveitar a transcrição já feita do mesmo áudio com o mesmo modelo e idioma
+            key = segments_key = None
+            if self.store is not None:
+                audio_hash = hash_file(audio_path)
+                key = self.cache_key(audio_path, audio_hash=audio_hash)
+                segments_key = self.cache_key(audio_path, etapa="segmentos", audio_hash=audio_hash)
+            if key:
+                cached = self.store.get_text(key)
+                if cached is not None:
+                    self.ultimo_indice = self._load_index(segments_key)
+                    with open(output_path, "w", encoding="utf-8") as f:
+                        f.write(cached)
+                    if progress_callback:
+                        progress_callback(1.0)
+                    return cached, output_path
+                
+            # Verifica se o arquivo precisa ser dividido
+            if self.get_file_size(audio_path) <= self.MAX_FILE_SIZE:
+                # Se não precisar dividir, transcreve diretamente
+                if progress_callback:
+                    progress_callback(0.5)
+                transcription = self.transcribe_chunk(audio_path)
+                with open(output_path, "w", encoding="utf-8") as f:
+                    f.write(transcription)
+                self.ultimo_indice = merge_chunk_segments([(0.0, float("inf"), self.chunk_segments[0])]) or None
+                # Só guarda transcrições completas
+                if key and transcription:
+                    self.store.put_text(key, transcription)
+                    if self.ultimo_indice:
+                        self.store.put_text(segments_key, self.ultimo_indice.to_json())
+                if progress_callback:
+                    progress_callback(1.0)
+                return transcription, output_path
+            
+            # Se precisar dividir, processa em chunks
+            segments = self.split_audio_segments(audio_path)
+            if not segments:
+                raise Exception("Falha ao dividir o áudio em partes")
+            chunks = [chunk_path for chunk_path, _, _ in segments]
+                
+            # Transcreve os chunks em paralelo, mantendo a ordem original
+            with pinned(*chunks):
+                transcriptions = self.transcribe_chunks(chunks, progress_callback=progress_callback)
+            
+            if self.failed_chunks:
+                notify("warning", f"{len(self.failed_chunks)} de {len(chunks)} partes não puderam ser transcritas. A transcrição está incompleta.")
+            
+            # Remove o texto repetido nas emendas dos chunks que se sobrepõem
+            for i in range(1, len(segments)):
+                if segments[i][1] < segments[i - 1][2]:
+                    transcriptions[i - 1], transcriptions[i] = merge_overlapping_text(transcriptions[i - 1], transcriptions[i])
+            
+            full_transcription = "".join(transcription + "\n" for transcription in transcriptions)
+            
+            # Segmentos de todas as partes no tempo do áudio completo, sem repetir as emendas
+            self.ultimo_indice = merge_chunk_segments([
+                (start, end, chunk_segments)
+                for (_, start, end), chunk_segments in zip(segments, self.chunk_segments)
+            ]) or None
+            
+            # Salva a transcrição completa
+            with open(output_path, "w", encoding="utf-8") as f:
+                f.write(full_transcription)
+            
+            # Só guarda transcrições sem chunks com falha
+            if key and not self.failed_chunks:
+                self.store.put_text(key, full_transcription)
+                if self.ultimo_indice:
+                    self.store.put_text(segments_key, self.ultimo_indice.to_json())
+            
+            return full_transcription, output_path
+            
+        except Exception as e:
+            notify("error", f"Erro durante a transcrição: {str(e)}")
+            return None, None
+        finally:
+            unpin(audio_path)
+    
+    def transcribe_range(self, audio_path, start, end, index=None):
+        """
+        Transcreve de novo apenas um trecho do áudio, para corrigir uma região sem pagar a transcrição inteira.
+        
+        Args:
+            audio_path (str): Caminho do áudio completo
+            start (float): Início do trecho em segundos
+            end (float): Fim do trecho em segundos
+            index (SegmentIndex, optional): Índice da transcrição completa, cujos segmentos do trecho são trocados
+            
+        Returns:
+            tuple: (texto do trecho, índice atualizado) ou (None, None) em caso de erro.
+            Sem index, o índice retornado contém apenas o trecho.
+        """
+        if end <= start:
+            notify("error", "O fim do trecho deve ser depois do início.")
+            return None, None
+        
+        from embedded_ffmpeg import EmbeddedFFmpeg
+        
+        extension = os.path.splitext(audio_path)[1] or ".mp3"
+        chunk_path = os.path.join(self.work_dir, f"temp_trecho_{uuid.uuid4().hex[:8]}{extension}")
+        try:
+            if not EmbeddedFFmpeg.cut_audio(audio_path, chunk_path, start, end):
+                raise Exception(f"Falha ao cortar o trecho {start:.1f}s-{end:.1f}s")
+            
+            result = self.request_segments(chunk_path)
+            if result is None:
+                raise Exception("Trecho curto demais para ser transcrito")
+            texto, segments = result
+            
+            # Levar os segmentos para o tempo do áudio completo, sem passar do fim do trecho
+            segments = [
+                (start + seg_start, min(start + seg_end, end), seg_text)
+                for seg_start, seg_end, seg_text in segments
+                if start + seg_start < end
+            ]
+            if index is None:
+                return texto, SegmentIndex.from_segments(segments)
+            return texto, index.replace_range(start, end, segments)
+        except Exception as e:
+            notify("error", f"Erro ao transcrever o trecho: {str(e)}")
+            return None, None
+        finally:
+            try:
+                os.remove(chunk_path)
+            except OSError:
+                pass
+
+# Classe para resumo e geração de documento
+class SummaryGenerator:
+    # Incrementar sempre que o prompt mudar, para não reaproveitar resumos antigos
+    PROMPT_VERSION = "1"
+    # Modelo do Gemini usado nos resumos
+    MODEL_ID = 'gemini-1.5-flash'
+    # Transcrições acima deste tamanho (em tokens estimados) são resumidas por seções
+    MAX_PROMPT_TOKENS = 24000
+    # Tamanho máximo de cada seção no modo por seções
+    SECTION_TOKENS = 8000
+    # Seções resumidas ao mesmo tempo
+    MAX_PARALLEL_SECTIONS = 4
+    # Sentenças com menos palavras significativas que isto são tratadas como enchimento
+    MIN_TERMOS_SENTENCA = 3
+    
+    def __init__(self, api_key, store=None, api_endpoint=None, api_semaphore=None, compression_budget=None):
+        # Modelo compartilhado pelo processo (api_endpoint alternativo: ex. servidor falso local para testes)
+        self.model = get_gemini_model(api_key, self.MODEL_ID, api_endpoint)
+        # Armazenamento de artefatos para reaproveitar resumos (opcional)
+        self.store = store
+        # Repetição com espera para 429/erros temporários e disjuntor compartilhado do Gemini
+        self.retry_policy = RetryPolicy()
+        self.breaker = get_circuit_breaker("gemini")
+        # Semáforo opcional compartilhado para limitar as requisições simultâneas
+        self.api_semaphore = api_semaphore or nullcontext()
+        # Orçamento de tokens da compressão extrativa local (None desativa)
+        self.compression_budget = compression_budget
+        # Estatísticas da última compressão, para exibir ao usuário
+        self.ultima_compressao = None
+        
+        # Tokenizador carregado uma única vez por processo (sem downloads durante a requisição)
+        self.tokenizer = get_sentence_tokenizer()
+    
+    def preprocessar_texto(self, texto):
+        # Tokenização de sentenças e palavras
+        # Usando o tokenizador personalizado em vez de sent_tokenize
+        sentencas = self.tokenizer.tokenize(texto)
+        
+        # Palavras sem stopwords e análise de frequência
+        palavras_filtradas, palavras_mais_comuns = extract_keywords(texto, 10)
+        
+        return sentencas, palavras_filtradas, palavras_mais_comuns
+
+    def gerar_resumo_profissional(self, conteudo, progress_callback=None, on_chunk=None):
+        """
+        Gera o resumo profissional de uma transcrição.
+        
+        Args:
+            conteudo (str): Transcrição
+            progress_callback (callable, optional): Recebe o progresso entre 0 e 1
+            on_chunk (callable, optional): Ativa o modo streaming; recebe os pedaços do resumo
+                em ordem, à medida que o Gemini os gera (juntos formam o texto retornado)
+            
+        Returns:
+            str: Resumo ou None em caso de erro
+        """
+        if progress_callback:
+            progress_callback(0.3)
+        
+        # Reaproveitar o resumo já gerado para a mesma transcrição
+        key = None
+        if self.store is not None:
+            parametros = {"compressao": self.compression_budget} if self.compression_budget else {}
+            key = self.store.make_key(
+                hash_text(conteudo),
+                etapa="resumo",
+                modelo=self.MODEL_ID,
+                versao_prompt=self.PROMPT_VERSION,
+                **parametros
+            )
+            cached = self.store.get_text(key)
+            if cached is not None:
+                if on_chunk:
+                    on_chunk(cached)
+                if progress_callback:
+                    progress_callback(1.0)
+                return cached
+            
+        try:
+            sentencas, palavras_filtradas, palavras_mais_comuns = self.preprocessar_texto(conteudo)
+            
+            # Compressão extrativa local: manter só as sentenças mais informativas
+            texto_base = conteudo
+            self.ultima_compressao = None
+            if self.compression_budget and self.estimar_tokens(conteudo) > self.compression_budget:
+                texto_base, self.ultima_compressao = self.comprimir_texto(conteudo, self.compression_budget)
+            
+            if self.estimar_tokens(texto_base) <= self.MAX_PROMPT_TOKENS:
+                if progress_callback:
+                    progress_callback(0.5)
+            else:
+                # Transcrição longa: resumir as seções em paralelo e juntar os resumos parciais
+                texto_base = self.resumir_por_secoes(texto_base, progress_callback)
+            
+            prompt = self._prompt_resumo_final(texto_base, len(sentencas), palavras_mais_comuns)
+            resumo = self._gerar(prompt, on_chunk)
+            
+            if key:
+                self.store.put_text(key, resumo)
+            
+            if progress_callback:
+                progress_callback(1.0)
+                
+            return resumo
+        except Exception as e:
+            notify("error", f"Erro ao gerar resumo: {str(e)}")
+            return None
+    
+    def comprimir_texto(self, conteudo, max_tokens):
+        """
+        Reduz a transcrição às sentenças mais informativas, dentro de um orçamento de tokens.
+        
+        Cada sentença recebe uma pontuação TF-IDF (cada sentença conta como um documento)
+        sobre as palavras sem stopwords. Sentenças de enchimento e repetições são descartadas,
+        e as de maior pontuação são mantidas na ordem original até o orçamento.
+        
+        Args:
+            conteudo (str): Transcrição
+            max_tokens (int): Orçamento em tokens estimados
+            
+        Returns:
+            tuple: (texto comprimido, estatísticas com tokens antes e depois e a taxa de compressão)
+        """
+        sentencas = self.tokenizer.tokenize(conteudo)
+        termos = [content_words(sentenca) for sentenca in sentencas]
+        
+        # Frequência de documentos de cada termo
+        frequencia_documentos = Counter()
+        for termos_sentenca in termos:
+            frequencia_documentos.update(set(termos_sentenca))
+        total = len(sentencas)
+        
+        candidatas = []
+        vistas = set()
+        for indice, termos_sentenca in enumerate(termos):
+            assinatura = frozenset(termos_sentenca)
+            # Enchimento ("né", "então tá bom") e repetições não entram
+            if len(assinatura) < self.MIN_TERMOS_SENTENCA or assinatura in vistas:
+                continue
+            vistas.add(assinatura)
+            
+            pontuacao = sum(
+                quantidade * (math.log((1 + total) / (1 + frequencia_documentos[termo])) + 1)
+                for termo, quantidade in Counter(termos_sentenca).items()
+            ) / math.sqrt(len(termos_sentenca))
+            candidatas.append((pontuacao, indice))
+        
+        # Escolher as melhores sentenças que cabem no orçamento
+        mantidas = []
+        tokens_usados = 0
+        for pontuacao, indice in sorted(candidatas, reverse=True):
+            tokens = self.estimar_tokens(sentencas[indice]) + 1
+            if tokens_usados + tokens > max_tokens:
+                continue
+            mantidas.append(indice)
+            tokens_usados += tokens
+        
+        texto = " ".join(sentencas[indice] for indice in sorted(mantidas))
+        tokens_originais = self.estimar_tokens(conteudo)
+        tokens_finais = self.estimar_tokens(texto)
+        estatisticas = {
+            "tokens_originais": tokens_originais,
+            "tokens_finais": tokens_finais,
+            "sentencas_originais": total,
+            "sentencas_mantidas": len(mantidas),
+            "taxa": tokens_finais / tokens_originais if tokens_originais else 1.0
+        }
+        return texto, estatisticas
+    
+    @staticmethod
+    def estimar_tokens(texto):
+        """Estima o número de tokens de um texto (cerca de 4 caracteres por token no Gemini)"""
+        return math.ceil(len(texto) / 4)
+    
+    def dividir_em_secoes(self, conteudo, max_tokens=None):
+        """
+        Divide um texto em seções de até max_tokens, sem cortar sentenças.
+        
+        Args:
+            conteudo (str): Texto a dividir
+            max_tokens (int, optional): Tamanho máximo de cada seção em tokens estimados
+            
+        Returns:
+            list: Seções do texto
+        """
+        max_tokens = max_tokens or self.SECTION_TOKENS
+        secoes = []
+        atual = []
+        tokens_atual = 0
+        
+        for sentenca in self.tokenizer.tokenize(conteudo):
+            tokens = self.estimar_tokens(sentenca)
+            if tokens > max_tokens:
+                # Sentença maior que uma seção (transcrição sem pontuação): dividir por palavras
+                palavras = sentenca.split()
+                passo = max(1, len(palavras) * max_tokens // tokens)
+                partes = [" ".join(palavras[i:i + passo]) for i in range(0, len(palavras), passo)]
+            else:
+                partes = [sentenca]
+            
+            for parte in partes:
+                tokens = self.estimar_tokens(parte)
+                if atual and tokens_atual + tokens > max_tokens:
+                    secoes.append(" ".join(atual))
+                    atual = []
+                    tokens_atual = 0
+                atual.append(parte)
+                tokens_atual += tokens + 1
+        
+        if atual:
+            secoes.append(" ".join(atual))
+        return secoes
+    
+    def resumir_por_secoes(self, conteudo, progress_callback=None):
+        """
+        Resume um texto longo por partes (etapa "map"), em paralelo.
+        
+        Se os resumos parciais juntos ainda forem grandes demais para um único prompt,
+        eles são resumidos de novo, em mais um nível.
+        
+        Returns:
+            str: Resumos parciais, em ordem, prontos para o resumo final
+        """
+        texto = conteudo
+        nivel = 0
+        while self.estimar_tokens(texto) > self.MAX_PROMPT_TOKENS:
+            secoes = self.dividir_em_secoes(texto)
+            resumos = [None] * len(secoes)
+            concluidas = 0
+            
+            with ThreadPoolExecutor(max_workers=self.MAX_PARALLEL_SECTIONS, thread_name_prefix="resumo-secao") as executor:
+                futures = {
+                    executor.submit(self._resumir_secao, secao, indice + 1, len(secoes)): indice
+                    for indice, secao in enumerate(secoes)
+                }
+                # O progresso é atualizado apenas nesta thread
+                for future in as_completed(futures):
+                    resumos[futures[future]] = future.result()
+                    concluidas += 1
+                    if progress_callback and nivel == 0:
+                        progress_callback(0.3 + 0.5 * concluidas / len(secoes))
+            
+            anterior = texto
+            texto = "\n\n".join(
+                f"Parte {indice + 1} de {len(resumos)}:\n{resumo}"
+                for indice, resumo in enumerate(resumos)
+            )
+            nivel += 1
+            if len(texto) >= len(anterior):
+                # Os resumos não encolheram o texto; outro nível não adiantaria
+                break
+        return texto
+    
+    def _resumir_secao(self, secao, indice, total):
+        """Resume uma seção da transcrição, reaproveitando o resultado já guardado"""
+        key = None
+        if self.store is not None:
+            key = self.store.make_key(
+                hash_text(secao),
+                etapa="resumo_secao",
+                modelo=self.MODEL_ID,
+                versao_prompt=self.PROMPT_VERSION
+            )
+            cached = self.store.get_text(key)
+            if cached is not None:
+                return cached
+        
+        prompt = f"""
+        Este é o trecho {indice} de {total} da transcrição de uma gravação longa.
+        Resuma o trecho em tópicos concisos, em português, preservando os fatos, nomes,
+        números, decisões e a ordem em que os assuntos aparecem. Não adicione introdução
+        nem conclusão: o resumo será combinado com os dos outros trechos.
+
+        Trecho:
+        {secao}
+        """
+        resumo = self._gerar(prompt)
+        if key:
+            self.store.put_text(key, resumo)
+        return resumo
+    
+    def _gerar(self, prompt, on_chunk=None):
+        """
+        Envia um prompt ao Gemini com repetição, disjuntor e limite de requisições simultâneas.
+        
+        Com on_chunk, consome a resposta em streaming e repassa cada pedaço assim que chega.
+        Uma falha antes do primeiro pedaço é repetida normalmente; depois dele, repetir
+        duplicaria o texto já entregue, então o erro é lançado.
+        """
+        def generate():
+            with self.api_semaphore:
+                if on_chunk is None:
+                    return self.model.generate_content(prompt).text
+                
+                partes = []
+                chunks = iter(self.model.generate_content(prompt, stream=True))
+                while True:
+                    try:
+                        texto = next(chunks).text
+                    except StopIteration:
+                        break
+                    except Exception as e:
+                        if not partes:
+                            raise
+                        raise RuntimeError(f"Falha durante o streaming do resumo: {str(e)}") from e
+                    if texto:
+                        partes.append(texto)
+                        on_chunk(texto)
+                return "".join(partes)
+        
+        return call_with_retry(generate, policy=self.retry_policy, breaker=self.breaker)
+    
+    def _prompt_resumo_final(self, conteudo, num_sentencas, palavras_mais_comuns):
+        """Monta o prompt do resumo final, com a formatação em tópicos usada no documento"""
+        return f"""
+        Como professor de português, analise o conteúdo do arquivo em anexo e faça um texto destacando os principais pontos, com um tom profissional.
+
+        Conteúdo original:
+        {conteudo}
+
+        Análise prévia:
+        - Número de sentenças: {num_sentencas}
+        - Palavras-chave mais frequentes: {', '.join([palavra for palavra, _ in palavras_mais_comuns])}
+
+        O resumo deve:
+        1. Ter um tom profissional e formal
+        2. Destacar os pontos-chave do texto original
+        3. Ser estruturado em tópicos claros
+        4. Usar a seguinte formatação:
+           - Tópicos principais sem marcadores
+           - Subtópicos com • (ex: • Subtópico)
+           - Sub-subtópicos com dois espaços e • (ex:   • Sub-subtópico)
+        5. Manter uma estrutura hierárquica clara
+        6. NÃO usar asteriscos (**) ou hashtags (###) na formatação
+
+        Por favor, formate o resumo de maneira clara e legível, seguindo estritamente as regras de formatação acima.
+        """
+
+    def salvar_como_doc(self, conteudo, caminho_arquivo=None, transcricao=None):
+        builder = SummaryDocumentBuilder()
+        builder.feed(conteudo)
+        if transcricao:
+            builder.add_transcript(transcricao)
+        return builder.save(caminho_arquivo)
+
+# Caracteres de controle que não podem aparecer no XML do documento
+_CARACTERES_INVALIDOS_XML = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+# Modelo do documento com os estilos já criados, montado uma vez por processo
+_docx_template = None
+_docx_template_lock = threading.Lock()
+
+# Classe que monta o documento DOCX do resumo linha a linha
+class SummaryDocumentBuilder:
+    """
+    Monta o documento do resumo à medida que o texto chega.
+    
+    feed() recebe pedaços de texto (como os de uma resposta em streaming) e adiciona ao
+    documento cada linha completa, então o documento está pronto assim que o texto termina.
+    
+    O documento parte de um modelo com os estilos prontos, carregado uma vez por processo,
+    e os parágrafos são criados direto no XML a partir de um parágrafo-modelo por estilo,
+    sem as buscas de estilo do python-docx a cada parágrafo.
+    """
+    
+    # Estilos dos parágrafos (alinhamentos pelo nome em WD_PARAGRAPH_ALIGNMENT)
+    ESTILOS = {
+        'Normal': {
+            'nome': 'Calibri',
+            'tamanho': 11,
+            'alinhamento': 'JUSTIFY'
+        },
+        'Titulo': {
+            'nome': 'Calibri',
+            'tamanho': 12,
+            'negrito': True,
+            'alinhamento': 'LEFT'
+        },
+        'Marcador1': {
+            'nome': 'Calibri',
+            'tamanho': 11,
+            'alinhamento': 'LEFT',
+            'estilo': 'List Bullet'
+        },
+        'Marcador2': {
+            'nome': 'Calibri',
+            'tamanho': 11,
+            'alinhamento': 'LEFT',
+            'estilo': 'List Bullet 2'
+        }
+    }
+    
+    # Modelo personalizado opcional; se não existir, os estilos acima são criados no documento padrão
+    TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates", "resumo.docx")
+    
+    @classmethod
+    def _build_template(cls):
+        """Cria o documento-modelo com os estilos e retorna seus bytes"""
+        if os.path.exists(cls.TEMPLATE_PATH):
+            with open(cls.TEMPLATE_PATH, "rb") as f:
+                return f.read()
+        
+        docx = lazy_import("docx")
+        from docx.enum.style import WD_STYLE_TYPE
+        from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+        from docx.shared import Pt
+        
+        documento = docx.Document()
+        for nome, config in cls.ESTILOS.items():
+            if nome in documento.styles:
+                estilo = documento.styles[nome]
+            else:
+                estilo = documento.styles.add_style(nome, WD_STYLE_TYPE.PARAGRAPH)
+            
+            estilo.font.name = config['nome']
+            estilo.font.size = Pt(config['tamanho'])
+            # O alinhamento fica no estilo, em vez de repetido em cada parágrafo
+            estilo.paragraph_format.alignment = getattr(WD_PARAGRAPH_ALIGNMENT, config['alinhamento'])
+            if 'negrito' in config:
+                estilo.font.bold = config['negrito']
+            if 'estilo' in config:
+                estilo.base_style = documento.styles[config['estilo']]
+        
+        buffer = io.BytesIO()
+        documento.save(buffer)
+        return buffer.getvalue()
+    
+    @classmethod
+    def get_template(cls):
+        """Retorna os bytes do documento-modelo, criando-o na primeira chamada"""
+        global _docx_template
+        if _docx_template is None:
+            with _docx_template_lock:
+                if _docx_template is None:
+                    _docx_template = cls._build_template()
+        return _docx_template
+    
+    def __init__(self):
+        docx = lazy_import("docx")
+        from docx.oxml import OxmlElement
+        from docx.oxml.ns import qn
+        
+        self.documento = docx.Document(io.BytesIO(self.get_template()))
+        self._pendente = ""
+        
+        # Os parágrafos entram antes das propriedades da seção, que fecham o corpo
+        body = self.documento.element.body
+        self._body = body
+        self._sect_pr = body.find(qn('w:sectPr'))
+        
+        # Um parágrafo-modelo por estilo, copiado a cada nova linha
+        self._prototipos = {}
+        for nome in self.ESTILOS:
+            paragrafo = OxmlElement('w:p')
+            propriedades = OxmlElement('w:pPr')
+            estilo = OxmlElement('w:pStyle')
+            estilo.set(qn('w:val'), self.documento.styles[nome].style_id)
+            propriedades.append(estilo)
+            paragrafo.append(propriedades)
+            run = OxmlElement('w:r')
+            texto = OxmlElement('w:t')
+            texto.set(qn('xml:space'), 'preserve')
+            run.append(texto)
+            paragrafo.append(run)
+            self._prototipos[nome] = paragrafo
+    
+    def _add_paragraph(self, texto, estilo):
+        """Adiciona um parágrafo direto no XML do documento"""
+        paragrafo = copy.deepcopy(self._prototipos[estilo])
+        paragrafo[1][0].text = _CARACTERES_INVALIDOS_XML.sub('', texto)
+        if self._sect_pr is not None:
+            self._sect_pr.addprevious(paragrafo)
+        else:
+            self._body.append(paragrafo)
+    
+    def feed(self, texto):
+        """Recebe um pedaço do resumo e adiciona ao documento as linhas já completas"""
+        self._pendente += texto
+        *linhas, self._pendente = self._pendente.split('\n')
+        for linha in linhas:
+            self.add_line(linha)
+    
+    def add_line(self, linha):
+        """Adiciona uma linha do resumo ao documento, com o estilo do seu nível"""
+        linha = linha.strip()
+        if not linha:
+            return
+
+        # Remover asteriscos e hashtags
+        linha = linha.replace('*', '').replace('#', '')
+
+        if not linha.startswith('•'):
+            # Tópico principal
+            self._add_paragraph(linha, 'Titulo')
+        elif linha.startswith('•'):
+            # Marcador de primeiro nível
+            self._add_paragraph(linha.lstrip('• '), 'Marcador1')
+        elif linha.startswith('  •'):
+            # Marcador de segundo nível
+            self._add_paragraph(linha.lstrip(' •'), 'Marcador2')
+        else:
+            # Texto normal
+            self._add_paragraph(linha, 'Normal')
+    
+    def add_transcript(self, transcricao):
+        """Adiciona a transcrição completa ao final do documento, um parágrafo por linha"""
+        self._flush()
+        self._add_paragraph("Transcrição completa", 'Titulo')
+        for linha in transcricao.split('\n'):
+            linha = linha.strip()
+            if linha:
+                self._add_paragraph(linha, 'Normal')
+    
+    def _flush(self):
+        """Adiciona a última linha pendente"""
+        if self._pendente:
+            self.add_line(self._pendente)
+            self._pendente = ""
+    
+    def save(self, caminho_arquivo=None):
+        """
+        Adiciona a última linha pendente e salva o documento.
+        
+        O documento é serializado uma única vez; os mesmos bytes vão para o arquivo e para o download.
+        
+        Returns:
+            tuple: (bytes do documento, caminho do arquivo) ou (None, None) em caso de erro
+        """
+        if caminho_arquivo is None:
+            caminho_arquivo = os.path.join(temp_dir, "resumo.docx")
+        
+        self._flush()
+
+        try:
+            file_stream = io.BytesIO()
+            self.documento.save(file_stream)
+            docx_bytes = file_stream.getvalue()
+            
+            with open(caminho_arquivo, "wb") as f:
+                f.write(docx_bytes)
+            
+            return docx_bytes, caminho_arquivo
+        except Exception as e:
+            notify("error", f"Erro ao salvar documento: {str(e)}")
+            return None, None
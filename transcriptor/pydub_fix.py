@@ -9,9 +9,12 @@ from pathlib import Path
 def fix_pydub_regex():
     """Corrige as expressões regulares no arquivo pydub/utils.py"""
     try:
-        # Encontrar o caminho do módulo pydub
-        import pydub
-        pydub_path = Path(pydub.__file__).parent
+        # Encontrar o caminho do módulo pydub sem importá-lo (a importação fica para a etapa que o usa)
+        import importlib.util
+        spec = importlib.util.find_spec('pydub')
+        if spec is None or not spec.submodule_search_locations:
+            raise ImportError("No module named 'pydub'")
+        pydub_path = Path(spec.submodule_search_locations[0])
         utils_path = pydub_path / 'utils.py'
         
         if not utils_path.exists():
@@ -0,0 +1,286 @@
+"""
+Módulo com a camada de resiliência usada nas chamadas às APIs do Groq e do Gemini.
+Repete as chamadas que falharam por limite de requisições ou erro temporário, respeitando
+os cabeçalhos de limite enviados pelo provedor, e interrompe as chamadas durante quedas
+do provedor com um disjuntor (circuit breaker), para que as sessões falhem rápido.
+"""
+
+import random
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+# Códigos HTTP que indicam uma falha temporária
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+# Exceções de rede dos SDKs, identificadas pelo nome para não importar os SDKs aqui
+RETRYABLE_ERROR_NAMES = {
+    "APIConnectionError",
+    "APITimeoutError",
+    "ConnectionError",
+    "TimeoutError",
+    "ServiceUnavailable",
+    "DeadlineExceeded",
+    "InternalServerError",
+    "ResourceExhausted",
+    "TooManyRequests",
+}
+
+class CircuitOpenError(Exception):
+    """Erro lançado quando o disjuntor de um provedor está aberto"""
+
+    def __init__(self, name, retry_in):
+        super().__init__(f"Serviço {name} indisponível no momento. Tente novamente em {retry_in:.0f}s.")
+        self.name = name
+        self.retry_in = retry_in
+
+class RetryPolicy:
+    """
+    Política de repetição com espera exponencial e variação aleatória (jitter).
+
+    Args:
+        max_attempts (int): Número máximo de tentativas, incluindo a primeira
+        base_delay (float): Espera inicial em segundos
+        max_delay (float): Espera máxima entre duas tentativas
+        max_total_wait (float): Tempo máximo somando todas as esperas
+    """
+
+    def __init__(self, max_attempts=5, base_delay=1.0, max_delay=30.0, max_total_wait=90.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_total_wait = max_total_wait
+
+    def backoff(self, attempt):
+        """Retorna a espera antes da tentativa seguinte (attempt começa em 1), com jitter completo"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+class CircuitBreaker:
+    """
+    Disjuntor que bloqueia as chamadas a um provedor depois de falhas consecutivas.
+
+    Depois de failure_threshold falhas seguidas, o disjuntor abre e recusa chamadas por
+    recovery_timeout segundos. Depois disso, deixa passar uma chamada de teste: se ela
+    funcionar, fecha de novo; se falhar, volta a abrir.
+    """
+
+    def __init__(self, name, failure_threshold=5, recovery_timeout=30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    @property
+    def state(self):
+        """Estado atual: "fechado", "aberto" ou "meio-aberto" """
+        with self._lock:
+            if self._opened_at is None:
+                return "fechado"
+            if time.monotonic() - self._opened_at >= self.recovery_timeout:
+                return "meio-aberto"
+            return "aberto"
+
+    def before_call(self):
+        """Lança CircuitOpenError se o disjuntor não permitir a chamada"""
+        with self._lock:
+            if self._opened_at is None:
+                return
+
+            elapsed = time.monotonic() - self._opened_at
+            if elapsed < self.recovery_timeout or self._probing:
+                raise CircuitOpenError(self.name, max(0.0, self.recovery_timeout - elapsed))
+
+            # Meio-aberto: apenas uma chamada de teste por vez
+            self._probing = True
+
+    def record_success(self):
+        """Registra uma chamada bem-sucedida"""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        """Registra uma falha do provedor"""
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+    def reset(self):
+        """Fecha o disjuntor"""
+        self.record_success()
+
+# Um disjuntor por provedor, compartilhado por todas as sessões do processo
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+def get_circuit_breaker(name, **kwargs):
+    """
+    Retorna o disjuntor de um provedor, criando-o na primeira chamada.
+
+    Args:
+        name (str): Nome do provedor (ex: "groq", "gemini")
+        **kwargs: Parâmetros de CircuitBreaker usados na criação
+
+    Returns:
+        CircuitBreaker: Disjuntor compartilhado pelo processo
+    """
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(name, **kwargs)
+            _breakers[name] = breaker
+        return breaker
+
+def get_status_code(error):
+    """Retorna o código HTTP de uma exceção dos SDKs, se houver"""
+    for attribute in ("status_code", "code"):
+        value = getattr(error, attribute, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(error, "response", None)
+    value = getattr(response, "status_code", None)
+    return value if isinstance(value, int) else None
+
+def _parse_duration(value):
+    """Converte durações como "7.66s", "1m2.5s", "250ms" ou "3" em segundos"""
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    total = 0.0
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|h|m|s)", value)
+    if not parts:
+        return None
+    for amount, unit in parts:
+        total += float(amount) * {"ms": 0.001, "s": 1, "m": 60, "h": 3600}[unit]
+    return total
+
+def get_retry_after(error):
+    """
+    Lê dos cabeçalhos de limite de requisições quanto tempo esperar antes de repetir.
+
+    Considera Retry-After (segundos ou data HTTP), retry-after-ms e os cabeçalhos
+    x-ratelimit-reset-* enviados pelo Groq. Para o Gemini, que não envia cabeçalhos
+    pelo SDK, procura o "retry in Ns" da mensagem de erro.
+
+    Returns:
+        float: Segundos de espera ou None se o provedor não indicar
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if value:
+        seconds = _parse_duration(value)
+        if seconds is not None:
+            return seconds
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            pass
+
+    # Quando um dos limites esgota, esperar até o reinício mais tardio
+    resets = [
+        _parse_duration(headers[name])
+        for name in ("x-ratelimit-reset-requests", "x-ratelimit-reset-tokens")
+        if headers.get(name)
+    ]
+    resets = [seconds for seconds in resets if seconds is not None]
+    if resets and get_status_code(error) == 429:
+        return max(resets)
+
+    match = re.search(r"retry in (\d+(?:\.\d+)?)\s*s", str(error), re.IGNORECASE)
+    if match:
+        return float(match.group(1))
+    return None
+
+def is_retryable(error):
+    """Indica se uma exceção representa uma falha temporária que vale repetir"""
+    status_code = get_status_code(error)
+    if status_code is not None:
+        return status_code in RETRYABLE_STATUS_CODES
+    return type(error).__name__ in RETRYABLE_ERROR_NAMES
+
+def is_rate_limited(error):
+    """Indica se a exceção é um limite de requisições (HTTP 429)"""
+    return get_status_code(error) == 429 or type(error).__name__ in ("ResourceExhausted", "RateLimitError")
+
+def call_with_retry(func, *args, policy=None, breaker=None, sleep=time.sleep, **kwargs):
+    """
+    Executa func(*args, **kwargs) repetindo em caso de falha temporária.
+
+    Limites de requisição (429) são repetidos respeitando a espera indicada pelo provedor.
+    Erros do servidor e de rede também contam como falhas no disjuntor. Erros que não são
+    temporários (ex: chave inválida) são lançados imediatamente.
+
+    Args:
+        func (callable): Função que faz a chamada à API
+        policy (RetryPolicy, optional): Política de repetição
+        breaker (CircuitBreaker, optional): Disjuntor do provedor
+        sleep (callable, optional): Função de espera (substituível em testes)
+
+    Returns:
+        O retorno de func
+
+    Raises:
+        CircuitOpenError: Se o disjuntor estiver aberto
+        Exception: A última exceção de func, se as tentativas ou o tempo se esgotarem
+    """
+    policy = policy or RetryPolicy()
+    waited = 0.0
+
+    for attempt in range(1, policy.max_attempts + 1):
+        if breaker is not None:
+            breaker.before_call()
+
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            if not is_retryable(e):
+                # Falha do pedido, não do provedor: não afeta o disjuntor
+                if breaker is not None:
+                    breaker.record_success()
+                raise
+
+            if breaker is not None:
+                if is_rate_limited(e):
+                    # O provedor está respondendo; o limite é tratado pela espera
+                    breaker.record_success()
+                else:
+                    breaker.record_failure()
+
+            if attempt == policy.max_attempts:
+                raise
+
+            delay = get_retry_after(e)
+            if delay is None:
+                delay = policy.backoff(attempt)
+            else:
+                # Pequena variação para que as threads não repitam todas ao mesmo tempo
+                delay += random.uniform(0, min(1.0, delay * 0.1))
+
+            if waited + delay > policy.max_total_wait:
+                raise
+            sleep(delay)
+            waited += delay
+            continue
+
+        if breaker is not None:
+            breaker.record_success()
+        return result
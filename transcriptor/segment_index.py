@@ -0,0 +1,217 @@
+"""
+Módulo com o índice de segmentos com tempo de uma transcrição.
+O Whisper devolve, na resposta verbose_json, o início, o fim e o texto de cada segmento,
+contados a partir do início da parte enviada. Aqui os segmentos de todas as partes são
+levados para o tempo do áudio completo e guardados em arrays compactos (início, fim e
+posição do texto), ordenados pelo início, com busca por tempo em O(log n). A partir do
+índice são geradas as legendas SRT e WebVTT e é feita a troca dos segmentos de um trecho
+retranscrito.
+"""
+
+import json
+from array import array
+from bisect import bisect_left, bisect_right
+
+class SegmentIndex:
+    """
+    Índice imutável de segmentos (inicio, fim, texto), com tempos em segundos.
+
+    Os textos ficam em uma única string, um segmento por linha; o array de posições tem
+    um item a mais que os segmentos, e o texto do segmento i vai de offsets[i] a offsets[i + 1] - 1.
+
+    Os fins guardados são os do Whisper. Como segmentos podem se sobrepor, a busca por
+    intervalo usa um array à parte com o maior fim até cada segmento, que é crescente e
+    permite bisect.
+    """
+
+    def __init__(self, starts=None, ends=None, offsets=None, text=""):
+        self._starts = starts if starts is not None else array("d")
+        self._ends = ends if ends is not None else array("d")
+        self._offsets = offsets if offsets is not None else array("q", [0])
+        self._text = text
+
+        # Maior fim entre os segmentos 0..i, usado apenas nas buscas
+        self._max_ends = array("d")
+        last_end = 0.0
+        for end in self._ends:
+            last_end = max(last_end, end)
+            self._max_ends.append(last_end)
+
+    @classmethod
+    def from_segments(cls, segments):
+        """
+        Monta o índice a partir de tuplas (inicio, fim, texto).
+        Segmentos sem texto são descartados; um fim antes do início é trocado pelo início.
+        """
+        starts, ends, offsets = array("d"), array("d"), array("q", [0])
+        parts = []
+        position = 0
+        for start, end, texto in sorted(segments, key=lambda segment: (segment[0], segment[1])):
+            texto = " ".join(texto.split())
+            if not texto:
+                continue
+            starts.append(start)
+            ends.append(max(end, start))
+            parts.append(texto)
+            position += len(texto) + 1
+            offsets.append(position)
+        return cls(starts, ends, offsets, "".join(texto + "\n" for texto in parts))
+
+    def __len__(self):
+        return len(self._starts)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("segmento fora do índice")
+        return self._starts[i], self._ends[i], self._text[self._offsets[i]:self._offsets[i + 1] - 1]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    @property
+    def text(self):
+        """Texto completo, um segmento por linha"""
+        return self._text
+
+    @property
+    def duration(self):
+        """Maior fim entre os segmentos"""
+        return self._max_ends[-1] if len(self) else 0.0
+
+    def find(self, seconds):
+        """
+        Procura o segmento que contém um instante.
+
+        Returns:
+            int: Posição do segmento que começou por último entre os que contêm o instante,
+                ou -1 se o instante cair entre segmentos
+        """
+        # Volta a partir do último início até onde nenhum segmento anterior alcança o instante
+        i = bisect_right(self._starts, seconds) - 1
+        while i >= 0 and seconds < self._max_ends[i]:
+            if seconds < self._ends[i]:
+                return i
+            i -= 1
+        return -1
+
+    def _overlapping(self, start, end):
+        """Posições dos segmentos que se sobrepõem ao intervalo [start, end)"""
+        first = bisect_right(self._max_ends, start)
+        last = bisect_left(self._starts, end)
+        return [i for i in range(first, last) if self._ends[i] > start]
+
+    def between(self, start, end):
+        """Retorna os segmentos que se sobrepõem ao intervalo [start, end)"""
+        return [self[i] for i in self._overlapping(start, end)]
+
+    def text_between(self, start, end):
+        """Texto dos segmentos que se sobrepõem ao intervalo [start, end)"""
+        return "".join(self._text[self._offsets[i]:self._offsets[i + 1]] for i in self._overlapping(start, end))
+
+    def replace_range(self, start, end, segments):
+        """
+        Troca os segmentos de um trecho pelos de uma nova transcrição.
+        Sai do índice cada segmento cujo meio cai em [start, end).
+
+        Args:
+            start (float): Início do trecho em segundos
+            end (float): Fim do trecho em segundos
+            segments (list): Novos segmentos (inicio, fim, texto), no tempo do áudio completo
+
+        Returns:
+            SegmentIndex: Novo índice
+        """
+        kept = [segment for segment in self if not start <= (segment[0] + segment[1]) / 2 < end]
+        return SegmentIndex.from_segments(kept + list(segments))
+
+    def to_srt(self):
+        """Legendas no formato SubRip (.srt)"""
+        blocks = []
+        for number, (start, end, texto) in enumerate(self, 1):
+            blocks.append(f"{number}\n{format_timestamp(start, ',')} --> {format_timestamp(end, ',')}\n{texto}\n")
+        return "\n".join(blocks)
+
+    def to_vtt(self):
+        """Legendas no formato WebVTT (.vtt)"""
+        blocks = ["WEBVTT\n"]
+        for start, end, texto in self:
+            blocks.append(f"{format_timestamp(start, '.')} --> {format_timestamp(end, '.')}\n{texto}\n")
+        return "\n".join(blocks)
+
+    def to_json(self):
+        """Serializa o índice para o armazenamento de artefatos"""
+        return json.dumps({
+            "inicios": self._starts.tolist(),
+            "fins": self._ends.tolist(),
+            "posicoes": self._offsets.tolist(),
+            "texto": self._text
+        }, ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, data):
+        """Reconstrói um índice serializado por to_json"""
+        payload = json.loads(data)
+        return cls(
+            array("d", payload["inicios"]),
+            array("d", payload["fins"]),
+            array("q", payload["posicoes"]),
+            payload["texto"]
+        )
+
+def format_timestamp(seconds, separator=","):
+    """Formata segundos como HH:MM:SS,mmm (SRT) ou HH:MM:SS.mmm (WebVTT)"""
+    milliseconds = max(0, int(round(seconds * 1000)))
+    hours, milliseconds = divmod(milliseconds, 3600000)
+    minutes, milliseconds = divmod(milliseconds, 60000)
+    secs, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{milliseconds:03d}"
+
+def parse_segments(response):
+    """
+    Lê os segmentos de uma resposta verbose_json do Whisper.
+
+    Returns:
+        list: Tuplas (inicio, fim, texto), no tempo da parte enviada
+    """
+    raw = getattr(response, "segments", None)
+    if raw is None and isinstance(response, dict):
+        raw = response.get("segments")
+    segments = []
+    for segment in raw or []:
+        if isinstance(segment, dict):
+            segments.append((float(segment["start"]), float(segment["end"]), segment.get("text", "")))
+        else:
+            segments.append((float(segment.start), float(segment.end), segment.text or ""))
+    return segments
+
+def merge_chunk_segments(chunks):
+    """
+    Junta os segmentos das partes de um áudio no tempo do áudio completo.
+
+    Onde duas partes vizinhas se sobrepõem, o corte fica no meio da sobreposição: cada
+    segmento é mantido apenas na parte que contém o seu ponto médio, então a fala repetida
+    nas emendas aparece uma única vez.
+
+    Args:
+        chunks (list): Tuplas (inicio, fim, segmentos) de cada parte, em ordem, com os
+            segmentos no tempo da parte
+
+    Returns:
+        SegmentIndex: Índice com os segmentos de todas as partes
+    """
+    merged = []
+    for i, (chunk_start, chunk_end, segments) in enumerate(chunks):
+        lower = float("-inf")
+        upper = float("inf")
+        if i > 0 and chunk_start < chunks[i - 1][1]:
+            lower = (chunk_start + chunks[i - 1][1]) / 2
+        if i + 1 < len(chunks) and chunks[i + 1][0] < chunk_end:
+            upper = (chunks[i + 1][0] + chunk_end) / 2
+        for start, end, texto in segments:
+            start, end = start + chunk_start, end + chunk_start
+            if lower <= (start + end) / 2 < upper:
+                merged.append((start, end, texto))
+    return SegmentIndex.from_segments(merged)
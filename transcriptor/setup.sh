@@ -23,4 +23,8 @@ else
     fi
 fi
 
+# Baixar os dados do NLTK na instalação, para que nenhuma requisição acesse a rede
+echo "Baixando recursos do NLTK..."
+python "$(dirname "$0")/nlp_resources.py" || echo "Recursos do NLTK indisponíveis; será usado o método alternativo"
+
 echo "Configuração concluída"
\ No newline at end of file
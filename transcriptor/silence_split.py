@@ -0,0 +1,229 @@
+"""
+Módulo para escolher os pontos de corte do áudio em trechos de silêncio.
+A energia do sinal é calculada com NumPy sobre PCM de baixa resolução lido do FFmpeg
+em blocos, então o uso de memória não depende da duração do arquivo.
+"""
+
+import math
+import re
+import subprocess
+
+# O NumPy só é importado quando a análise de energia roda, e não na abertura do app
+from startup_profile import lazy_import
+
+# Parâmetros da análise de energia
+ANALYSIS_SAMPLE_RATE = 8000  # Hz; suficiente para detectar fala e silêncio
+FRAME_MS = 20  # Duração de cada quadro de energia
+BLOCK_SECONDS = 60  # Quantidade de áudio lida do FFmpeg por vez
+SMOOTHING_MS = 300  # Janela da média móvel usada para achar silêncios
+
+# Parâmetros de corte
+SILENCE_TOLERANCE = 10.0  # Segundos que o corte pode se afastar do ponto ideal
+CHUNK_OVERLAP = 1.5  # Segundos repetidos entre chunks vizinhos
+MIN_MERGE_WORDS = 2  # Palavras em comum necessárias para juntar as emendas
+SPEECH_WORDS_PER_SECOND = 3  # Ritmo de fala rápido, para estimar as palavras repetidas
+# Palavras que cabem na região repetida entre dois chunks (CHUNK_OVERLAP de cada lado do corte)
+OVERLAP_WORDS = math.ceil(2 * CHUNK_OVERLAP * SPEECH_WORDS_PER_SECOND)
+SEAM_SLACK_WORDS = 2  # Palavras de folga entre a repetição e as bordas dos chunks
+MIN_SILENCE_CHUNK_SECONDS = 30.0  # Trechos menores que isso usam cortes fixos
+
+def compute_energy_profile(ffmpeg_path, audio_path, sample_rate=ANALYSIS_SAMPLE_RATE, frame_ms=FRAME_MS):
+    """
+    Calcula a energia RMS do áudio em quadros de duração fixa.
+
+    Args:
+        ffmpeg_path (str): Caminho para o executável FFmpeg
+        audio_path (str): Caminho para o arquivo de áudio
+        sample_rate (int, optional): Taxa de amostragem usada na análise
+        frame_ms (int, optional): Duração de cada quadro em milissegundos
+
+    Returns:
+        numpy.ndarray: Energia de cada quadro (float32)
+    """
+    np = lazy_import("numpy")
+    frame_len = sample_rate * frame_ms // 1000
+    frame_bytes = frame_len * 2  # PCM de 16 bits
+    block_bytes = frame_bytes * (BLOCK_SECONDS * 1000 // frame_ms)
+
+    # Decodificar para PCM mono de 16 bits na saída padrão
+    command = [
+        ffmpeg_path,
+        "-v", "error",
+        "-i", audio_path,
+        "-vn",
+        "-ac", "1",
+        "-ar", str(sample_rate),
+        "-f", "s16le",
+        "-"
+    ]
+
+    energies = []
+    remainder = b""
+    with subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL) as process:
+        while True:
+            data = process.stdout.read(block_bytes)
+            if not data:
+                break
+
+            data = remainder + data
+            num_frames = len(data) // frame_bytes
+            usable = num_frames * frame_bytes
+            remainder = data[usable:]
+            if num_frames == 0:
+                continue
+
+            # Um quadro por linha; a energia de todos os quadros do bloco sai de uma vez
+            samples = np.frombuffer(data[:usable], dtype="<i2").astype(np.float32)
+            samples = samples.reshape(num_frames, frame_len)
+            energies.append(np.sqrt(np.mean(samples * samples, axis=1)))
+
+    if process.returncode != 0:
+        raise RuntimeError(f"FFmpeg falhou ao decodificar {audio_path} (código {process.returncode})")
+
+    if not energies:
+        return np.zeros(0, dtype=np.float32)
+    return np.concatenate(energies)
+
+def find_silence_boundaries(energy, target_times, tolerance=SILENCE_TOLERANCE, frame_ms=FRAME_MS, min_gap=0.0):
+    """
+    Move cada ponto de corte ideal para o trecho mais silencioso ao seu redor.
+
+    Args:
+        energy (numpy.ndarray): Energia por quadro, de compute_energy_profile
+        target_times (list): Pontos de corte ideais em segundos, em ordem crescente
+        tolerance (float, optional): Distância máxima, em segundos, entre o corte e o ponto ideal
+        frame_ms (int, optional): Duração de cada quadro em milissegundos
+        min_gap (float, optional): Distância mínima, em segundos, entre dois cortes
+
+    Returns:
+        list: Pontos de corte em segundos, em ordem estritamente crescente
+    """
+    if len(target_times) == 0 or len(energy) == 0:
+        return list(target_times)
+    np = lazy_import("numpy")
+
+    # Média móvel para ignorar pausas curtas entre sílabas
+    smoothing = max(1, SMOOTHING_MS // frame_ms)
+    smoothed = np.convolve(energy, np.ones(smoothing, dtype=np.float32) / smoothing, mode="same")
+
+    # Todas as janelas de busca têm o mesmo tamanho; o argmin é calculado de uma vez
+    half_window = max(1, int(tolerance * 1000 / frame_ms))
+    window = min(2 * half_window + 1, len(smoothed))
+    centers = np.round(np.asarray(target_times, dtype=np.float64) * 1000 / frame_ms).astype(np.int64)
+    starts = np.clip(centers - half_window, 0, len(smoothed) - window)
+    windows = np.lib.stride_tricks.sliding_window_view(smoothed, window)[starts]
+    frames = starts + np.argmin(windows, axis=1)
+
+    # Garantir que os cortes continuem em ordem, e afastados, mesmo se as janelas se sobrepuserem
+    gap_frames = max(1, int(round(min_gap * 1000 / frame_ms)))
+    boundaries = []
+    previous = 0
+    for frame in frames:
+        frame = max(int(frame), previous + gap_frames)
+        boundaries.append(frame * frame_ms / 1000)
+        previous = frame
+    return boundaries
+
+def plan_chunks(duration, energy, max_chunk_seconds, tolerance=SILENCE_TOLERANCE, overlap=CHUNK_OVERLAP, frame_ms=FRAME_MS):
+    """
+    Define os trechos do áudio a transcrever, com cortes em silêncio e uma pequena sobreposição.
+
+    O espaçamento entre os cortes desconta a tolerância e a sobreposição, então nenhum
+    trecho passa de max_chunk_seconds. A tolerância e a sobreposição são reduzidas para
+    ocupar no máximo um quarto do trecho, então o espaçamento nunca fica abaixo da metade
+    de max_chunk_seconds, e cortes a menos de overlap segundos um do outro são descartados.
+
+    Args:
+        duration (float): Duração do áudio em segundos
+        energy (numpy.ndarray): Energia por quadro, de compute_energy_profile
+        max_chunk_seconds (float): Duração máxima de cada trecho
+        tolerance (float, optional): Distância máxima entre o corte e o ponto ideal
+        overlap (float, optional): Segundos repetidos de cada lado do corte
+        frame_ms (int, optional): Duração de cada quadro em milissegundos
+
+    Returns:
+        list: Tuplas (inicio, fim) em segundos
+
+    Raises:
+        ValueError: Se max_chunk_seconds for curto demais para procurar silêncios; o
+            áudio deve ser dividido em cortes fixos
+    """
+    if duration <= max_chunk_seconds:
+        return [(0.0, duration)]
+    if max_chunk_seconds < MIN_SILENCE_CHUNK_SECONDS:
+        raise ValueError(f"Trechos de {max_chunk_seconds:.1f}s são curtos demais para procurar silêncios")
+
+    # A tolerância e a sobreposição não podem consumir o trecho inteiro
+    margin = tolerance + overlap
+    if margin > max_chunk_seconds / 4:
+        scale = max_chunk_seconds / 4 / margin
+        tolerance *= scale
+        overlap *= scale
+    step = max_chunk_seconds - 2 * (tolerance + overlap)
+
+    num_chunks = math.ceil(duration / step)
+    targets = [duration * i / num_chunks for i in range(1, num_chunks)]
+
+    # Cortes muito próximos (entre si ou do fim) gerariam trechos quase vazios
+    boundaries = [0.0]
+    for cut in find_silence_boundaries(energy, targets, tolerance, frame_ms, min_gap=overlap):
+        if cut - boundaries[-1] >= overlap and duration - cut >= overlap:
+            boundaries.append(cut)
+    boundaries.append(duration)
+
+    return [
+        (max(0.0, start - overlap) if i > 0 else 0.0, min(duration, end + overlap))
+        for i, (start, end) in enumerate(zip(boundaries, boundaries[1:]))
+    ]
+
+def _normalize_word(word):
+    """Normaliza uma palavra para comparação (minúsculas, sem pontuação)"""
+    return re.sub(r"[^\w]", "", word.lower())
+
+def merge_overlapping_text(previous, following, max_words=OVERLAP_WORDS, slack=SEAM_SLACK_WORDS):
+    """
+    Remove o texto repetido na emenda entre dois chunks que se sobrepõem.
+
+    A repetição só é procurada na emenda: a sequência de palavras em comum precisa
+    terminar no fim do chunk anterior e começar no início do seguinte, com até slack
+    palavras de folga de cada lado (palavras cortadas ou transcritas de outro jeito na
+    borda). O anterior é mantido até o fim dessa sequência e o seguinte continua logo
+    depois dela. Sem uma sequência na emenda, os dois textos ficam como estão.
+
+    Args:
+        previous (str): Transcrição do chunk anterior
+        following (str): Transcrição do chunk seguinte
+        max_words (int, optional): Tamanho máximo da repetição, em palavras
+        slack (int, optional): Palavras de folga entre a repetição e as bordas
+
+    Returns:
+        tuple: (anterior, seguinte) ajustados
+    """
+    previous_words = previous.split()
+    following_words = following.split()
+    if not previous_words or not following_words:
+        return previous, following
+
+    window = max_words + slack
+    tail = [_normalize_word(word) for word in previous_words[-window:]]
+    head = [_normalize_word(word) for word in following_words[:window]]
+
+    # runs[b] = tamanho da sequência em comum terminando em tail[a] e head[b]
+    best_size, best_a, best_b = 0, None, None
+    runs = [0] * (len(head) + 1)
+    for a, word in enumerate(tail):
+        previous_runs = runs
+        runs = [0] * (len(head) + 1)
+        for b, other in enumerate(head):
+            if word and word == other:
+                size = previous_runs[b] + 1
+                runs[b + 1] = size
+                # Termina perto do fim do anterior e começa perto do início do seguinte
+                anchored = len(tail) - 1 - a <= slack and b + 1 - size <= slack
+                if anchored and size > best_size:
+                    best_size, best_a, best_b = size, a, b
+    if best_size < MIN_MERGE_WORDS:
+        return previous, following
+
+    cut = len(previous_words) - len(tail) + best_a + 1
+    return " ".join(previous_words[:cut]), " ".join(following_words[best_b + 1:])
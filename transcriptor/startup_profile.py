@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Módulo com o perfil de inicialização: mede o tempo de cada importação e de cada etapa
+de preparação do app, como o "python -X importtime", mas agrupado por etapa.
+
+As dependências pesadas (moviepy, google.generativeai, groq, pydub, python-docx, nltk,
+numpy) são importadas com lazy_import() apenas quando a etapa que as usa roda pela
+primeira vez; cada importação feita assim entra no perfil. As etapas da inicialização
+são medidas com stage().
+
+Com a variável de ambiente TRANSCRIPTOR_PERFIL_INICIO=1, o streamlit_app.py mostra o
+perfil no terminal depois da primeira execução. Pela linha de comando, o perfil de uma
+inicialização a frio é medido em um processo novo:
+
+    python startup_profile.py                   # importação dos módulos do app
+    python startup_profile.py --etapas          # inclui as dependências de cada etapa
+    python startup_profile.py --json --limite 2 # para CI: falha se passar de 2 segundos
+"""
+
+import argparse
+import importlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Variável de ambiente que liga a exibição do perfil no app
+PROFILE_ENV = "TRANSCRIPTOR_PERFIL_INICIO"
+
+# Dependências pesadas de cada etapa do processamento
+STAGE_DEPENDENCIES = {
+    "extracao": ["moviepy", "pydub", "numpy"],
+    "transcricao": ["groq"],
+    "resumo": ["google.generativeai", "nltk"],
+    "documento": ["docx"],
+}
+
+# Módulos importados pelo app na inicialização
+APP_MODULES = ["streamlit", "artifact_store", "job_queue", "embedded_ffmpeg", "pipeline", "processing", "segment_index"]
+
+# Etapas medidas no processo, em ordem: (nome, início, duração)
+_records = []
+_records_lock = threading.Lock()
+_origin = time.perf_counter()
+_reported = False
+
+def _record(name, start, elapsed):
+    with _records_lock:
+        _records.append((name, start - _origin, elapsed))
+
+@contextmanager
+def stage(name):
+    """Mede uma etapa da inicialização"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(name, start, time.perf_counter() - start)
+
+def lazy_import(module_name):
+    """
+    Importa um módulo na primeira vez que ele é necessário, registrando o tempo no perfil.
+    Nas chamadas seguintes devolve o módulo já carregado, sem custo.
+
+    Raises:
+        ImportError: Se o módulo não estiver instalado
+    """
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+    with stage(f"import {module_name}"):
+        return importlib.import_module(module_name)
+
+def records():
+    """Retorna as etapas medidas: lista de (nome, início, duração), em segundos"""
+    with _records_lock:
+        return list(_records)
+
+def report(entries=None):
+    """Formata as etapas medidas como uma tabela"""
+    entries = records() if entries is None else entries
+    if not entries:
+        return "Nenhuma etapa medida."
+    width = max(len(name) for name, _, _ in entries)
+    lines = [f"{'Etapa':<{width}}  {'Início':>8}  {'Duração':>8}"]
+    for name, start, elapsed in entries:
+        lines.append(f"{name:<{width}}  {start:>7.3f}s  {elapsed:>7.3f}s")
+    # Etapas podem conter outras (importações dentro de uma etapa); o total é o intervalo coberto
+    total = max(start + elapsed for _, start, elapsed in entries) - min(start for _, start, _ in entries)
+    lines.append(f"{'Total':<{width}}  {'':>8}  {total:>7.3f}s")
+    return "\n".join(lines)
+
+def print_report_once():
+    """Mostra o perfil no terminal uma única vez por processo, se PROFILE_ENV estiver ligada"""
+    global _reported
+    if os.environ.get(PROFILE_ENV) and not _reported:
+        _reported = True
+        print(report(), file=sys.stderr)
+
+def _measure(with_stages):
+    """Mede a importação dos módulos do app (e das dependências das etapas) neste processo"""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    for module_name in APP_MODULES:
+        with stage(f"import {module_name}"):
+            importlib.import_module(module_name)
+    if with_stages:
+        for stage_name, modules in STAGE_DEPENDENCIES.items():
+            for module_name in modules:
+                if module_name in sys.modules:
+                    continue
+                try:
+                    with stage(f"etapa {stage_name}: {module_name}"):
+                        importlib.import_module(module_name)
+                except ImportError:
+                    pass
+    return records()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede o tempo de inicialização a frio do app.")
+    parser.add_argument("--etapas", action="store_true", help="Inclui as dependências carregadas por etapa")
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    parser.add_argument("--limite", type=float, default=None,
+                        help="Falha (código 1) se a importação dos módulos do app passar deste número de segundos")
+    parser.add_argument("--medir", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.medir:
+        # Executado no processo novo: só mede e devolve o resultado
+        print(json.dumps(_measure(args.etapas)))
+        return 0
+
+    # Um processo novo garante que nenhum módulo já está carregado
+    command = [sys.executable, os.path.abspath(__file__), "--medir"] + (["--etapas"] if args.etapas else [])
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(result.stderr, file=sys.stderr)
+        return result.returncode
+    entries = [tuple(entry) for entry in json.loads(result.stdout.strip().splitlines()[-1])]
+
+    startup = sum(elapsed for name, _, elapsed in entries if not name.startswith("etapa "))
+    if args.json:
+        print(json.dumps({
+            "inicializacao": startup,
+            "etapas": [{"nome": name, "inicio": start, "duracao": elapsed} for name, start, elapsed in entries]
+        }, ensure_ascii=False, indent=2))
+    else:
+        print(report(entries))
+        print(f"\nImportação dos módulos do app: {startup:.3f}s")
+
+    if args.limite is not None and startup > args.limite:
+        print(f"Inicialização acima do limite de {args.limite:.3f}s", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,7 +2,12 @@
 import platform
 import os
 import sys
-import streamlit as st
+
+# Perfil de inicialização: cada etapa abaixo é medida (veja startup_profile.py)
+from startup_profile import stage, print_report_once
+
+with stage("import streamlit"):
+    import streamlit as st
 
 # Configuração da página - DEVE ser a primeira chamada Streamlit
 st.set_page_config(
@@ -12,27 +17,20 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Verificar se o FFmpeg embutido está disponível
-try:
-    from embedded_ffmpeg import check_ffmpeg
-    
-    # Verificar se o FFmpeg está disponível
-    if check_ffmpeg():
-        st.success("FFmpeg embutido encontrado e configurado com sucesso!")
+# Preparar FFmpeg, PATH, NLP, bibliotecas e clientes das APIs em segundo plano, uma vez por
+# processo; a página abre sem esperar, e as sessões seguintes encontram tudo pronto
+with stage("pré-aquecimento"):
+    from prewarm import start_prewarm
+    prewarm = start_prewarm()
+
+if prewarm.wait("ffmpeg", timeout=0):
+    ffmpeg_info = prewarm.result("ffmpeg")
+    if ffmpeg_info:
+        st.success(f"FFmpeg {ffmpeg_info.versao or ''} ({ffmpeg_info.origem}) encontrado e configurado com sucesso!")
     else:
-        # Tentar baixar o FFmpeg
-        try:
-            from download_ffmpeg import download_ffmpeg_for_current_os
-            download_ffmpeg_for_current_os()
-            # Verificar novamente
-            if check_ffmpeg():
-                st.success("FFmpeg baixado e configurado com sucesso!")
-            else:
-                st.warning("Não foi possível configurar o FFmpeg embutido. Algumas funcionalidades podem não estar disponíveis.")
-        except Exception as e:
-            st.error(f"Erro ao baixar FFmpeg: {str(e)}")
-except ImportError:
-    st.warning("Módulo de FFmpeg embutido não encontrado. Continuando com o método padrão.")
+        st.warning("Não foi possível configurar o FFmpeg. Algumas funcionalidades podem não estar disponíveis.")
+else:
+    st.info("Preparando o FFmpeg em segundo plano...")
 
 # Para Windows, verificar se o ffmpeg está instalado
 system = platform.system()
@@ -46,30 +44,20 @@ if system == "Windows":
     except Exception as e:
         print(f"Erro ao tentar instalar ffmpeg: {str(e)}")
 
-# Para Linux/Mac, executar o script de configuração
-else:
-    try:
-        # No Streamlit Cloud, o script setup.sh não pode ser executado diretamente
-        # Mas podemos verificar e configurar o PATH para ffmpeg
-        os.environ["PATH"] = os.environ["PATH"] + os.pathsep + "/usr/bin" + os.pathsep + "/usr/local/bin" + os.pathsep + "/app/.apt/usr/bin" + os.pathsep + "/home/appuser/.apt/usr/bin"
-    except Exception as e:
-        print(f"Erro ao configurar o PATH: {str(e)}")
+# Em Linux/Mac, os diretórios do ffmpeg no Streamlit Cloud entram no PATH pela busca do
+# ffmpeg_resolver, feita no pré-aquecimento
 
 # Importar o script de inicialização para aplicar as correções
-import app_init
-
-# Importar o script de correção do ffmpeg
-import ffmpeg_fix
-
-# Ajustar o PATH para encontrar o ffmpeg
-ffmpeg_encontrado = ffmpeg_fix.fix_ffmpeg_path()
-
-if not ffmpeg_encontrado:
-    st.warning("FFmpeg não encontrado no sistema. Usando a versão embutida.")
+with stage("app_init"):
+    import app_init
 
 # Importar o app original
-import app
+with stage("app"):
+    import app
 
 # Substituir a função set_page_config no módulo app para não fazer nada
 # Isso é necessário para evitar chamadas duplicadas
-app.st.set_page_config = lambda **kwargs: None
\ No newline at end of file
+app.st.set_page_config = lambda **kwargs: None
+
+# Com TRANSCRIPTOR_PERFIL_INICIO=1, mostrar o tempo de cada etapa no terminal
+print_report_once()
@@ -0,0 +1,18 @@
+"""
+Configuração dos testes: os módulos do app são importados pelo nome (como no Streamlit),
+então o diretório do app entra no caminho de importação.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture
+def audio_path(tmp_path):
+    """Arquivo de áudio falso; o servidor falso não lê o conteúdo"""
+    path = tmp_path / "chunk.ogg"
+    path.write_bytes(b"\0" * 1024)
+    return str(path)
@@ -0,0 +1,78 @@
+"""
+Testes das reservas da fila de trabalhos (job_queue.py) com renovação e devolução concorrentes.
+"""
+
+import os
+import time
+
+import pytest
+
+from job_queue import ESTADOS, JobQueue, LeaseLostError
+
+@pytest.fixture
+def queue(tmp_path):
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"0")
+    queue = JobQueue(str(tmp_path / "fila"), lease_seconds=0.05)
+    queue.enqueue(str(video))
+    return queue
+
+def _estados(queue, job_id):
+    """Estados em que o arquivo do trabalho aparece (deve ser sempre exatamente um)"""
+    return [
+        estado for estado, dirname in ESTADOS.items()
+        if os.path.exists(os.path.join(queue.root, dirname, job_id + ".json"))
+    ]
+
+def test_devolucao_durante_a_renovacao_nao_duplica_o_trabalho(queue, monkeypatch):
+    job = queue.claim("w1")
+    time.sleep(0.1)
+    # A reserva já expirou; a renovada vale por tempo suficiente para o restante do teste
+    queue.lease_seconds = 60
+
+    # A devolução roda entre a leitura e a gravação feitas pela renovação
+    read = queue._read
+    pending = [True]
+    def read_and_requeue(path):
+        job = read(path)
+        if pending:
+            pending.pop()
+            queue.requeue_expired()
+        return job
+    monkeypatch.setattr(queue, "_read", read_and_requeue)
+
+    queue.heartbeat(job["id"], "w1", etapa="extracao")
+    monkeypatch.undo()
+
+    # O trabalho continua só em execução, com a reserva renovada, e ninguém mais o pega
+    assert _estados(queue, job["id"]) == ["em_execucao"]
+    assert queue.get(job["id"])["etapa"] == "extracao"
+    assert queue.claim("w2") is None
+
+def test_renovacao_depois_da_devolucao_perde_a_reserva(queue):
+    job = queue.claim("w1")
+    time.sleep(0.1)
+    assert queue.requeue_expired() == 1
+
+    with pytest.raises(LeaseLostError):
+        queue.heartbeat(job["id"], "w1")
+    assert _estados(queue, job["id"]) == ["pendente"]
+
+    # Outro worker pega o trabalho; o primeiro não consegue mais concluí-lo
+    assert queue.claim("w2")["id"] == job["id"]
+    with pytest.raises(LeaseLostError):
+        queue.complete(job["id"], "w1", {})
+    assert _estados(queue, job["id"]) == ["em_execucao"]
+    assert queue.get(job["id"])["lease"]["worker"] == "w2"
+
+def test_trabalho_abandonado_com_nome_privado_volta_para_a_fila(queue):
+    job = queue.claim("w1")
+    # Simula um processo que morreu no meio de uma alteração
+    path = queue._path("em_execucao", job["id"])
+    private_path = queue._rename_private(path)
+    time.sleep(0.1)
+
+    queue.requeue_expired()
+
+    assert not os.path.exists(private_path)
+    assert _estados(queue, job["id"]) == ["pendente"]
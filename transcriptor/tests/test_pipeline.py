@@ -0,0 +1,72 @@
+"""
+Testes do modo em pipeline (pipeline.py) com o FFmpeg embutido e o servidor falso do Groq.
+"""
+
+import subprocess
+
+import pytest
+
+from artifact_store import ArtifactStore
+from embedded_ffmpeg import EmbeddedFFmpeg
+from fake_api_server import FakeAPIServer
+from pipeline import FIRST_SEGMENT_SECONDS, transcribe_video_pipelined
+from processing import GroqTranscriber
+from resilience import CircuitBreaker
+
+TEXTO = "Primeira frase. Segunda frase."
+
+@pytest.fixture
+def video_path(tmp_path):
+    """Vídeo (só com áudio) de 45 segundos: dois segmentos no pipeline"""
+    ffmpeg_path = EmbeddedFFmpeg.get_ffmpeg_path()
+    if not ffmpeg_path:
+        pytest.skip("FFmpeg não disponível")
+    path = tmp_path / "video.mp4"
+    subprocess.run(
+        [ffmpeg_path, "-f", "lavfi", "-i", "sine=frequency=440:duration=45", "-c:a", "aac", "-y", str(path)],
+        check=True, capture_output=True
+    )
+    return str(path)
+
+def _transcriber(server, store, work_dir):
+    transcriber = GroqTranscriber(api_key="teste", base_url=server.url, store=store, work_dir=work_dir)
+    transcriber.breaker = CircuitBreaker("teste")
+    return transcriber
+
+def test_pipeline_monta_o_indice_no_tempo_do_video(video_path, tmp_path):
+    store = ArtifactStore(str(tmp_path / "artefatos"))
+    with FakeAPIServer(transcription_text=TEXTO) as server:
+        transcriber = _transcriber(server, store, str(tmp_path))
+        resultado = transcribe_video_pipelined(video_path, transcriber, str(tmp_path), audio_path=str(tmp_path / "audio"))
+
+    assert resultado["falhas"] == []
+    assert resultado["texto"] == TEXTO + "\n" + TEXTO + "\n"
+    # Os segmentos da segunda parte começam no ponto de corte, não no zero
+    assert [start for start, _, _ in resultado["indice"]] == [0.0, 2.0, FIRST_SEGMENT_SECONDS, FIRST_SEGMENT_SECONDS + 2.0]
+    assert transcriber.ultimo_indice is resultado["indice"]
+
+def test_transcricao_do_pipeline_e_reaproveitada(video_path, tmp_path):
+    store = ArtifactStore(str(tmp_path / "artefatos"))
+    with FakeAPIServer(transcription_text=TEXTO) as server:
+        primeira = transcribe_video_pipelined(
+            video_path, _transcriber(server, store, str(tmp_path)), str(tmp_path), audio_path=str(tmp_path / "audio")
+        )
+        requisicoes = server.request_count
+
+        # Mesma chave de GroqTranscriber.transcribe: o botão "Transcrever" não chama a API de novo
+        transcriber = _transcriber(server, store, str(tmp_path))
+        text, _ = transcriber.transcribe(primeira["audio_path"])
+        assert text == primeira["texto"]
+        assert transcriber.ultimo_indice.to_json() == primeira["indice"].to_json()
+
+        # E uma nova execução do pipeline nem extrai o áudio
+        (tmp_path / "outra").mkdir()
+        segunda = transcribe_video_pipelined(
+            video_path, _transcriber(server, store, str(tmp_path / "outra")), str(tmp_path / "outra"),
+            audio_path=str(tmp_path / "outra" / "audio")
+        )
+        assert server.request_count == requisicoes
+
+    assert segunda["texto"] == primeira["texto"]
+    assert segunda["indice"].to_json() == primeira["indice"].to_json()
+    assert segunda["audio_path"].startswith(str(tmp_path / "outra"))
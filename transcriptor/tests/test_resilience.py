@@ -0,0 +1,116 @@
+"""
+Testes da repetição e do disjuntor (resilience.py) contra o servidor falso do Groq.
+"""
+
+import time
+
+import pytest
+
+from fake_api_server import FakeAPIServer
+from processing import GroqTranscriber, get_groq_client
+from resilience import CircuitBreaker, CircuitOpenError, RetryPolicy, call_with_retry, get_status_code
+
+def _transcrever(server, audio_path):
+    """Função que faz uma chamada de transcrição ao servidor falso, sem repetição do SDK"""
+    client = get_groq_client("teste", server.url)
+
+    def create():
+        with open(audio_path, "rb") as audio_file:
+            return client.audio.transcriptions.create(model="whisper-large-v3-turbo", file=audio_file)
+    return create
+
+def test_retry_after_do_429_e_respeitado(audio_path):
+    esperas = []
+    with FakeAPIServer(rate_limit_failures=2, retry_after=3) as server:
+        result = call_with_retry(
+            _transcrever(server, audio_path),
+            policy=RetryPolicy(max_attempts=5, base_delay=0.01),
+            breaker=CircuitBreaker("teste"),
+            sleep=esperas.append
+        )
+
+    assert result.text == server.transcription_text
+    assert server.request_count == 3
+    # A espera é a indicada pelo provedor, com no máximo 10% de variação
+    assert len(esperas) == 2
+    assert all(3 <= espera <= 3.3 for espera in esperas)
+
+def test_retry_after_acima_do_tempo_maximo_nao_espera(audio_path):
+    esperas = []
+    with FakeAPIServer(rate_limit_failures=5, retry_after=30) as server:
+        with pytest.raises(Exception) as error:
+            call_with_retry(
+                _transcrever(server, audio_path),
+                policy=RetryPolicy(max_attempts=5, max_total_wait=10),
+                sleep=esperas.append
+            )
+
+    assert get_status_code(error.value) == 429
+    assert esperas == []
+    assert server.request_count == 1
+
+def test_transcritor_espera_o_retry_after(audio_path):
+    with FakeAPIServer(rate_limit_failures=1, retry_after=1) as server:
+        transcriber = GroqTranscriber(api_key="teste", base_url=server.url)
+        transcriber.breaker = CircuitBreaker("teste")
+        start = time.monotonic()
+        text = transcriber.request_transcription(audio_path)
+        elapsed = time.monotonic() - start
+
+    assert text == server.transcription_text
+    assert server.request_count == 2
+    assert elapsed >= 1.0
+
+def _falhar_ate_abrir(server, audio_path, breaker, falhas):
+    """Faz chamadas sem repetição que falham com 503 até o disjuntor abrir"""
+    for _ in range(falhas):
+        with pytest.raises(Exception) as error:
+            call_with_retry(_transcrever(server, audio_path), policy=RetryPolicy(max_attempts=1), breaker=breaker)
+        assert get_status_code(error.value) == 503
+
+def test_disjuntor_abre_e_recusa_sem_chamar_o_provedor(audio_path):
+    breaker = CircuitBreaker("teste", failure_threshold=2, recovery_timeout=60)
+    with FakeAPIServer(server_errors=10) as server:
+        _falhar_ate_abrir(server, audio_path, breaker, 2)
+        assert breaker.state == "aberto"
+
+        with pytest.raises(CircuitOpenError):
+            call_with_retry(_transcrever(server, audio_path), breaker=breaker)
+        assert server.request_count == 2
+
+def test_disjuntor_meio_aberto_fecha_com_sucesso(audio_path):
+    breaker = CircuitBreaker("teste", failure_threshold=2, recovery_timeout=0.2)
+    with FakeAPIServer(server_errors=2) as server:
+        _falhar_ate_abrir(server, audio_path, breaker, 2)
+        assert breaker.state == "aberto"
+
+        time.sleep(0.25)
+        assert breaker.state == "meio-aberto"
+        result = call_with_retry(_transcrever(server, audio_path), policy=RetryPolicy(max_attempts=1), breaker=breaker)
+
+    assert result.text == server.transcription_text
+    assert breaker.state == "fechado"
+    assert server.request_count == 3
+
+def test_disjuntor_meio_aberto_reabre_com_falha(audio_path):
+    breaker = CircuitBreaker("teste", failure_threshold=2, recovery_timeout=0.2)
+    with FakeAPIServer(server_errors=3) as server:
+        _falhar_ate_abrir(server, audio_path, breaker, 2)
+        time.sleep(0.25)
+
+        # A chamada de teste falha: o disjuntor volta a abrir sem esperar novas falhas
+        _falhar_ate_abrir(server, audio_path, breaker, 1)
+        assert breaker.state == "aberto"
+        with pytest.raises(CircuitOpenError):
+            call_with_retry(_transcrever(server, audio_path), breaker=breaker)
+        assert server.request_count == 3
+
+def test_disjuntor_meio_aberto_deixa_passar_uma_chamada_por_vez():
+    breaker = CircuitBreaker("teste", failure_threshold=1, recovery_timeout=0)
+    breaker.record_failure()
+
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    breaker.before_call()
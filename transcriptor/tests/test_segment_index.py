@@ -0,0 +1,44 @@
+"""
+Testes do índice de segmentos (segment_index.py) com segmentos sobrepostos.
+"""
+
+from segment_index import SegmentIndex
+
+# Um segmento longo que cobre um curto, como o Whisper às vezes devolve
+SEGMENTOS = [
+    (0.0, 10.0, "Segmento longo"),
+    (2.0, 3.5, "Curto dentro do longo"),
+    (12.0, 14.0, "Depois da pausa"),
+]
+
+def test_srt_mantem_os_fins_originais():
+    srt = SegmentIndex.from_segments(SEGMENTOS).to_srt()
+
+    assert srt == (
+        "1\n00:00:00,000 --> 00:00:10,000\nSegmento longo\n\n"
+        "2\n00:00:02,000 --> 00:00:03,500\nCurto dentro do longo\n\n"
+        "3\n00:00:12,000 --> 00:00:14,000\nDepois da pausa\n"
+    )
+
+def test_vtt_e_json_mantem_os_fins_originais():
+    index = SegmentIndex.from_json(SegmentIndex.from_segments(SEGMENTOS).to_json())
+
+    assert [end for _, end, _ in index] == [10.0, 3.5, 14.0]
+    assert "00:00:02.000 --> 00:00:03.500" in index.to_vtt()
+    assert index.duration == 14.0
+
+def test_busca_considera_segmentos_que_cobrem_outros():
+    index = SegmentIndex.from_segments(SEGMENTOS)
+
+    assert index.find(3.0) == 1
+    # Depois do fim do curto, o instante ainda está no longo
+    assert index.find(5.0) == 0
+    assert index.find(11.0) == -1
+    assert index.find(13.0) == 2
+
+def test_intervalo_so_inclui_segmentos_sobrepostos():
+    index = SegmentIndex.from_segments(SEGMENTOS)
+
+    assert [texto for _, _, texto in index.between(5.0, 12.5)] == ["Segmento longo", "Depois da pausa"]
+    assert index.text_between(5.0, 12.5) == "Segmento longo\nDepois da pausa\n"
+    assert index.text_between(10.5, 11.5) == ""
@@ -0,0 +1,39 @@
+"""
+Testes da junção das emendas entre chunks sobrepostos (silence_split.merge_overlapping_text).
+"""
+
+from silence_split import merge_overlapping_text
+
+def test_repeticao_na_emenda_e_removida():
+    previous, following = merge_overlapping_text(
+        "e então o orçamento foi aprovado pela diretoria",
+        "aprovado pela diretoria na reunião de ontem"
+    )
+
+    assert previous == "e então o orçamento foi aprovado pela diretoria"
+    assert following == "na reunião de ontem"
+
+def test_repeticao_com_palavra_cortada_na_borda():
+    previous, following = merge_overlapping_text(
+        "falamos do orçamento que foi aprovado pela dire",
+        "foi aprovado pela diretoria ontem"
+    )
+
+    assert previous == "falamos do orçamento que foi aprovado pela"
+    assert following == "diretoria ontem"
+
+def test_frase_repetida_longe_da_emenda_nao_apaga_texto():
+    previous = "Hoje vamos falar sobre o que é a fotossíntese e por que ela importa para as plantas verdes"
+    following = "plantas verdes. Depois disso veremos o que é a respiração celular e como ela funciona"
+
+    merged_previous, merged_following = merge_overlapping_text(previous, following)
+
+    # Só a repetição da emenda ("plantas verdes") sai; "o que é a" aparece nos dois, mas longe dela
+    assert merged_previous == previous
+    assert merged_following == "Depois disso veremos o que é a respiração celular e como ela funciona"
+
+def test_sem_repeticao_na_emenda_mantem_os_textos():
+    previous = "o que é a fotossíntese e por que ela importa tanto para a vida no planeta hoje"
+    following = "Na próxima aula veremos o que é a respiração celular"
+
+    assert merge_overlapping_text(previous, following) == (previous, following)
@@ -0,0 +1,66 @@
+"""
+Testes do streaming do resumo (SummaryGenerator._gerar) com o modelo falso do Gemini.
+"""
+
+import pytest
+
+from fake_api_server import FakeGenerativeModel
+from processing import SummaryGenerator
+from resilience import CircuitBreaker, RetryPolicy
+
+TEXTO = "Tópico principal\n• Subtópico um\n• Subtópico dois\n"
+
+class FalhaNaPrimeiraChamada(FakeGenerativeModel):
+    """Modelo falso que cai antes do primeiro pedaço apenas na primeira chamada"""
+
+    def generate_content(self, prompt, stream=False):
+        self.fail_after = 0 if not self.prompts else None
+        return super().generate_content(prompt, stream)
+
+@pytest.fixture
+def generator():
+    generator = SummaryGenerator(api_key="teste")
+    generator.breaker = CircuitBreaker("teste")
+    generator.retry_policy = RetryPolicy(max_attempts=3, base_delay=0)
+    return generator
+
+def test_streaming_entrega_os_pedacos_em_ordem(generator):
+    generator.model = FakeGenerativeModel(TEXTO, chunk_size=8, delay=0)
+    pedacos = []
+
+    result = generator._gerar("prompt", on_chunk=pedacos.append)
+
+    assert result == TEXTO
+    assert "".join(pedacos) == TEXTO
+    assert len(pedacos) == -(-len(TEXTO) // 8)
+
+def test_falha_antes_do_primeiro_pedaco_e_repetida(generator):
+    generator.model = FalhaNaPrimeiraChamada(TEXTO, chunk_size=8, delay=0)
+    pedacos = []
+
+    result = generator._gerar("prompt", on_chunk=pedacos.append)
+
+    assert result == TEXTO
+    assert "".join(pedacos) == TEXTO
+    assert len(generator.model.prompts) == 2
+
+def test_falha_antes_do_primeiro_pedaco_esgota_as_tentativas(generator):
+    generator.model = FakeGenerativeModel(TEXTO, chunk_size=8, delay=0, fail_after=0)
+    pedacos = []
+
+    with pytest.raises(ConnectionError):
+        generator._gerar("prompt", on_chunk=pedacos.append)
+
+    assert pedacos == []
+    assert len(generator.model.prompts) == 3
+
+def test_falha_depois_do_primeiro_pedaco_nao_e_repetida(generator):
+    generator.model = FakeGenerativeModel(TEXTO, chunk_size=8, delay=0, fail_after=2)
+    pedacos = []
+
+    with pytest.raises(RuntimeError, match="streaming"):
+        generator._gerar("prompt", on_chunk=pedacos.append)
+
+    # Repetir duplicaria o texto já entregue
+    assert len(generator.model.prompts) == 1
+    assert pedacos == [TEXTO[:8], TEXTO[8:16]]
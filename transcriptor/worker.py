@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Worker que processa os trabalhos da fila (job_queue.py) fora do Streamlit.
+Reserva um trabalho, executa a extração, a transcrição, o resumo e o documento, e grava os
+resultados no diretório do trabalho. Vários workers podem rodar ao mesmo tempo, na mesma
+máquina ou em máquinas que compartilham o diretório da fila.
+
+As chaves de API vêm das variáveis de ambiente GROQ_API_KEY e GOOGLE_API_KEY ou de --config;
+elas nunca são gravadas na fila.
+
+Uso:
+    python worker.py --fila /mnt/compartilhado/fila --cache /mnt/compartilhado/artefatos
+"""
+
+import argparse
+import os
+import socket
+import sys
+import threading
+import uuid
+
+from job_queue import JobQueue, LeaseLostError, DEFAULT_LEASE_SECONDS
+from batch_cli import load_api_keys
+from embedded_ffmpeg import PERFIL_PADRAO
+from workspace import free_disk_bytes, DEFAULT_MIN_FREE_BYTES
+
+class QueueWorker:
+    """
+    Processa trabalhos da fila, um de cada vez.
+
+    Args:
+        queue (JobQueue): Fila de trabalhos
+        keys (dict): Chaves GROQ_API_KEY e GOOGLE_API_KEY
+        store (ArtifactStore, optional): Armazenamento de artefatos
+        worker_id (str, optional): Identificador do worker (padrão: máquina, processo e sufixo aleatório)
+        max_workers (int, optional): Partes do áudio transcritas ao mesmo tempo
+        min_free_bytes (int, optional): Abaixo deste espaço livre no disco da fila, o worker
+            não reserva novos trabalhos, que esperam na fila
+    """
+
+    def __init__(self, queue, keys, store=None, worker_id=None, max_workers=None, min_free_bytes=DEFAULT_MIN_FREE_BYTES):
+        self.queue = queue
+        self.keys = keys
+        self.store = store
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:4]}"
+        self.max_workers = max_workers
+        self.min_free_bytes = min_free_bytes
+        self._sem_espaco = False
+
+    def _has_disk_space(self):
+        """Confere o espaço livre no disco da fila, avisando uma vez quando ele acaba e quando volta"""
+        free = free_disk_bytes(self.queue.root)
+        sem_espaco = free is not None and free < self.min_free_bytes
+        if sem_espaco != self._sem_espaco:
+            if sem_espaco:
+                print(f"[{self.worker_id}] Pouco espaço em disco ({free / 1024 / 1024:.0f} MB livres); "
+                      "os trabalhos ficam na fila até haver espaço", file=sys.stderr)
+            else:
+                print(f"[{self.worker_id}] Espaço em disco disponível novamente")
+            self._sem_espaco = sem_espaco
+        return not sem_espaco
+
+    def _start_heartbeat(self, job_id, status):
+        """
+        Renova a reserva periodicamente em segundo plano, publicando a etapa e o progresso.
+
+        Returns:
+            threading.Event: Evento que encerra a renovação
+        """
+        stop = threading.Event()
+        interval = max(1.0, self.queue.lease_seconds / 3)
+
+        def beat():
+            while not stop.wait(interval):
+                try:
+                    self.queue.heartbeat(job_id, self.worker_id, status["etapa"], status["progresso"])
+                except LeaseLostError:
+                    status["perdido"] = True
+                    return
+                except OSError:
+                    # Falha momentânea do armazenamento compartilhado; tentar no próximo ciclo
+                    pass
+
+        threading.Thread(target=beat, daemon=True, name=f"heartbeat-{job_id}").start()
+        return stop
+
+    def process(self, job, status):
+        """
+        Executa as etapas de um trabalho.
+
+        Args:
+            job (dict): Trabalho reservado
+            status (dict): Etapa e progresso atuais, lidos pela renovação da reserva
+
+        Returns:
+            dict: Arquivos gerados, relativos ao diretório do trabalho
+        """
+        from processing import AudioExtractor, GroqTranscriber, SummaryGenerator
+
+        job_dir = self.queue.job_dir(job["id"])
+        video_path = os.path.join(job_dir, job["video"])
+        perfil = job.get("perfil") or PERFIL_PADRAO
+
+        def enter(etapa):
+            if status.get("perdido"):
+                raise LeaseLostError(f"A reserva do trabalho {job['id']} expirou.")
+            status["etapa"] = etapa
+            status["progresso"] = 0.0
+            self.queue.heartbeat(job["id"], self.worker_id, etapa, 0.0)
+
+        def update_progress(progress, *details):
+            status["progresso"] = progress
+
+        enter("extracao")
+        audio_path = AudioExtractor.extract_audio(
+            video_path,
+            os.path.join(job_dir, "audio"),
+            perfil,
+            store=self.store,
+            progress_callback=update_progress
+        )
+        if not audio_path:
+            raise RuntimeError("Falha ao extrair áudio.")
+        resultado = {"audio": os.path.basename(audio_path)}
+
+        enter("transcricao")
+        transcriber = GroqTranscriber(
+            api_key=self.keys["GROQ_API_KEY"],
+            max_workers=self.max_workers,
+            store=self.store,
+            work_dir=job_dir
+        )
+        transcription, _ = transcriber.transcribe(
+            audio_path,
+            output_path=os.path.join(job_dir, "transcricao.txt"),
+            progress_callback=update_progress
+        )
+        if not transcription or transcriber.failed_chunks:
+            raise RuntimeError("Transcrição incompleta.")
+        resultado["transcricao"] = "transcricao.txt"
+        
+        # Segmentos com tempo, para as legendas e a correção de trechos no app
+        if transcriber.ultimo_indice:
+            for nome, conteudo in (("segmentos.json", transcriber.ultimo_indice.to_json()),
+                                   ("transcricao.srt", transcriber.ultimo_indice.to_srt()),
+                                   ("transcricao.vtt", transcriber.ultimo_indice.to_vtt())):
+                with open(os.path.join(job_dir, nome), "w", encoding="utf-8") as f:
+                    f.write(conteudo)
+            resultado["segmentos"] = "segmentos.json"
+            resultado["legendas"] = ["transcricao.srt", "transcricao.vtt"]
+
+        if job.get("resumo", True):
+            enter("resumo")
+            generator = SummaryGenerator(api_key=self.keys["GOOGLE_API_KEY"], store=self.store)
+            resumo = generator.gerar_resumo_profissional(transcription, progress_callback=update_progress)
+            if not resumo:
+                raise RuntimeError("Falha ao gerar o resumo.")
+            with open(os.path.join(job_dir, "resumo.txt"), "w", encoding="utf-8") as f:
+                f.write(resumo)
+            resultado["resumo"] = "resumo.txt"
+
+            enter("documento")
+            docx_bytes, _ = generator.salvar_como_doc(resumo, os.path.join(job_dir, "resumo.docx"))
+            if not docx_bytes:
+                raise RuntimeError("Falha ao salvar o documento.")
+            resultado["documento"] = "resumo.docx"
+
+        return resultado
+
+    def run_once(self):
+        """
+        Reserva e processa um trabalho.
+
+        Returns:
+            bool: False se a fila estava vazia ou se não há espaço em disco para um novo trabalho
+        """
+        if not self._has_disk_space():
+            return False
+
+        job = self.queue.claim(self.worker_id)
+        if job is None:
+            return False
+
+        print(f"[{self.worker_id}] Processando {job['nome']} ({job['id']}, tentativa {job['tentativas']})")
+        status = {"etapa": None, "progresso": 0.0, "perdido": False}
+        stop_heartbeat = self._start_heartbeat(job["id"], status)
+        try:
+            resultado = self.process(job, status)
+            self.queue.complete(job["id"], self.worker_id, resultado)
+            print(f"[{self.worker_id}] Concluído: {job['nome']}")
+        except LeaseLostError as e:
+            # Outro worker assumiu o trabalho; descartar este resultado
+            print(f"[{self.worker_id}] {str(e)}", file=sys.stderr)
+        except Exception as e:
+            print(f"[{self.worker_id}] Erro em {job['nome']}: {str(e)}", file=sys.stderr)
+            try:
+                self.queue.fail(job["id"], self.worker_id, str(e))
+            except LeaseLostError:
+                pass
+        finally:
+            stop_heartbeat.set()
+        return True
+
+    def run(self, poll_interval=2.0, stop_event=None):
+        """Processa trabalhos até stop_event ser acionado, esperando poll_interval com a fila vazia"""
+        stop_event = stop_event or threading.Event()
+        print(f"[{self.worker_id}] Aguardando trabalhos em {self.queue.root}")
+        while not stop_event.is_set():
+            if not self.run_once():
+                stop_event.wait(poll_interval)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Processa os trabalhos da fila de transcrição.")
+    parser.add_argument("--fila", required=True, help="Diretório da fila (o mesmo configurado no app)")
+    parser.add_argument("--config", help="Arquivo JSON com GROQ_API_KEY e GOOGLE_API_KEY")
+    parser.add_argument("--cache", help="Diretório do armazenamento de artefatos")
+    parser.add_argument("--intervalo", type=float, default=2.0, help="Segundos entre consultas com a fila vazia")
+    parser.add_argument("--lease", type=float, default=DEFAULT_LEASE_SECONDS, help="Duração da reserva de um trabalho")
+    parser.add_argument("--transcricoes-simultaneas", type=int, default=None,
+                        help="Partes do áudio enviadas ao Groq ao mesmo tempo")
+    parser.add_argument("--uma-vez", action="store_true", help="Processa os trabalhos pendentes e encerra")
+    args = parser.parse_args(argv)
+
+    keys = load_api_keys(args.config)
+    if not keys.get("GROQ_API_KEY") or not keys.get("GOOGLE_API_KEY"):
+        parser.error("defina GROQ_API_KEY e GOOGLE_API_KEY no ambiente ou em --config")
+
+    store = None
+    if args.cache:
+        from artifact_store import get_artifact_store
+        store = get_artifact_store(args.cache)
+
+    # Preparar FFmpeg, NLP, bibliotecas e clientes enquanto o worker espera o primeiro trabalho
+    from prewarm import start_prewarm
+    start_prewarm(keys)
+    
+    worker = QueueWorker(
+        JobQueue(args.fila, lease_seconds=args.lease),
+        keys,
+        store=store,
+        max_workers=args.transcricoes_simultaneas
+    )
+    if args.uma_vez:
+        while worker.run_once():
+            pass
+        return 0
+
+    try:
+        worker.run(poll_interval=args.intervalo)
+    except KeyboardInterrupt:
+        print(f"[{worker.worker_id}] Encerrado.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
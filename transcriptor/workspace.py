@@ -0,0 +1,394 @@
+"""
+Módulo com os espaços de trabalho isolados de cada sessão (ou trabalho).
+Cada sessão grava o vídeo, o áudio, as partes e os resultados no seu próprio diretório,
+então usuários simultâneos nunca sobrescrevem os arquivos uns dos outros. O gerenciador
+guarda o espaço usado por cada diretório e aplica duas cotas: uma por sessão e uma total,
+além de manter um mínimo de espaço livre no disco.
+
+Antes de um processamento que grava arquivos grandes, a sessão reserva o espaço estimado.
+Se não houver espaço, os diretórios das sessões paradas há mais tempo são removidos,
+começando pelos que ocupam mais espaço há mais tempo; se ainda assim não couber, a reserva
+espera outros processamentos terminarem (em vez de encher o disco) até um tempo máximo.
+Um diretório com reserva em andamento nunca é removido, nem um que contenha um arquivo
+marcado com pin() por um processamento em andamento.
+
+As cotas padrão podem ser ajustadas pelas variáveis de ambiente TRANSCRIPTOR_COTA_SESSAO_MB,
+TRANSCRIPTOR_COTA_TOTAL_MB e TRANSCRIPTOR_ESPACO_LIVRE_MB.
+"""
+
+import os
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+MB = 1024 * 1024
+
+def _env_mb(name, default_mb):
+    """Tamanho em bytes lido de uma variável de ambiente em MB"""
+    try:
+        return int(float(os.environ.get(name, default_mb)) * MB)
+    except ValueError:
+        return default_mb * MB
+
+# Espaço máximo de uma sessão
+DEFAULT_SESSION_QUOTA = _env_mb("TRANSCRIPTOR_COTA_SESSAO_MB", 2048)
+
+# Espaço máximo de todas as sessões juntas
+DEFAULT_GLOBAL_QUOTA = _env_mb("TRANSCRIPTOR_COTA_TOTAL_MB", 10240)
+
+# Espaço livre mantido no disco
+DEFAULT_MIN_FREE_BYTES = _env_mb("TRANSCRIPTOR_ESPACO_LIVRE_MB", 1024)
+
+# Só diretórios sem acesso há este tempo podem ser removidos para liberar espaço
+MIN_IDLE_SECONDS = 600
+
+# Tempo máximo que uma reserva espera por espaço
+DEFAULT_WAIT_SECONDS = 300
+
+class QuotaExceededError(Exception):
+    """Erro lançado quando o espaço pedido passa da cota da sessão"""
+
+class NoSpaceError(QuotaExceededError):
+    """Erro lançado quando não houve espaço no servidor dentro do tempo de espera"""
+
+# Arquivos e diretórios em uso por processamentos em andamento: caminho -> número de marcações
+_pinned = {}
+_pinned_lock = threading.Lock()
+
+def pin(path):
+    """Marca um arquivo ou diretório como em uso; ele não é removido pela limpeza nem para liberar espaço"""
+    path = os.path.abspath(path)
+    with _pinned_lock:
+        _pinned[path] = _pinned.get(path, 0) + 1
+
+def unpin(path):
+    """Desfaz uma marcação de pin()"""
+    path = os.path.abspath(path)
+    with _pinned_lock:
+        count = _pinned.get(path, 0) - 1
+        if count > 0:
+            _pinned[path] = count
+        else:
+            _pinned.pop(path, None)
+
+@contextmanager
+def pinned(*paths):
+    """Marca os caminhos como em uso durante um bloco with"""
+    for path in paths:
+        pin(path)
+    try:
+        yield
+    finally:
+        for path in paths:
+            unpin(path)
+
+def is_pinned(path):
+    """True se o caminho, ou algum arquivo dentro dele, estiver marcado como em uso"""
+    path = os.path.abspath(path)
+    with _pinned_lock:
+        return any(pinned_path == path or pinned_path.startswith(path + os.sep) for pinned_path in _pinned)
+
+def directory_size(path):
+    """Soma o tamanho dos arquivos de um diretório e dos seus subdiretórios"""
+    total = 0
+    pending = [path]
+    while pending:
+        try:
+            entries = os.scandir(pending.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        total += entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    pass
+    return total
+
+def free_disk_bytes(path):
+    """Espaço livre no disco de um diretório, ou None se não for possível consultar"""
+    try:
+        return shutil.disk_usage(path).free
+    except OSError:
+        return None
+
+class Workspace:
+    """
+    Diretório de uma sessão ou trabalho.
+
+    Attributes:
+        name (str): Nome do diretório
+        path (str): Caminho do diretório
+        used (int): Bytes usados na última medição
+        reserved (int): Bytes reservados pelos processamentos em andamento
+        active (int): Número de reservas em andamento
+        last_access (float): Horário do último acesso
+    """
+
+    def __init__(self, name, path, used=0, last_access=None):
+        self.name = name
+        self.path = path
+        self.used = used
+        self.reserved = 0
+        self.active = 0
+        self.last_access = last_access or time.time()
+
+    def file(self, filename):
+        """Caminho de um arquivo dentro do diretório"""
+        return os.path.join(self.path, filename)
+
+class WorkspaceManager:
+    """
+    Cria os diretórios das sessões dentro de root e controla o espaço usado por eles.
+
+    Args:
+        root (str): Diretório onde ficam os diretórios das sessões
+        session_quota (int, optional): Bytes máximos de uma sessão
+        global_quota (int, optional): Bytes máximos de todas as sessões
+        min_free_bytes (int, optional): Espaço livre mantido no disco
+    """
+
+    def __init__(self, root, session_quota=DEFAULT_SESSION_QUOTA, global_quota=DEFAULT_GLOBAL_QUOTA,
+                 min_free_bytes=DEFAULT_MIN_FREE_BYTES):
+        self.root = os.path.abspath(root)
+        self.session_quota = session_quota
+        self.global_quota = global_quota
+        self.min_free_bytes = min_free_bytes
+        self._condition = threading.Condition()
+        os.makedirs(self.root, exist_ok=True)
+
+        # Índice em memória dos diretórios: nome -> Workspace, com o espaço usado e o último acesso
+        self._workspaces = {}
+        self.sync()
+
+    def sync(self):
+        """
+        Atualiza o índice com os diretórios criados ou removidos fora dele (por outros
+        processos, por exemplo). É a única operação que percorre o diretório raiz; os
+        diretórios novos são medidos e os já conhecidos só têm o último acesso atualizado.
+        """
+        with self._condition:
+            names = set()
+            for entry in os.scandir(self.root):
+                if not entry.is_dir(follow_symlinks=False) or entry.name.startswith("."):
+                    continue
+                names.add(entry.name)
+                try:
+                    mtime = entry.stat().st_mtime
+                except OSError:
+                    continue
+                workspace = self._workspaces.get(entry.name)
+                if workspace is None:
+                    self._workspaces[entry.name] = Workspace(entry.name, entry.path, directory_size(entry.path), mtime)
+                else:
+                    workspace.last_access = max(workspace.last_access, mtime)
+            for name, workspace in list(self._workspaces.items()):
+                if name not in names and not workspace.active:
+                    del self._workspaces[name]
+
+    def workspace(self, name=None):
+        """
+        Retorna o diretório de uma sessão, criando-o (ou recriando-o, se foi removido) e registrando o acesso.
+
+        Args:
+            name (str, optional): Nome do diretório; sem nome, cria um novo
+
+        Returns:
+            Workspace: Diretório da sessão
+        """
+        with self._condition:
+            name = name or uuid.uuid4().hex
+            workspace = self._workspaces.get(name)
+            if workspace is None:
+                workspace = Workspace(name, os.path.join(self.root, name))
+                self._workspaces[name] = workspace
+            os.makedirs(workspace.path, exist_ok=True)
+            workspace.last_access = time.time()
+            # O horário do diretório mostra o acesso a outros processos que usam a mesma raiz
+            try:
+                os.utime(workspace.path)
+            except OSError:
+                pass
+            return workspace
+
+    def usage(self):
+        """Bytes usados e reservados por todas as sessões"""
+        with self._condition:
+            return sum(workspace.used + workspace.reserved for workspace in self._workspaces.values())
+
+    def refresh(self, name):
+        """Mede de novo o espaço usado por um diretório"""
+        with self._condition:
+            workspace = self._workspaces.get(name)
+            if workspace is not None:
+                workspace.used = directory_size(workspace.path)
+            return workspace
+
+    def remove(self, name):
+        """Remove o diretório de uma sessão, se ele não estiver em uso"""
+        with self._condition:
+            workspace = self._workspaces.get(name)
+            if workspace is None or not self._removable(workspace):
+                return False
+            self._remove(workspace)
+            self._condition.notify_all()
+            return True
+
+    def remove_idle(self, max_age):
+        """
+        Remove os diretórios sem acesso há max_age segundos, consultando apenas o índice
+        (e o horário de cada candidato, que pode ter sido usado por outro processo).
+
+        Returns:
+            list: Nomes dos diretórios removidos
+        """
+        removed = []
+        with self._condition:
+            limit = time.time() - max_age
+            for workspace in list(self._workspaces.values()):
+                if workspace.last_access > limit or not self._removable(workspace):
+                    continue
+                try:
+                    workspace.last_access = max(workspace.last_access, os.stat(workspace.path).st_mtime)
+                except OSError:
+                    pass
+                if workspace.last_access > limit:
+                    continue
+                self._remove(workspace)
+                removed.append(workspace.name)
+            if removed:
+                self._condition.notify_all()
+        return removed
+
+    @staticmethod
+    def _removable(workspace):
+        """True se o diretório não tem reservas nem arquivos marcados como em uso"""
+        return not workspace.active and not is_pinned(workspace.path)
+
+    def _remove(self, workspace):
+        """Remove um diretório do disco e do índice (chamar com o lock)"""
+        shutil.rmtree(workspace.path, ignore_errors=True)
+        del self._workspaces[workspace.name]
+
+    def _fits(self, nbytes):
+        """True se nbytes cabem na cota total e no disco (chamar com o lock)"""
+        reserved = sum(workspace.reserved for workspace in self._workspaces.values())
+        used = sum(workspace.used for workspace in self._workspaces.values())
+        if used + reserved + nbytes > self.global_quota:
+            return False
+        free = free_disk_bytes(self.root)
+        return free is None or free - reserved - nbytes >= self.min_free_bytes
+
+    def _evict(self, requester, nbytes):
+        """
+        Remove diretórios parados até nbytes caberem (chamar com o lock).
+
+        Só entram diretórios sem reservas e sem acesso há MIN_IDLE_SECONDS, na ordem do
+        tempo parado multiplicado pelo tamanho: primeiro os grandes e esquecidos.
+        """
+        now = time.time()
+        candidates = [
+            workspace for workspace in self._workspaces.values()
+            if workspace is not requester and now - workspace.last_access >= MIN_IDLE_SECONDS
+            and self._removable(workspace)
+        ]
+        candidates.sort(key=lambda workspace: (now - workspace.last_access) * max(workspace.used, 1), reverse=True)
+        for workspace in candidates:
+            if self._fits(nbytes):
+                break
+            print(f"Removendo o diretório parado {workspace.name} ({workspace.used / MB:.1f} MB) para liberar espaço")
+            self._remove(workspace)
+
+    def acquire(self, name, nbytes, timeout=DEFAULT_WAIT_SECONDS):
+        """
+        Reserva espaço para um processamento no diretório de uma sessão.
+
+        Args:
+            name (str): Nome do diretório
+            nbytes (int): Bytes que o processamento deve gravar (estimativa)
+            timeout (float, optional): Segundos esperando espaço; 0 não espera
+
+        Returns:
+            tuple: Reserva, a ser devolvida com release()
+
+        Raises:
+            QuotaExceededError: Se a sessão passaria da sua cota
+            NoSpaceError: Se não houve espaço no servidor dentro do tempo
+        """
+        nbytes = max(0, int(nbytes))
+        workspace = self.workspace(name)
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            if workspace.used + workspace.reserved + nbytes > self.session_quota:
+                workspace.used = directory_size(workspace.path)
+                if workspace.used + workspace.reserved + nbytes > self.session_quota:
+                    raise QuotaExceededError(
+                        f"A sessão passaria da cota de {self.session_quota / MB:.0f} MB "
+                        f"({workspace.used / MB:.0f} MB em uso, {nbytes / MB:.0f} MB pedidos)."
+                    )
+
+            while not self._fits(nbytes):
+                self._evict(workspace, nbytes)
+                if self._fits(nbytes):
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise NoSpaceError("Sem espaço em disco no servidor no momento. Tente novamente em alguns minutos.")
+                # Acordado quando outra reserva termina; o disco também é consultado de tempos em tempos
+                self._condition.wait(min(remaining, 5.0))
+
+            # O diretório pode ter sido removido enquanto esperava
+            if workspace.name not in self._workspaces:
+                self._workspaces[workspace.name] = workspace
+                os.makedirs(workspace.path, exist_ok=True)
+            workspace.reserved += nbytes
+            workspace.active += 1
+        return workspace, nbytes
+
+    def release(self, reservation):
+        """Devolve uma reserva, medindo o espaço que o processamento realmente ocupou"""
+        workspace, nbytes = reservation
+        used = directory_size(workspace.path)
+        with self._condition:
+            workspace.reserved -= nbytes
+            workspace.active -= 1
+            workspace.used = used
+            workspace.last_access = time.time()
+            self._condition.notify_all()
+
+    @contextmanager
+    def reserve(self, name, nbytes, timeout=DEFAULT_WAIT_SECONDS):
+        """Reserva espaço durante um bloco with (ver acquire)"""
+        reservation = self.acquire(name, nbytes, timeout)
+        try:
+            yield reservation[0]
+        finally:
+            self.release(reservation)
+
+# Um gerenciador por diretório e por processo, compartilhado entre as sessões
+_managers = {}
+_managers_lock = threading.Lock()
+
+def get_workspace_manager(root, **quotas):
+    """
+    Retorna o gerenciador de um diretório, criando-o na primeira chamada.
+
+    Args:
+        root (str): Diretório onde ficam os diretórios das sessões
+        **quotas: session_quota, global_quota e min_free_bytes (usados apenas na criação)
+
+    Returns:
+        WorkspaceManager: Gerenciador compartilhado pelo processo
+    """
+    root = os.path.abspath(root)
+    with _managers_lock:
+        manager = _managers.get(root)
+        if manager is None:
+            manager = WorkspaceManager(root, **quotas)
+            _managers[root] = manager
+        return manager